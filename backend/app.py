@@ -1,5 +1,10 @@
-from flask import Flask
+from flask import Flask, jsonify
+from psycopg2.pool import PoolError
 from flask_cors import CORS
+import db_timing
+import metrics
+import profiler
+from process.job_queue import register_queue_metrics
 from routes.auth_routes import auth_bp
 from routes.area.crud_area import area_bp
 from routes.area.crud_region import region_bp
@@ -22,34 +27,60 @@ from routes.product.crud_pricegroup import pricegroup_bp
 from routes.config.crud_config import config_bp
 from routes.sellout.cr_sellout import sellout_bp
 from routes.sellout.cr_mapping_error import mapping_error_bp
+from routes.debug_routes import debug_bp
+from routes.health_routes import health_bp
 
-app = Flask(__name__)
-CORS(app)
 
-app.register_blueprint(auth_bp)
-app.register_blueprint(area_bp)
-app.register_blueprint(region_bp)
-app.register_blueprint(salesman_team_bp)
-app.register_blueprint(entity_bp)
-app.register_blueprint(branch_bp)
-app.register_blueprint(branch_dist_bp)
-app.register_blueprint(mapping_branch_bp)
-app.register_blueprint(salesman_master_bp)
-app.register_blueprint(list_bp)
-app.register_blueprint(mapping_salesman_bp)
-app.register_blueprint(customer_prc_bp)
-app.register_blueprint(customer_dist_bp)
-app.register_blueprint(mapping_customer_bp)
-app.register_blueprint(product_dist_bp)
-app.register_blueprint(product_prc_bp)
-app.register_blueprint(product_group_bp)
-app.register_blueprint(mapping_product_bp)
-app.register_blueprint(pricegroup_bp)
-app.register_blueprint(config_bp)
-app.register_blueprint(sellout_bp)
-app.register_blueprint(mapping_error_bp)
+def create_app():
+    """
+    Bangun aplikasi Flask. Tidak membuka koneksi database: pool dibuat per
+    proses saat request pertama (db.get_pool), jadi aman untuk gunicorn
+    --preload yang mengimpor aplikasi di master sebelum fork. Modul berat
+    (pandas) hanya diimpor di dalam route yang mem-parse file.
+    """
+    app = Flask(__name__)
+    CORS(app)
+    metrics.init_app(app)
+    db_timing.init_app(app)
+    profiler.init_app(app)
+    register_queue_metrics()
 
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(area_bp)
+    app.register_blueprint(region_bp)
+    app.register_blueprint(salesman_team_bp)
+    app.register_blueprint(entity_bp)
+    app.register_blueprint(branch_bp)
+    app.register_blueprint(branch_dist_bp)
+    app.register_blueprint(mapping_branch_bp)
+    app.register_blueprint(salesman_master_bp)
+    app.register_blueprint(list_bp)
+    app.register_blueprint(mapping_salesman_bp)
+    app.register_blueprint(customer_prc_bp)
+    app.register_blueprint(customer_dist_bp)
+    app.register_blueprint(mapping_customer_bp)
+    app.register_blueprint(product_dist_bp)
+    app.register_blueprint(product_prc_bp)
+    app.register_blueprint(product_group_bp)
+    app.register_blueprint(mapping_product_bp)
+    app.register_blueprint(pricegroup_bp)
+    app.register_blueprint(config_bp)
+    app.register_blueprint(sellout_bp)
+    app.register_blueprint(mapping_error_bp)
+    app.register_blueprint(debug_bp)
+    app.register_blueprint(health_bp)
+
+    # Pool koneksi habis: 503 + header supaya client / load test bisa membedakan
+    # dari error aplikasi biasa
+    @app.errorhandler(PoolError)
+    def pool_exhausted(e):
+        return jsonify({"error": "Server sedang sibuk (koneksi database habis), coba lagi"}), 503, {
+            "X-Pool-Exhausted": "1",
+            "Retry-After": "1"
+        }
+
+    return app
 
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    create_app().run(debug=True)
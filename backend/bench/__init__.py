@@ -0,0 +1,11 @@
+"""
+Benchmark suite sellout terhadap Postgres lokal (database khusus benchmark).
+
+    python -m bench seed    --seed 42 --coverage 0.95   # master data sintetis
+    python -m bench run     --rows 100000 --out bench/results/hasil.json
+    python -m bench compare bench/results/lama.json bench/results/baru.json
+    python -m bench cleanup                              # hapus data BN*
+
+Semua data sintetis memakai prefix kode BN sehingga bisa dibersihkan tanpa
+menyentuh data lain. Lihat bench/__main__.py untuk semua opsi.
+"""
@@ -0,0 +1,292 @@
+"""
+CLI benchmark (jalankan dari folder backend):
+
+    python -m bench seed --seed 42 --coverage 0.95
+    python -m bench run --rows 100000 --repeat 3 --out bench/results/hasil.json
+    python -m bench run --scenarios parse --formats csv,txt,xlsx   # tanpa DB
+    python -m bench compare bench/results/lama.json bench/results/baru.json --threshold 10
+    python -m bench cleanup
+    python -m bench load --base-url http://localhost:5000 --users 20 --duration 120
+    python -m bench startup --repeat 5
+
+Skenario yang butuh DB hanya mau jalan jika nama database (DB_NAME)
+mengandung "bench" atau "test", kecuali diberi --force: seed/cleanup
+menghapus data berprefix BN.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+from bench import results
+from bench.generator import DEFAULT_SCALE, FORMATS, generate_master
+
+SCENARIOS = ("parse", "temp_load", "finalize", "paged_read", "export")
+DB_SCENARIOS = {"temp_load", "finalize", "paged_read", "export"}
+
+
+def _connect(force):
+    from dotenv import load_dotenv
+    load_dotenv()
+    name = os.getenv("DB_NAME", "")
+    if not force and "bench" not in name and "test" not in name:
+        sys.exit(f"DB_NAME='{name}' bukan database benchmark/test; pakai --force jika yakin")
+    from db import get_db_connection
+    return get_db_connection()
+
+
+def _scale(args):
+    return {k: getattr(args, k) for k in DEFAULT_SCALE}
+
+
+def cmd_seed(args):
+    from bench.seed import seed
+
+    conn = _connect(args.force)
+    branches, counts = seed(conn, args.seed, args.coverage, _scale(args))
+    for table, count in counts.items():
+        print(f"{table:<18} {count:>8}")
+    print(f"✅ {len(branches)} branch sintetis siap")
+
+
+def cmd_cleanup(args):
+    from bench.seed import cleanup
+
+    conn = _connect(args.force)
+    for table, count in cleanup(conn).items():
+        if count:
+            print(f"{table:<22} {count:>8} baris dihapus")
+
+
+def cmd_run(args):
+    from bench import scenarios as sc
+
+    selected = args.scenarios.split(",") if args.scenarios != "all" else list(SCENARIOS)
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Skenario tidak dikenal: {', '.join(sorted(unknown))}")
+    formats = args.formats.split(",")
+    month = tuple(int(x) for x in args.month.split("-"))
+
+    conn = None
+    if DB_SCENARIOS & set(selected):
+        from bench.seed import seed
+        conn = _connect(args.force)
+        branches, _ = seed(conn, args.seed, args.coverage, _scale(args))
+    else:
+        _, branches = generate_master(args.seed, args.coverage, _scale(args))
+    branch = branches[0]
+
+    raw = {}
+    if "parse" in selected:
+        for fmt in formats:
+            print(f"⏱️ parse {fmt} ({args.rows} baris)")
+            raw[f"parse_{fmt}"] = sc.parse(branch, args.rows, fmt, args.repeat, args.engine, month, args.seed)
+
+    if DB_SCENARIOS & set(selected):
+        print(f"⏱️ temp_load + finalize ({args.rows} baris)")
+        load, finalize = sc.load_and_finalize(conn, branch, args.rows, args.repeat, month, args.seed)
+        if "temp_load" in selected:
+            raw["temp_load"] = load
+        if "finalize" in selected:
+            raw["finalize"] = finalize
+
+    if "paged_read" in selected:
+        print("⏱️ paged_read")
+        raw["paged_read"] = sc.paged_read(branch, args.repeat, month)
+
+    if "export" in selected:
+        print("⏱️ export")
+        raw["export"] = sc.export(branch, args.repeat, month)
+
+    params = {
+        "seed": args.seed, "rows": args.rows, "repeat": args.repeat, "coverage": args.coverage,
+        "engine": args.engine, "formats": formats, "month": args.month,
+        "scenarios": selected, "scale": _scale(args), "db_name": os.getenv("DB_NAME") if conn else None
+    }
+    result = results.build_result(params, raw)
+    results.print_summary(result)
+
+    out = args.out or os.path.join(
+        "bench", "results", f"{datetime.now():%Y%m%d-%H%M%S}-{result['git_commit'] or 'local'}.json"
+    )
+    results.write_result(result, out)
+    print(f"💾 {out}")
+
+    if conn is not None and args.cleanup:
+        from bench.seed import cleanup
+        cleanup(conn)
+
+
+def _parse_mix(text):
+    from bench.load import DEFAULT_MIX
+
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            sys.exit(f"Pola tidak dikenal: {name} ({', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def cmd_load(args):
+    import jwt
+    from dotenv import load_dotenv
+    from bench.load import run_load
+
+    load_dotenv()
+    args.mix = _parse_mix(args.mix)
+    args.month = tuple(int(x) for x in args.month.split("-"))
+    args.base_url = args.base_url.rstrip("/")
+    # Token dibuat lokal dengan SECRET_KEY yang sama dengan API
+    token = args.token or jwt.encode(
+        {"id_user": "loadtest", "exp": datetime.utcnow() + timedelta(seconds=args.duration + 3600)},
+        os.getenv("SECRET_KEY", "dev_secret"), algorithm="HS256"
+    )
+    _, branches = generate_master(args.seed, args.coverage, _scale(args))
+
+    print(f"🚀 {args.users} user, {args.duration} s, mix {args.mix} -> {args.base_url}")
+    endpoints, elapsed, server = run_load(args, branches, token)
+
+    params = {
+        "users": args.users, "duration": args.duration, "ramp_up": args.ramp_up, "think_ms": args.think_ms,
+        "mix": args.mix, "burst": args.burst, "update_rows": args.update_rows, "upload_rows": args.upload_rows,
+        "seed": args.seed, "base_url": args.base_url
+    }
+    result = results.build_result(params, endpoints, keep_runs=False)
+    result["elapsed_s"] = round(elapsed, 2)
+    result["server"] = server
+    results.print_load_summary(result, elapsed)
+    if server["db_pool_errors"] is not None:
+        print(f"db_pool_errors_total (server) +{server['db_pool_errors']:.0f}")
+
+    out = args.out or os.path.join(
+        "bench", "results", f"load-{datetime.now():%Y%m%d-%H%M%S}-{result['git_commit'] or 'local'}.json"
+    )
+    results.write_result(result, out)
+    print(f"💾 {out}")
+
+
+# Dijalankan di proses baru supaya modul belum ada di sys.modules (cold import)
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import wsgi
+elapsed = (time.perf_counter() - start) * 1000
+from metrics import process_rss
+print(json.dumps({"ms": elapsed, "rss": process_rss(), "pandas": "pandas" in sys.modules, "modules": len(sys.modules)}))
+"""
+
+
+def cmd_startup(args):
+    """Waktu import wsgi:app dan RSS satu proses worker sebelum request pertama"""
+    import json
+    import subprocess
+
+    raw = {"runs_ms": [], "rss_mb": [], "pandas_loaded": None, "modules": None}
+    for _ in range(args.repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", STARTUP_PROBE], capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        probe = json.loads(out)
+        raw["runs_ms"].append(probe["ms"])
+        raw["rss_mb"].append(round(probe["rss"] / 1024 / 1024, 1))
+        raw["pandas_loaded"], raw["modules"] = probe["pandas"], probe["modules"]
+
+    result = results.build_result({"repeat": args.repeat}, {"startup_import": raw})
+    s = result["scenarios"]["startup_import"]
+    print(f"import wsgi: median {s['median_ms']:.0f} ms, p95 {s['p95_ms']:.0f} ms")
+    print(f"RSS: {max(raw['rss_mb'])} MB, {raw['modules']} modul, pandas {'dimuat' if raw['pandas_loaded'] else 'tidak dimuat'}")
+
+    out = args.out or os.path.join(
+        "bench", "results", f"startup-{datetime.now():%Y%m%d-%H%M%S}-{result['git_commit'] or 'local'}.json"
+    )
+    results.write_result(result, out)
+    print(f"💾 {out}")
+
+
+def cmd_compare(args):
+    old, new = results.load_result(args.old), results.load_result(args.new)
+    print(f"lama: {old['git_commit']} {old['created_at']}  baru: {new['git_commit']} {new['created_at']}")
+    if old["params"] != new["params"]:
+        print("⚠️ Parameter run berbeda, perbandingan bisa menyesatkan")
+
+    print(f"{'skenario':<18} {'lama (ms)':>11} {'baru (ms)':>11} {'selisih':>9}  status")
+    slower = False
+    for name, a, b, change, status in results.compare(old, new, args.threshold):
+        fmt = lambda v: f"{v:>11.1f}" if v is not None else f"{'-':>11}"
+        pct = f"{change:>+8.1f}%" if change is not None else f"{'-':>9}"
+        print(f"{name:<18} {fmt(a)} {fmt(b)} {pct}  {status}")
+        slower = slower or status == "LEBIH LAMBAT"
+    # Exit code 1 jika ada regresi, supaya bisa dipakai di CI
+    sys.exit(1 if slower else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmark suite sellout")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def data_options(p):
+        p.add_argument("--seed", type=int, default=42)
+        p.add_argument("--coverage", type=float, default=0.95, help="porsi kode distributor yang punya mapping")
+        for key, value in DEFAULT_SCALE.items():
+            p.add_argument(f"--{key.replace('_', '-')}", dest=key, type=int, default=value)
+        p.add_argument("--force", action="store_true", help="izinkan DB yang namanya bukan bench/test")
+
+    p = sub.add_parser("seed", help="insert master data sintetis")
+    data_options(p)
+    p.set_defaults(func=cmd_seed)
+
+    p = sub.add_parser("cleanup", help="hapus semua data sintetis")
+    p.add_argument("--force", action="store_true")
+    p.set_defaults(func=cmd_cleanup)
+
+    p = sub.add_parser("run", help="jalankan skenario dan simpan hasil JSON")
+    data_options(p)
+    p.add_argument("--scenarios", default="all", help=f"all atau daftar dipisah koma: {','.join(SCENARIOS)}")
+    p.add_argument("--formats", default=",".join(FORMATS), help="format file untuk skenario parse")
+    p.add_argument("--engine", default="c", choices=["c", "pyarrow"], help="engine csv/txt")
+    p.add_argument("--rows", type=int, default=100_000)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--month", default="2025-03", help="bulan data sintetis (YYYY-MM)")
+    p.add_argument("--out", help="file hasil (default bench/results/<waktu>-<commit>.json)")
+    p.add_argument("--cleanup", action="store_true", help="hapus data sintetis setelah selesai")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("load", help="load test HTTP pola akses Streamlit (butuh API jalan + seed)")
+    data_options(p)
+    p.add_argument("--base-url", default="http://localhost:5000")
+    p.add_argument("--token", help="Authorization token (default: dibuat dari SECRET_KEY)")
+    p.add_argument("--users", type=int, default=10, help="virtual user paralel")
+    p.add_argument("--duration", type=int, default=60, help="detik")
+    p.add_argument("--ramp-up", type=float, default=5, help="detik sampai semua user berjalan")
+    p.add_argument("--think-ms", type=int, default=500, help="jeda acak maksimal antar pola")
+    p.add_argument("--mix", help="bobot pola, mis. browse_sellout=3,area_burst=2,upload=1")
+    p.add_argument("--burst", type=int, default=5, help="jumlah /list/area per area_burst")
+    p.add_argument("--update-rows", type=int, default=20, help="PUT per row_updates")
+    p.add_argument("--upload-rows", type=int, default=5000, help="baris file per upload")
+    p.add_argument("--month", default="2025-03")
+    p.add_argument("--timeout", type=float, default=120)
+    p.add_argument("--out", help="file hasil (default bench/results/load-<waktu>-<commit>.json)")
+    p.set_defaults(func=cmd_load)
+
+    p = sub.add_parser("startup", help="waktu import wsgi:app dan RSS per proses (tanpa DB)")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--out", help="file hasil (default bench/results/startup-<waktu>-<commit>.json)")
+    p.set_defaults(func=cmd_startup)
+
+    p = sub.add_parser("compare", help="bandingkan dua file hasil")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("--threshold", type=float, default=10.0, help="persen perubahan median yang dianggap beda")
+    p.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
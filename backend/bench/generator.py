@@ -0,0 +1,237 @@
+"""
+Generator data sintetis yang deterministik (seed): master data
+region -> entity -> branch -> customer/product/salesman beserta kode
+distributor dan mapping-nya, lalu file sellout csv/txt/xlsx yang memakai
+kode distributor tersebut.
+
+Coverage < 1 berarti sebagian kode distributor sengaja tidak di-mapping
+sehingga finalize juga mengukur jalur mapping_error.
+"""
+import io
+import random
+from datetime import datetime
+
+# Semua kode sintetis diawali PREFIX (lihat seed.cleanup)
+PREFIX = "BN"
+
+# Skala default: 2 region x 2 entity x 2 branch = 8 branch
+DEFAULT_SCALE = {
+    "regions": 2,
+    "entities_per_region": 2,
+    "branches_per_entity": 2,
+    "customers_per_branch": 2000,
+    "salesmen_per_branch": 40,
+    "products": 600
+}
+
+WIDTH = 30
+
+# Posisi kolom (1-based) file sintetis, dipakai juga sebagai config branch
+LAYOUT = {
+    "kodebranch": 1, "id_salesman": 3, "id_customer": 5, "id_product": 8,
+    "qty1": 10, "qty2": 11, "qty3": 12, "price": 13, "grossamount": 14,
+    "discount1": 15, "discount2": 16, "discount3": 17, "discount8": 18,
+    "total_discount": 19, "dpp": 20, "tax": 21, "nett": 22,
+    "order_no": 23, "order_date": 24, "invoice_no": 25, "invoice_date": 26,
+    "invoice_type": 27, "flag_bonus": 28, "first_row": 2
+}
+DATE_FORMAT = "%d/%m/%Y"
+SEPARATORS = {"csv": ",", "txt": "|"}
+FORMATS = ("csv", "txt", "xlsx")
+
+
+def branch_config(kodebranch, file_extension, parse_engine="c"):
+    """Baris tabel config untuk file sintetis branch ini"""
+    return dict(
+        LAYOUT,
+        branch=kodebranch,
+        file_extension=file_extension,
+        separator_file=SEPARATORS.get(file_extension),
+        parse_engine=parse_engine,
+        date_format=DATE_FORMAT
+    )
+
+
+def _mapped(rnd, coverage):
+    return rnd.random() < coverage
+
+
+def generate_master(seed=42, coverage=0.95, scale=None):
+    """
+    Master data sebagai {tabel: [dict baris]}. Urutan tabel = urutan insert
+    (parent dulu). Tiap branch punya satu branch_dist.
+    """
+    scale = dict(DEFAULT_SCALE, **(scale or {}))
+    rnd = random.Random(seed)
+    p = PREFIX
+    data = {t: [] for t in (
+        "region", "area", "entity", "branch", "branch_dist", "mapping_branch",
+        "salesman_team", "salesman_master", "mapping_salesman",
+        "customer_prc", "customer_dist", "mapping_customer",
+        "product_prc", "product_group", "product_dist", "mapping_product"
+    )}
+
+    data["salesman_team"].append({"id": f"{p}T1", "description": "TEAM BENCH"})
+
+    products = []
+    for n in range(1, scale["products"] + 1):
+        pcode = f"{p}P{n:05d}"
+        name = f"PRODUK BENCH {n}"
+        products.append((pcode, name))
+        data["product_prc"].append({
+            "pcode": pcode, "pcodename": name, "unit1": "PCS", "unit2": "BOX", "unit3": "KRT",
+            "convunit2": 12, "convunit3": 144, "prlin": f"{p}L{n % 10}", "prlinname": f"LINI {n % 10}"
+        })
+        data["product_group"].append({
+            "group_code": f"{p}G{n % 20:02d}", "brand": f"BRAND {n % 15}", "pcode": pcode,
+            "product_group_1": f"GRUP {n % 5}", "product_group_2": f"GRUP {n % 10}",
+            "product_group_3": f"GRUP {n % 20}", "category_item": f"KATEGORI {n % 4}",
+            "vtkp": "N", "npd": "Y" if n % 25 == 0 else "N"
+        })
+
+    branches = []
+    for r in range(1, scale["regions"] + 1):
+        koderegion = f"{p}R{r}"
+        data["region"].append({"koderegion": koderegion, "keterangan": f"REGION BENCH {r}", "pin": "0000"})
+        for e in range(1, scale["entities_per_region"] + 1):
+            id_entity = f"{p}E{r}{e}"
+            data["entity"].append({"id_entity": id_entity, "keterangan": f"ENTITY BENCH {r}{e}", "koderegion": koderegion})
+            for b in range(1, scale["branches_per_entity"] + 1):
+                idx = len(branches) + 1
+                kodebranch = f"{p}B{idx:02d}"
+                branch_dist = f"{p}D{idx:02d}"
+                id_area = f"{p}A{idx:02d}"
+                branches.append({"kodebranch": kodebranch, "branch_dist": branch_dist})
+                data["area"].append({"id_area": id_area, "description": f"AREA BENCH {idx}"})
+                data["branch"].append({
+                    "kodebranch": kodebranch, "nama_branch": f"BRANCH BENCH {idx}",
+                    "koderegion": koderegion, "entity": id_entity, "alamat": "JL. BENCH",
+                    "id_area": id_area, "host": None, "ftp_user": None, "ftp_password": None
+                })
+                data["branch_dist"].append({
+                    "branch_dist": branch_dist, "nama_branch_dist": f"DIST BENCH {idx}", "alamat": "JL. BENCH"
+                })
+                data["mapping_branch"].append({
+                    "kodebranch": kodebranch, "nama_branch": f"BRANCH BENCH {idx}",
+                    "branch_dist": branch_dist, "nama_branch_dist": f"DIST BENCH {idx}"
+                })
+
+    for br in branches:
+        idx = br["kodebranch"][-2:]
+        br["salesmen"], br["customers"], br["products"] = [], [], []
+        br["customer_prc"] = []
+
+        for n in range(1, scale["salesmen_per_branch"] + 1):
+            prc, dist = f"{p}S{idx}{n:03d}", f"{p}X{idx}{n:03d}"
+            br["salesmen"].append(dist)
+            data["salesman_master"].append({
+                "id_salesman": prc, "nama": f"SALES {idx}-{n}", "id_team": f"{p}T1",
+                "salesman_team": "TEAM BENCH", "kodebranch": br["kodebranch"], "nama_branch": f"BRANCH BENCH {idx}"
+            })
+            if _mapped(rnd, coverage):
+                data["mapping_salesman"].append({
+                    "id_salesman": prc, "nama_salesman": f"SALES {idx}-{n}",
+                    "id_salesman_dist": dist, "nama_salesman_dist": f"SALES DIST {idx}-{n}"
+                })
+
+        for n in range(1, scale["customers_per_branch"] + 1):
+            prc, dist = f"{p}C{idx}{n:05d}", f"{p}K{idx}{n:05d}"
+            br["customers"].append(dist)
+            customer = {
+                "custno": prc, "custname": f"TOKO {idx}-{n}", "custadd": "JL. PASAR",
+                "city": f"KOTA {n % 30}", "type": rnd.choice(("GT", "MT", "HORECA")),
+                "gharga": "A", "kodebranch": br["kodebranch"]
+            }
+            br["customer_prc"].append(customer)
+            data["customer_prc"].append(customer)
+            data["customer_dist"].append({"custno_dist": dist, "custname": f"TOKO {idx}-{n}", "branch_dist": br["branch_dist"]})
+            if _mapped(rnd, coverage):
+                data["mapping_customer"].append({
+                    "custno": prc, "custname_prc": f"TOKO {idx}-{n}", "custno_dist": dist,
+                    "custname_dist": f"TOKO {idx}-{n}", "branch_prc": br["kodebranch"], "branch_dist": br["branch_dist"]
+                })
+
+        for n, (pcode, name) in enumerate(products, 1):
+            dist = f"{p}Q{idx}{n:05d}"
+            br["products"].append(dist)
+            data["product_dist"].append({"pcode_dist": dist, "pcodename": name, "branch_dist": br["branch_dist"]})
+            if _mapped(rnd, coverage):
+                data["mapping_product"].append({
+                    "pcode_prc": pcode, "pcode_prc_name": name, "pcode_dist": dist,
+                    "pcode_dist_name": name, "branch_dist": br["branch_dist"]
+                })
+
+    return data, branches
+
+
+def generate_rows(branch, rows, month=(2025, 3), seed=42):
+    """Baris file sellout branch (list kolom bertipe), kode dari master sintetis"""
+    rnd = random.Random(f"{seed}-{branch['kodebranch']}-{rows}")
+    year, mon = month
+    for n in range(rows):
+        qty = rnd.randint(1, 200)
+        price = round(rnd.uniform(1000, 90000), 2)
+        gross = round(qty * price, 2)
+        disc = round(gross * rnd.choice((0, 0.02, 0.05)), 2)
+        day = datetime(year, mon, rnd.randint(1, 28))
+        cols = [None] * WIDTH
+        cols[0] = branch["branch_dist"]
+        cols[1] = "CABANG BENCH"
+        cols[2] = rnd.choice(branch["salesmen"])
+        cols[3] = "NAMA SALESMAN"
+        cols[4] = rnd.choice(branch["customers"])
+        cols[5] = "NAMA TOKO"
+        cols[6] = "JL. CONTOH NO. 1"
+        cols[7] = rnd.choice(branch["products"])
+        cols[8] = "NAMA PRODUK"
+        cols[9], cols[10], cols[11] = 0, 0, qty
+        cols[12], cols[13] = price, gross
+        cols[14], cols[15], cols[16], cols[17] = disc, 0, 0, 0
+        cols[18] = disc
+        cols[19] = round(gross - disc, 2)
+        cols[20] = round((gross - disc) * 0.11, 2)
+        cols[21] = round((gross - disc) * 1.11, 2)
+        cols[22] = f"SO{n:08d}"
+        cols[23] = day
+        cols[24] = f"INV{n:08d}"
+        cols[25] = day
+        cols[26] = "F"
+        cols[27] = "Y" if rnd.random() < 0.03 else "N"
+        yield cols
+
+
+def header():
+    return [f"COL{i}" for i in range(1, WIDTH + 1)]
+
+
+def _text_value(value):
+    if isinstance(value, datetime):
+        return value.strftime(DATE_FORMAT)
+    return "" if value is None else str(value)
+
+
+def generate_file(branch, rows, file_extension, month=(2025, 3), seed=42):
+    """Isi file sellout (bytes) dalam format csv/txt/xlsx"""
+    if file_extension == "xlsx":
+        import xlsxwriter
+
+        out = io.BytesIO()
+        wb = xlsxwriter.Workbook(out, {"constant_memory": True, "in_memory": True})
+        ws = wb.add_worksheet()
+        date_fmt = wb.add_format({"num_format": "dd/mm/yyyy"})
+        ws.write_row(0, 0, header())
+        for r, cols in enumerate(generate_rows(branch, rows, month, seed), 1):
+            for c, value in enumerate(cols):
+                if isinstance(value, datetime):
+                    ws.write_datetime(r, c, value, date_fmt)
+                elif value is not None:
+                    ws.write(r, c, value)
+        wb.close()
+        return out.getvalue()
+
+    sep = SEPARATORS[file_extension]
+    out = io.StringIO()
+    out.write(sep.join(header()) + "\n")
+    for cols in generate_rows(branch, rows, month, seed):
+        out.write(sep.join(_text_value(v) for v in cols) + "\n")
+    return out.getvalue().encode()
@@ -0,0 +1,206 @@
+"""
+Load test HTTP yang meniru pola akses halaman Streamlit terhadap API lokal
+(jalankan `python -m bench seed` dulu; semua request memakai data BN*):
+
+    browse_sellout   loop chunk /sellout/data (2000) seperti fetch_all_sellout_cached
+    browse_error     loop chunk /mapping-error/data (2000)
+    browse_customer  loop chunk /customer-prc/data (100) halaman master
+    area_burst       beberapa /list/area berturut-turut (tiap rerun halaman)
+    row_updates      PUT /customer-prc/update/<custno> per baris (edit grid)
+    upload           POST /sellout/upload file csv sintetis, isi berbeda tiap
+                     panggilan (file identik hanya dijawab "skipped")
+
+Tiap virtual user menjalankan pola sesuai bobot (--mix) selama --duration
+detik. Laporan per endpoint: p50/p95/p99, throughput, error rate, dan
+kejadian pool habis (503 + header X-Pool-Exhausted dari API). Upload yang
+tetap dijawab skipped dihitung terpisah: latency-nya bukan parse + staging.
+"""
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+from bench.generator import generate_file
+
+DEFAULT_MIX = {
+    "browse_sellout": 3,
+    "browse_error": 1,
+    "browse_customer": 2,
+    "area_burst": 3,
+    "row_updates": 1,
+    "upload": 1
+}
+
+SELLOUT_CHUNK = 2000
+MASTER_CHUNK = 100
+
+
+class Recorder:
+    """Latency dan hasil per endpoint, dipakai bersama oleh semua user"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, name, elapsed_ms, status, pool_exhausted, skipped=False):
+        with self._lock:
+            e = self.endpoints.get(name)
+            if e is None:
+                e = self.endpoints[name] = {"runs_ms": [], "errors": 0, "pool_exhausted": 0, "skipped": 0, "status": {}}
+            e["runs_ms"].append(elapsed_ms)
+            if skipped:
+                e["skipped"] += 1
+            e["status"][str(status)] = e["status"].get(str(status), 0) + 1
+            if status is None or status >= 400:
+                e["errors"] += 1
+            if pool_exhausted:
+                e["pool_exhausted"] += 1
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, n, args, branches, token, recorder, stop_at):
+        super().__init__(daemon=True)
+        self.args = args
+        self.rnd = random.Random(f"{args.seed}-{n}")
+        self.branch = branches[n % len(branches)]
+        self.recorder = recorder
+        self.stop_at = stop_at
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = token
+        names, weights = zip(*args.mix.items())
+        self.patterns, self.weights = names, weights
+        self.n = n
+        self.uploads = 0
+
+    def call(self, name, method, path, **kwargs):
+        start = time.perf_counter()
+        status, pool, body = None, False, None
+        try:
+            res = self.session.request(method, self.args.base_url + path, timeout=self.args.timeout, **kwargs)
+            status = res.status_code
+            pool = res.headers.get("X-Pool-Exhausted") == "1"
+            body = res.json() if res.headers.get("Content-Type", "").startswith("application/json") else None
+        except requests.RequestException:
+            pass
+        except ValueError:
+            body = None
+        skipped = isinstance(body, dict) and body.get("skipped") is True
+        self.recorder.record(name, (time.perf_counter() - start) * 1000, status, pool, skipped)
+        return status, body
+
+    def fetch_all(self, name, path, chunk, params):
+        offset = 0
+        while time.monotonic() < self.stop_at:
+            status, body = self.call(name, "GET", path, params=dict(params, limit=chunk, offset=offset))
+            if status != 200 or not body:
+                return
+            data = body.get("data", [])
+            offset += len(data)
+            if not data or offset >= body.get("total", 0):
+                return
+
+    def month_range(self):
+        year, month = self.args.month
+        date_from = datetime(year, month, 1).date()
+        date_to = (date_from + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        return str(date_from), str(date_to)
+
+    #  POLA
+    def browse_sellout(self):
+        date_from, date_to = self.month_range()
+        self.fetch_all("GET /sellout/data", "/sellout/data", SELLOUT_CHUNK, {
+            "kodebranch": self.branch["kodebranch"], "date_from": date_from, "date_to": date_to
+        })
+
+    def browse_error(self):
+        date_from, date_to = self.month_range()
+        self.fetch_all("GET /mapping-error/data", "/mapping-error/data", SELLOUT_CHUNK, {
+            "kodebranch": self.branch["branch_dist"], "date_from": date_from, "date_to": date_to
+        })
+
+    def browse_customer(self):
+        self.fetch_all("GET /customer-prc/data", "/customer-prc/data", MASTER_CHUNK, {
+            "kodebranch": self.branch["kodebranch"]
+        })
+
+    def area_burst(self):
+        for _ in range(self.args.burst):
+            self.call("GET /list/area", "GET", "/list/area")
+
+    def row_updates(self):
+        for _ in range(self.args.update_rows):
+            c = self.rnd.choice(self.branch["customer_prc"])
+            # Nilai sama dengan hasil seed supaya data tidak bergeser antar run
+            self.call("PUT /customer-prc/update/<custno>", "PUT", f"/customer-prc/update/{c['custno']}", json={
+                "custname": c["custname"], "custadd": c["custadd"], "city": c["city"],
+                "typecustomer": c["type"], "gharga": c["gharga"], "updateby": "loadtest"
+            })
+
+    def upload(self):
+        # Seed unik per user dan per panggilan: hash file selalu berbeda sehingga
+        # upload benar-benar lewat parse, staging dan antrian (deterministik per run)
+        self.uploads += 1
+        content = generate_file(
+            self.branch, self.args.upload_rows, "csv", self.args.month,
+            f"{self.args.seed}-{self.n}-{self.uploads}"
+        )
+        self.call("POST /sellout/upload", "POST", "/sellout/upload", data={
+            "branch": self.branch["kodebranch"], "username": "loadtest"
+        }, files={"file": (f"{self.branch['branch_dist']}.csv", content, "text/csv")})
+
+    def run(self):
+        while time.monotonic() < self.stop_at:
+            pattern = self.rnd.choices(self.patterns, self.weights)[0]
+            getattr(self, pattern)()
+            if self.args.think_ms:
+                time.sleep(self.rnd.uniform(0, self.args.think_ms) / 1000)
+
+
+def scrape_pool_errors(base_url):
+    """db_pool_errors_total dari /metrics API (None jika tidak bisa dibaca)"""
+    try:
+        text = requests.get(base_url + "/metrics", timeout=5).text
+    except requests.RequestException:
+        return None
+    for line in text.splitlines():
+        if line.startswith("db_pool_errors_total"):
+            return float(line.split()[-1])
+    return 0.0
+
+
+def run_load(args, branches, token):
+    """Jalankan user paralel; return (hasil per endpoint, durasi detik, info server)"""
+    recorder = Recorder()
+    pool_before = scrape_pool_errors(args.base_url)
+
+    start = time.monotonic()
+    stop_at = start + args.duration
+    users = []
+    for n in range(args.users):
+        user = VirtualUser(n, args, branches, token, recorder, stop_at)
+        users.append(user)
+        user.start()
+        # Ramp-up supaya semua user tidak mulai di milidetik yang sama
+        if args.ramp_up:
+            time.sleep(args.ramp_up / args.users)
+    for user in users:
+        user.join()
+    elapsed = time.monotonic() - start
+
+    pool_after = scrape_pool_errors(args.base_url)
+    server = {
+        "db_pool_errors": pool_after - pool_before if None not in (pool_before, pool_after) else None
+    }
+
+    endpoints = {}
+    for name, e in recorder.endpoints.items():
+        total = len(e["runs_ms"])
+        endpoints[name] = dict(
+            e,
+            requests=total,
+            error_rate=round(e["errors"] / total, 4) if total else 0,
+            throughput_rps=round(total / elapsed, 2) if elapsed else 0
+        )
+    return endpoints, elapsed, server
@@ -0,0 +1,146 @@
+"""
+Format hasil benchmark (JSON) dan perbandingan antar run.
+
+    {
+      "version": 1,
+      "created_at": "...", "git_commit": "...", "python": "...", "host": "...",
+      "params": {...},
+      "scenarios": {
+        "parse_csv": {"median_ms": ..., "min_ms": ..., "max_ms": ..., "p95_ms": ...,
+                      "p99_ms": ..., "rows": ..., "rows_per_sec": ..., "runs_ms": [...], ...},
+        ...
+      }
+    }
+
+Hasil load test (`python -m bench load`) memakai format yang sama dengan
+satu "skenario" per endpoint (tanpa runs_ms). Bandingkan median_ms antar
+file dengan `python -m bench compare`.
+"""
+import json
+import os
+import platform
+import socket
+import subprocess
+from datetime import datetime
+
+RESULT_VERSION = 1
+
+# Field list durasi yang diringkas jadi median/p95 (list mentahnya tetap disimpan)
+SERIES_FIELDS = ("load_ms", "write_ms", "page_ms")
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def summarize(raw, keep_runs=True):
+    """Tambah median/min/max/p95/p99 dan throughput dari runs_ms"""
+    runs = raw["runs_ms"]
+    result = dict(raw)
+    median = percentile(runs, 0.5)
+    result.update({
+        "median_ms": round(median, 2),
+        "min_ms": round(min(runs), 2),
+        "max_ms": round(max(runs), 2),
+        "p95_ms": round(percentile(runs, 0.95), 2),
+        "p99_ms": round(percentile(runs, 0.99), 2)
+    })
+    if keep_runs:
+        result["runs_ms"] = [round(r, 2) for r in runs]
+    else:
+        # Load test: ribuan latency, cukup ringkasannya
+        del result["runs_ms"]
+    if raw.get("rows") and median:
+        result["rows_per_sec"] = round(raw["rows"] * 1000 / median, 1)
+    for field in SERIES_FIELDS:
+        if raw.get(field):
+            result[field] = [round(v, 2) for v in raw[field]]
+            result[f"{field[:-3]}_median_ms"] = round(percentile(raw[field], 0.5), 2)
+            result[f"{field[:-3]}_p95_ms"] = round(percentile(raw[field], 0.95), 2)
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def build_result(params, scenarios, keep_runs=True):
+    return {
+        "version": RESULT_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "host": socket.gethostname(),
+        "params": params,
+        "scenarios": {name: summarize(raw, keep_runs) for name, raw in scenarios.items() if raw["runs_ms"]}
+    }
+
+
+def write_result(result, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+
+def load_result(path):
+    with open(path, encoding="utf-8") as f:
+        result = json.load(f)
+    if result.get("version") != RESULT_VERSION:
+        raise ValueError(f"{path}: versi hasil {result.get('version')} tidak didukung")
+    return result
+
+
+def compare(old, new, threshold=10.0):
+    """
+    Baris perbandingan median per skenario: (nama, lama, baru, selisih %, status).
+    status "LEBIH LAMBAT" jika naik lebih dari threshold persen.
+    """
+    rows = []
+    for name in sorted(set(old["scenarios"]) | set(new["scenarios"])):
+        a = old["scenarios"].get(name, {}).get("median_ms")
+        b = new["scenarios"].get(name, {}).get("median_ms")
+        if a is None or b is None:
+            rows.append((name, a, b, None, "baru" if a is None else "hilang"))
+            continue
+        change = (b - a) / a * 100 if a else 0.0
+        if change > threshold:
+            status = "LEBIH LAMBAT"
+        elif change < -threshold:
+            status = "lebih cepat"
+        else:
+            status = "sama"
+        rows.append((name, a, b, round(change, 1), status))
+    return rows
+
+
+def print_summary(result):
+    print(f"{'skenario':<18} {'median (ms)':>12} {'p95 (ms)':>10} {'baris':>9} {'baris/s':>10}")
+    for name, s in result["scenarios"].items():
+        print(
+            f"{name:<18} {s['median_ms']:>12.1f} {s['p95_ms']:>10.1f} "
+            f"{s.get('rows') or 0:>9} {s.get('rows_per_sec') or 0:>10.0f}"
+        )
+
+
+def print_load_summary(result, elapsed):
+    print(f"{'endpoint':<34} {'req':>7} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'err %':>6} {'pool':>5} {'skip':>5}")
+    for name, s in sorted(result["scenarios"].items()):
+        print(
+            f"{name:<34} {s['requests']:>7} {s['throughput_rps']:>7.1f} {s['median_ms']:>8.1f} "
+            f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['error_rate'] * 100:>6.1f} {s['pool_exhausted']:>5} "
+            f"{s.get('skipped', 0):>5}"
+        )
+    print(f"durasi {elapsed:.1f} s")
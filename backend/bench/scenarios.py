@@ -0,0 +1,147 @@
+"""
+Skenario benchmark. Tiap skenario mengembalikan dict hasil dengan runs_ms
+(durasi tiap ulangan) plus angka pendukung (baris, halaman, dst.); statistik
+diringkas di bench.results.
+"""
+import io
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from bench.generator import branch_config, generate_file
+from process.parse_plan import compile_plan
+from process.sellout_temp import load_file, process_sellout
+
+# Ukuran chunk seperti fetch_all_sellout_cached di frontend
+PAGE_CHUNK = 2000
+
+
+def _ms(start):
+    return (time.perf_counter() - start) * 1000
+
+
+def parse(branch, rows, file_extension, repeat, engine="c", month=(2025, 3), seed=42):
+    """load_file + process_sellout dari bytes file (tanpa DB)"""
+    data = generate_file(branch, rows, file_extension, month, seed)
+    plan = compile_plan(branch_config(branch["kodebranch"], file_extension, engine))
+    runs, load_runs, count = [], [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = load_file(io.BytesIO(data), plan)
+        load_runs.append(_ms(start))
+        count = len(process_sellout(df, plan, "bench", str(uuid.uuid4())))
+        runs.append(_ms(start))
+    return {"runs_ms": runs, "load_ms": load_runs, "rows": count, "bytes": len(data)}
+
+
+def load_and_finalize(conn, branch, rows, repeat, month=(2025, 3), seed=42):
+    """
+    Per ulangan: bersihkan bulan branch (tidak diukur), staging + insert +
+    index (temp_load), lalu process_sellout_to_final (finalize).
+    """
+    from process.batch_metrics import StageTimer
+    from process.sellout_service import process_sellout_to_final
+    from process.sellout_temp import (
+        delete_mapping_error_by_month,
+        delete_sellout_final_by_month,
+        insert_sellout
+    )
+    from process.staging import create_staging_table, index_staging_table
+
+    data = generate_file(branch, rows, "csv", month, seed)
+    plan = compile_plan(branch_config(branch["kodebranch"], "csv"))
+    df = load_file(io.BytesIO(data), plan)
+    sample_date = datetime(month[0], month[1], 1)
+
+    load_runs, finalize_runs = [], []
+    moved = errors = 0
+    for _ in range(repeat):
+        delete_sellout_final_by_month(conn, branch["kodebranch"], sample_date)
+        delete_mapping_error_by_month(conn, {branch["branch_dist"]}, sample_date)
+        conn.commit()
+
+        batch = str(uuid.uuid4())
+        batch_rows = process_sellout(df, plan, "bench", batch)
+
+        start = time.perf_counter()
+        stage = create_staging_table(conn, batch, branch["kodebranch"])
+        insert_sellout(conn, batch_rows, stage)
+        index_staging_table(conn, stage)
+        conn.commit()
+        load_runs.append(_ms(start))
+
+        start = time.perf_counter()
+        moved, errors = process_sellout_to_final(conn, batch, timer=StageTimer())
+        finalize_runs.append(_ms(start))
+
+    return (
+        {"runs_ms": load_runs, "rows": len(df)},
+        {"runs_ms": finalize_runs, "rows": moved + errors, "rows_moved": moved, "rows_error": errors}
+    )
+
+
+def _client_and_headers():
+    import jwt
+    from app import create_app
+    from routes.sellout.cr_sellout import SECRET_KEY
+
+    token = jwt.encode(
+        {"id_user": "bench", "exp": datetime.utcnow() + timedelta(hours=1)},
+        SECRET_KEY, algorithm="HS256"
+    )
+    return create_app().test_client(), {"Authorization": token}
+
+
+def _fetch_all(client, headers, branch, month, page_ms=None):
+    """Loop halaman /sellout/data seperti fetch_all_sellout_cached"""
+    date_from = datetime(month[0], month[1], 1).date()
+    date_to = (date_from + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    data, offset = [], 0
+    while True:
+        start = time.perf_counter()
+        res = client.get("/sellout/data", headers=headers, query_string={
+            "kodebranch": branch["kodebranch"],
+            "date_from": str(date_from),
+            "date_to": str(date_to),
+            "limit": PAGE_CHUNK,
+            "offset": offset
+        })
+        if res.status_code != 200:
+            raise RuntimeError(f"/sellout/data {res.status_code}: {res.get_data(as_text=True)[:200]}")
+        payload = res.get_json()
+        if page_ms is not None:
+            page_ms.append(_ms(start))
+        chunk = payload["data"]
+        data.extend(chunk)
+        offset += len(chunk)
+        if not chunk or offset >= payload["total"]:
+            return data
+
+
+def paged_read(branch, repeat, month=(2025, 3)):
+    """GET /sellout/data per chunk lewat Flask test client (routing + SQL + JSON)"""
+    client, headers = _client_and_headers()
+    runs, page_ms, count = [], [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(_fetch_all(client, headers, branch, month, page_ms))
+        runs.append(_ms(start))
+    return {"runs_ms": runs, "rows": count, "pages": len(page_ms) // max(repeat, 1), "page_ms": page_ms}
+
+
+def export(branch, repeat, month=(2025, 3)):
+    """Ambil semua halaman lalu tulis xlsx (XlsxWriter) seperti export di halaman sellout"""
+    client, headers = _client_and_headers()
+    runs, write_runs, size, count = [], [], 0, 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = _fetch_all(client, headers, branch, month)
+        written = time.perf_counter()
+        out = io.BytesIO()
+        pd.DataFrame(data).to_excel(out, index=False, engine="xlsxwriter")
+        write_runs.append(_ms(written))
+        runs.append(_ms(start))
+        size, count = out.tell(), len(data)
+    return {"runs_ms": runs, "write_ms": write_runs, "rows": count, "bytes": size}
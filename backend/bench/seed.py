@@ -0,0 +1,122 @@
+"""
+Insert / hapus master data sintetis (kode berprefix generator.PREFIX).
+Seed selalu membersihkan data BN* lama dulu supaya hasil seed yang sama
+identik, berapa kali pun dijalankan.
+"""
+from psycopg2.extras import execute_values
+
+from bench.generator import FORMATS, PREFIX, branch_config, generate_master
+from process import parse_plan
+
+# Kolom kode per tabel master, dipakai untuk cleanup (urutan: anak dulu)
+MASTER_KEYS = [
+    ("mapping_product", "pcode_dist"),
+    ("product_dist", "pcode_dist"),
+    ("product_group", "pcode"),
+    ("product_prc", "pcode"),
+    ("mapping_customer", "custno_dist"),
+    ("customer_dist", "custno_dist"),
+    ("customer_prc", "custno"),
+    ("mapping_salesman", "id_salesman_dist"),
+    ("salesman_master", "id_salesman"),
+    ("salesman_team", "id"),
+    ("mapping_branch", "branch_dist"),
+    ("branch_dist", "branch_dist"),
+    ("branch", "kodebranch"),
+    ("entity", "id_entity"),
+    ("area", "id_area"),
+    ("region", "koderegion"),
+]
+
+# Data transaksi hasil benchmark (kolom branch berisi kode BN*)
+TRANSACTION_KEYS = [
+    ("sellout", "branch_code"),
+    ("mapping_error", "kodebranch"),
+    ("sellout_temp", "kodebranch"),
+    ("sellout_upload", "branch"),
+    ("sellout_batch_metrics", "branch"),
+    ("sellout_process_queue", "branch"),
+    ("config", "branch"),
+]
+
+CONFIG_COLUMNS = [
+    "branch", "kodebranch", "id_salesman", "id_customer", "id_product",
+    "qty1", "qty2", "qty3", "price", "grossamount",
+    "discount1", "discount2", "discount3", "discount8", "total_discount",
+    "dpp", "tax", "nett", "order_no", "order_date", "invoice_no", "invoice_date",
+    "invoice_type", "file_extension", "separator_file", "first_row", "flag_bonus",
+    "parse_engine", "date_format"
+]
+
+
+def cleanup(conn):
+    """Hapus semua data sintetis (master, transaksi, staging). Return {tabel: baris}"""
+    from process.staging import drop_staging_table
+
+    like = PREFIX + "%"
+    cur = conn.cursor()
+    deleted = {}
+    try:
+        cur.execute("SELECT upload_batch_id FROM sellout_staging WHERE kodebranch LIKE %s", (like,))
+        for (batch,) in cur.fetchall():
+            drop_staging_table(conn, batch)
+
+        for table, column in TRANSACTION_KEYS + MASTER_KEYS:
+            cur.execute(f"DELETE FROM {table} WHERE {column} LIKE %s", (like,))
+            deleted[table] = cur.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    parse_plan.invalidate()
+    return deleted
+
+
+def insert_rows(cur, table, rows):
+    columns = list(rows[0].keys())
+    execute_values(
+        cur,
+        f"INSERT INTO {table} ({', '.join(columns)}, createdate, createby) VALUES %s",
+        [tuple(r[c] for c in columns) for r in rows],
+        template="(" + ", ".join(["%s"] * len(columns)) + ", NOW(), 'bench')",
+        page_size=1000
+    )
+
+
+def set_branch_format(conn, kodebranch, file_extension, parse_engine="c"):
+    """Config branch sintetis diganti sesuai format file yang dibenchmark"""
+    config = branch_config(kodebranch, file_extension, parse_engine)
+    cur = conn.cursor()
+    try:
+        cur.execute("DELETE FROM config WHERE branch = %s", (kodebranch,))
+        insert_rows(cur, "config", [{c: config.get(c) for c in CONFIG_COLUMNS}])
+        conn.commit()
+    finally:
+        cur.close()
+    parse_plan.invalidate([kodebranch])
+
+
+def seed(conn, seed=42, coverage=0.95, scale=None):
+    """Bersihkan lalu insert master data + config (csv). Return (branches, {tabel: baris})"""
+    cleanup(conn)
+    data, branches = generate_master(seed, coverage, scale)
+
+    cur = conn.cursor()
+    counts = {}
+    try:
+        for table, rows in data.items():
+            if rows:
+                insert_rows(cur, table, rows)
+            counts[table] = len(rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    for br in branches:
+        set_branch_format(conn, br["kodebranch"], FORMATS[0])
+    return branches, counts
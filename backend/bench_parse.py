@@ -0,0 +1,170 @@
+"""
+Benchmark parser file sellout (load_file + process_sellout) per engine
+dengan file distributor sintetis: txt (separator |) dan csv (separator ,),
+30 kolom, kode ber-nol depan, tanggal dd/mm/yyyy. Tidak butuh database.
+Reader xlsx dibandingkan terpisah pada workbook 500k baris.
+
+    python bench_parse.py                      # 200k baris, 3 ulangan
+    python bench_parse.py --rows 500000 --repeat 5
+    python bench_parse.py --xlsx-rows 0        # tanpa xlsx
+"""
+import argparse
+import importlib.util
+import io
+import random
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from process import excel_reader
+from process.parse_plan import compile_plan
+from process.sellout_temp import load_file, process_sellout
+
+WIDTH = 30
+
+# Posisi kolom (1-based) seperti config distributor pada umumnya
+BASE_CONFIG = {
+    "branch": "BENCH",
+    "kodebranch": 1, "id_salesman": 3, "id_customer": 5, "id_product": 8,
+    "qty1": 10, "qty2": 11, "qty3": 12, "price": 13, "grossamount": 14,
+    "discount1": 15, "discount2": 16, "discount3": 17, "discount8": 18,
+    "total_discount": 19, "dpp": 20, "tax": 21, "nett": 22,
+    "order_no": 23, "order_date": 24, "invoice_no": 25, "invoice_date": 26,
+    "invoice_type": 27, "flag_bonus": 28, "first_row": 2,
+    "date_format": "%d/%m/%Y",
+}
+
+FORMATS = {
+    "txt": {"file_extension": "txt", "separator_file": "|"},
+    "csv": {"file_extension": "csv", "separator_file": ","},
+}
+
+
+def generate_rows(rows, seed=42):
+    """Baris sintetis bertipe (angka, tanggal) seperti isi file distributor"""
+    rnd = random.Random(seed)
+    for n in range(rows):
+        qty = rnd.randint(1, 200)
+        price = round(rnd.uniform(1000, 90000), 2)
+        gross = round(qty * price, 2)
+        disc = round(gross * rnd.choice((0, 0.02, 0.05)), 2)
+        day = datetime(2025, 3, rnd.randint(1, 28))
+        cols = [None] * WIDTH
+        cols[0] = f"D{rnd.randint(1, 5):03d}"
+        cols[1] = "CABANG BENCH"
+        cols[2] = f"S{rnd.randint(1, 80):04d}"
+        cols[3] = "NAMA SALESMAN"
+        cols[4] = f"{rnd.randint(1, 20000):07d}"
+        cols[5] = f"TOKO {rnd.randint(1, 20000)}"
+        cols[6] = "JL. CONTOH NO. 1"
+        cols[7] = f"{rnd.randint(1, 3000):06d}"
+        cols[8] = f"PRODUK {rnd.randint(1, 3000)}"
+        cols[9], cols[10], cols[11] = 0, 0, qty
+        cols[12], cols[13] = price, gross
+        cols[14], cols[15], cols[16], cols[17] = disc, 0, 0, 0
+        cols[18] = disc
+        cols[19] = round(gross - disc, 2)
+        cols[20] = round((gross - disc) * 0.11, 2)
+        cols[21] = round((gross - disc) * 1.11, 2)
+        cols[22] = f"SO{n:08d}"
+        cols[23] = day
+        cols[24] = f"INV{n:08d}"
+        cols[25] = day
+        cols[26] = "F"
+        cols[27] = "Y" if rnd.random() < 0.03 else "N"
+        yield cols
+
+
+def header():
+    return [f"COL{i}" for i in range(1, WIDTH + 1)]
+
+
+def generate_text(rows, sep):
+    out = io.StringIO()
+    out.write(sep.join(header()) + "\n")
+    for cols in generate_rows(rows):
+        out.write(sep.join(
+            v.strftime("%d/%m/%Y") if isinstance(v, datetime) else ("" if v is None else str(v))
+            for v in cols
+        ) + "\n")
+    return out.getvalue().encode()
+
+
+def generate_xlsx(rows):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(header())
+    for cols in generate_rows(rows):
+        ws.append(cols)
+    out = io.BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+def run(data, plan, repeat):
+    best_load = best_total = None
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = load_file(io.BytesIO(data), plan)
+        loaded = time.perf_counter()
+        rows = len(process_sellout(df, plan, "bench", "00000000-0000-0000-0000-000000000000"))
+        done = time.perf_counter()
+        best_load = min(best_load or 1e9, loaded - start)
+        best_total = min(best_total or 1e9, done - start)
+    return rows, best_load, best_total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark engine parser sellout")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--xlsx-rows", type=int, default=500_000,
+                        help="baris workbook xlsx (0 = lewati)")
+    args = parser.parse_args()
+
+    print(f"{'format':<6} {'engine':<8} {'baris':>8} {'load (s)':>10} {'total (s)':>10} {'baris/s':>10}")
+    for fmt, opts in FORMATS.items():
+        data = generate_text(args.rows, opts["separator_file"])
+        for engine in ("c", "pyarrow"):
+            # load_file fallback ke engine c jika pyarrow tidak ada; jangan ukur ganda
+            if engine == "pyarrow" and importlib.util.find_spec("pyarrow") is None:
+                print(f"{fmt:<6} {engine:<8} dilewati: pyarrow tidak terpasang")
+                continue
+            plan = compile_plan(dict(BASE_CONFIG, parse_engine=engine, **opts))
+            rows, load_s, total_s = run(data, plan, args.repeat)
+            print(f"{fmt:<6} {engine:<8} {rows:>8} {load_s:>10.3f} {total_s:>10.3f} {rows / total_s:>10.0f}")
+
+    if args.xlsx_rows:
+        bench_xlsx(args.xlsx_rows, args.repeat)
+
+
+def bench_xlsx(rows, repeat):
+    """pd.read_excel (baseline lama) vs reader streaming openpyxl / calamine"""
+    data = generate_xlsx(rows)
+    plan = compile_plan(dict(BASE_CONFIG, file_extension="xlsx"))
+
+    print()
+    print(f"{'xlsx':<20} {'baris':>8} {'load (s)':>10} {'baris/s':>10}")
+    readers = [("pandas read_excel", None), ("openpyxl read_only", "openpyxl")]
+    if importlib.util.find_spec("python_calamine"):
+        readers.append(("calamine", "calamine"))
+    for name, reader in readers:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            if reader is None:
+                df = pd.read_excel(io.BytesIO(data), header=None, skiprows=plan.skiprows)
+            else:
+                df = excel_reader.read_excel(
+                    io.BytesIO(data), skiprows=plan.skiprows, usecols=plan.usecols, reader=reader
+                )
+            best = min(best or 1e9, time.perf_counter() - start)
+        print(f"{name:<20} {len(df):>8} {best:>10.3f} {len(df) / best:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
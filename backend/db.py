@@ -1,26 +1,82 @@
 import os
+import threading
+import time
 import psycopg2
 from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
 
+from db_timing import TimedConnection
+from metrics import DB_POOL_ERRORS, DB_POOL_IN_USE, DB_POOL_MAX, DB_POOL_WAIT
+
 load_dotenv()
 
-MIN_CONN = 1
-MAX_CONN = 20
+# Per proses; gunicorn gthread butuh MAX_CONN >= jumlah thread (lihat gunicorn.conf.py)
+MIN_CONN = int(os.getenv("DB_POOL_MIN", "1"))
+MAX_CONN = int(os.getenv("DB_POOL_MAX", "20"))
+# Batas connect TCP/auth (detik) supaya request dan /readyz tidak menggantung saat DB mati
+CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+
+# Pool dibuat saat koneksi pertama diminta, bukan saat import, dan dibuat
+# ulang jika PID berubah: koneksi (socket) tidak boleh dipakai bersama
+# proses hasil fork (gunicorn --preload)
+pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global pool, _pool_pid
+    if pool is not None and _pool_pid == os.getpid():
+        return pool
+    with _pool_lock:
+        if pool is None or _pool_pid != os.getpid():
+            # Pool warisan parent tidak ditutup di sini: closeall() dari
+            # child ikut memutus koneksi milik parent
+            pool = ThreadedConnectionPool(
+                MIN_CONN,
+                MAX_CONN,
+                host= os.getenv("DB_HOST"),
+                user= os.getenv("DB_USER"),
+                password = os.getenv("DB_PASS"),
+                database = os.getenv("DB_NAME"),
+                port = os.getenv("DB_PORT"),
+                connect_timeout = CONNECT_TIMEOUT,
+                # Semua cursor di-timing (slow query log, X-DB-Time), lihat db_timing.py
+                connection_factory = TimedConnection
+            )
+            _pool_pid = os.getpid()
+            DB_POOL_MAX.set(MAX_CONN)
+            DB_POOL_IN_USE.set(0)
+    return pool
+
+
+def close_pool():
+    """Tutup semua koneksi pool proses ini (shutdown worker)"""
+    global pool, _pool_pid
+    with _pool_lock:
+        if pool is not None and _pool_pid == os.getpid():
+            pool.closeall()
+        pool, _pool_pid = None, None
+
+
+def pool_stats():
+    """(koneksi dipinjam, ukuran maksimal) pool proses ini, tanpa I/O"""
+    current = pool if _pool_pid == os.getpid() else None
+    # _used: koneksi yang sedang di-getconn (ThreadedConnectionPool tidak punya API publik)
+    return (len(current._used) if current is not None else 0), MAX_CONN
 
-pool = ThreadedConnectionPool(
-    MIN_CONN,
-    MAX_CONN,
-    host= os.getenv("DB_HOST"),
-    user= os.getenv("DB_USER"),
-    password = os.getenv("DB_PASS"),
-    database = os.getenv("DB_NAME"),
-    port = os.getenv("DB_PORT")
-)
 
 def get_db_connection():
-    conn = pool.getconn()
+    start = time.perf_counter()
+    try:
+        conn = get_pool().getconn()
+    except Exception:
+        DB_POOL_ERRORS.inc()
+        raise
+    DB_POOL_WAIT.observe(time.perf_counter() - start)
+    DB_POOL_IN_USE.inc()
     return conn
 
 def release_db_connection(conn):
-    pool.putconn(conn)
+    get_pool().putconn(conn)
+    DB_POOL_IN_USE.dec()
@@ -0,0 +1,207 @@
+"""
+Timing tiap execute SQL, dipasang lewat pool (connection_factory) sehingga
+semua route ikut tanpa perubahan, termasuk cursor_factory=RealDictCursor dan
+execute_values.
+
+- Statement di atas DB_SLOW_MS dicetak: route, durasi, rowcount, bentuk
+  parameter (tipe/panjang, bukan nilainya) dan potongan SQL.
+- Per request dijumlahkan dan dikirim di header X-DB-Time (ms),
+  X-DB-Queries dan Server-Timing (terlihat di devtools browser).
+- DB_EXPLAIN_SAMPLE (0..1, default 0): peluang statement SELECT yang lambat
+  di-EXPLAIN (ANALYZE, BUFFERS) ulang dan plan-nya ikut dicetak. EXPLAIN
+  ANALYZE menjalankan query lagi, jadi hanya SELECT, maksimal satu per
+  request, dan di dalam savepoint supaya kegagalannya tidak merusak transaksi.
+"""
+import os
+import random
+import time
+from contextvars import ContextVar
+
+from psycopg2.extensions import connection as _connection, cursor as _cursor
+
+DB_SLOW_MS = float(os.getenv("DB_SLOW_MS", "500"))
+DB_EXPLAIN_SAMPLE = float(os.getenv("DB_EXPLAIN_SAMPLE", "0"))
+
+# Panjang potongan SQL di log
+MAX_SQL_LOG = 300
+
+
+class QueryStats:
+    """Akumulasi SQL untuk satu unit kerja (request / job)"""
+
+    def __init__(self, label):
+        self.label = label
+        self.queries = 0
+        self.total_ms = 0.0
+        self.explained = False
+
+
+_current = ContextVar("db_query_stats", default=None)
+
+
+def start_stats(label):
+    stats = QueryStats(label)
+    return stats, _current.set(stats)
+
+
+def stop_stats(token):
+    _current.reset(token)
+
+
+def params_shape(params):
+    """Ringkasan parameter tanpa nilainya (bisa berisi data pelanggan)"""
+    if params is None:
+        return "-"
+    if isinstance(params, dict):
+        return "{" + ",".join(f"{k}:{type(v).__name__}" for k, v in params.items()) + "}"
+    if isinstance(params, (list, tuple)):
+        parts = []
+        for v in params:
+            name = type(v).__name__
+            if isinstance(v, (list, tuple)):
+                name += f"[{len(v)}]"
+            parts.append(name)
+        return "(" + ",".join(parts) + ")"
+    return type(params).__name__
+
+
+def _sql_text(query):
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    elif not isinstance(query, str):
+        # psycopg2.sql.Composed: tidak bisa di-render tanpa koneksi, cukup reprnya
+        query = repr(query)
+    text = " ".join(query.split())
+    return text if len(text) <= MAX_SQL_LOG else text[:MAX_SQL_LOG] + "..."
+
+
+def _is_select(query):
+    # WITH ... bisa berisi DML (data-modifying CTE), jadi hanya SELECT murni
+    if isinstance(query, bytes):
+        return query.lstrip()[:6].upper() == b"SELECT"
+    if isinstance(query, str):
+        return query.lstrip()[:6].upper() == "SELECT"
+    return False
+
+
+class TimedCursorMixin:
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self._record(query, vars, (time.perf_counter() - start) * 1000)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self._record(query, None, (time.perf_counter() - start) * 1000)
+
+    def _record(self, query, vars, elapsed_ms):
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.total_ms += elapsed_ms
+
+        if elapsed_ms < DB_SLOW_MS:
+            return
+
+        label = stats.label if stats is not None else "-"
+        print(
+            f"🐢 Slow query {elapsed_ms:.0f} ms [{label}] rows={self.rowcount} "
+            f"params={params_shape(vars)} sql={_sql_text(query)}"
+        )
+
+        if (
+            DB_EXPLAIN_SAMPLE > 0
+            and self.name is None
+            and _is_select(query)
+            and not (stats is not None and stats.explained)
+            and random.random() < DB_EXPLAIN_SAMPLE
+        ):
+            if stats is not None:
+                stats.explained = True
+            plan = explain(self.connection, query, vars)
+            if plan:
+                print(f"🔎 EXPLAIN [{label}]\n{plan}")
+
+
+def explain(conn, query, vars=None):
+    """EXPLAIN (ANALYZE, BUFFERS) di savepoint; None jika gagal"""
+    prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+    statement = prefix.encode() + query if isinstance(query, bytes) else prefix + query
+    # Cursor biasa (tanpa timing) supaya EXPLAIN tidak tercatat sebagai query lambat
+    cur = _cursor(conn)
+    try:
+        cur.execute("SAVEPOINT db_timing_explain")
+        try:
+            cur.execute(statement, vars)
+            plan = "\n".join(r[0] for r in cur.fetchall())
+            cur.execute("RELEASE SAVEPOINT db_timing_explain")
+            return plan
+        except Exception as e:
+            cur.execute("ROLLBACK TO SAVEPOINT db_timing_explain")
+            print("⚠️ EXPLAIN sampling gagal:", e)
+            return None
+    except Exception as e:
+        # Mis. transaksi sudah aborted atau koneksi autocommit
+        print("⚠️ EXPLAIN sampling dilewati:", e)
+        return None
+    finally:
+        cur.close()
+
+
+class TimedCursor(TimedCursorMixin, _cursor):
+    pass
+
+
+_timed_factories = {}
+
+
+def _timed_factory(factory):
+    """Subclass timing untuk cursor_factory lain (RealDictCursor, DictCursor, ...)"""
+    timed = _timed_factories.get(factory)
+    if timed is None:
+        timed = type(f"Timed{factory.__name__}", (TimedCursorMixin, factory), {})
+        _timed_factories[factory] = timed
+    return timed
+
+
+class TimedConnection(_connection):
+    """connection_factory untuk pool: semua cursor dari koneksi ini di-timing"""
+
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get("cursor_factory") or self.cursor_factory or _cursor
+        if not issubclass(factory, TimedCursorMixin):
+            kwargs["cursor_factory"] = _timed_factory(factory)
+        return super().cursor(*args, **kwargs)
+
+
+def init_app(app):
+    """Akumulasi waktu SQL per request + header X-DB-Time / Server-Timing"""
+    from flask import g, request
+
+    @app.before_request
+    def _db_timing_start():
+        label = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+        g._db_stats, g._db_stats_token = start_stats(label)
+
+    @app.after_request
+    def _db_timing_headers(response):
+        stats = g.get("_db_stats")
+        if stats is not None:
+            response.headers["X-DB-Time"] = f"{stats.total_ms:.1f}"
+            response.headers["X-DB-Queries"] = str(stats.queries)
+            response.headers.add(
+                "Server-Timing", f'db;dur={stats.total_ms:.1f};desc="{stats.queries} queries"'
+            )
+        return response
+
+    @app.teardown_request
+    def _db_timing_stop(exc):
+        token = g.pop("_db_stats_token", None)
+        g.pop("_db_stats", None)
+        if token is not None:
+            stop_stats(token)
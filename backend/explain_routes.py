@@ -0,0 +1,163 @@
+"""
+Index advisor: jalankan EXPLAIN (ANALYZE, BUFFERS) untuk query tiap route
+terhadap database yang sudah berisi data (seed) dan tandai Seq Scan pada
+tabel besar.
+
+    python explain_routes.py               # laporan
+    python explain_routes.py --min-rows 5000
+
+Exit code 1 jika ada Seq Scan yang ditandai, supaya bisa dipakai di CI.
+Semua query (termasuk DELETE/UPDATE) dijalankan di dalam transaksi
+yang di-rollback.
+"""
+import argparse
+import json
+import sys
+from db import get_db_connection, release_db_connection
+# Query diimpor dari modul route/worker, jadi plan yang diperiksa = plan produksi
+from process import job_queue
+from process.sellout_temp import DELETE_SELLOUT_MONTH_SQL
+from routes.customer import crd_mapping_customer, crud_customer_dist, crud_customer_prc
+from routes.list_routes import AREA_SQL
+from routes.product import crd_mapping_product, crud_product_dist
+from routes.salesman import crud_mapping_salesman, crud_salesman_master
+from routes.sellout import cr_mapping_error, cr_sellout
+
+# Nilai contoh diambil dari data yang paling banyak supaya plan realistis
+SAMPLE_SQL = {
+    "branch": "SELECT branch_code FROM sellout GROUP BY branch_code ORDER BY COUNT(1) DESC LIMIT 1",
+    "month": "SELECT date_trunc('month', MAX(invoice_date))::date FROM sellout",
+    "month_end": "SELECT (date_trunc('month', MAX(invoice_date)) + INTERVAL '1 month - 1 day')::date FROM sellout",
+    "error_branch": "SELECT kodebranch FROM mapping_error GROUP BY kodebranch ORDER BY COUNT(1) DESC LIMIT 1",
+    "kodebranch": "SELECT kodebranch FROM customer_prc GROUP BY kodebranch ORDER BY COUNT(1) DESC LIMIT 1",
+    "branch_dist": "SELECT branch_dist FROM customer_dist GROUP BY branch_dist ORDER BY COUNT(1) DESC LIMIT 1",
+}
+
+# limit default route /data (frontend juga memakai 50)
+PAGE = (50, 0)
+
+# (nama, sql, fungsi sampel -> parameter dengan urutan yang sama seperti route)
+ROUTE_QUERIES = [
+    ("GET /sellout/data", cr_sellout.DATA_SQL,
+     lambda s: (s["branch"], s["month"], s["month_end"]) + PAGE),
+    ("GET /sellout/data (count)", cr_sellout.COUNT_SQL,
+     lambda s: (s["branch"], s["month"], s["month_end"])),
+    ("POST /sellout/upload (delete bulan)", DELETE_SELLOUT_MONTH_SQL,
+     lambda s: (s["branch"], s["month"], s["month"])),
+    ("GET /mapping-error/data", cr_mapping_error.DATA_SQL,
+     lambda s: (s["error_branch"], s["month"], s["month_end"]) + PAGE),
+    ("GET /mapping-error/summary", cr_mapping_error.SUMMARY_SQL,
+     lambda s: (s["error_branch"], s["month"], s["month_end"])),
+    ("GET /customer-prc/data", crud_customer_prc.DATA_SQL,
+     lambda s: (s["kodebranch"],) + PAGE),
+    ("GET /customer-dist/data", crud_customer_dist.DATA_SQL,
+     lambda s: (s["branch_dist"],) + PAGE),
+    ("GET /product-dist/data", crud_product_dist.DATA_SQL,
+     lambda s: (s["branch_dist"],) + PAGE),
+    ("GET /mapping-customer/data", crd_mapping_customer.DATA_SQL,
+     lambda s: (s["kodebranch"],) + PAGE),
+    ("GET /mapping-product/data", crd_mapping_product.DATA_SQL,
+     lambda s: (s["branch_dist"],) + PAGE),
+    ("GET /salesman-master/data", crud_salesman_master.DATA_SQL,
+     lambda s: (s["kodebranch"],) + PAGE),
+    ("GET /mapping-salesman/data", crud_mapping_salesman.DATA_SQL,
+     lambda s: (s["kodebranch"],) + PAGE),
+    ("GET /list/area", AREA_SQL,
+     lambda s: None),
+    ("worker: klaim job (fair share)", job_queue.CLAIM_SQL,
+     lambda s: {"lease": job_queue.LEASE_SECONDS, "worker": "explain_routes", "lane": None}),
+    ("worker: reclaim lease kedaluwarsa", job_queue.RECLAIM_SQL,
+     lambda s: {"base": job_queue.RETRY_BASE_SECONDS, "max": job_queue.RETRY_MAX_SECONDS}),
+]
+
+def load_samples(cur):
+    samples = {}
+    for key, sql in SAMPLE_SQL.items():
+        try:
+            cur.execute(sql)
+            row = cur.fetchone()
+            samples[key] = row[0] if row else None
+        except Exception:
+            cur.connection.rollback()
+            samples[key] = None
+    return samples
+
+
+def table_sizes(cur):
+    cur.execute("""
+        SELECT c.relname, c.reltuples::bigint
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('r', 'p') AND n.nspname = current_schema()
+    """)
+    return dict(cur.fetchall())
+
+
+def walk_plan(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child)
+
+
+def explain(cur, sql, params):
+    cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+    result = cur.fetchone()[0]
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE query route dan tandai Seq Scan")
+    parser.add_argument("--min-rows", type=int, default=1000,
+                        help="Seq Scan pada tabel lebih kecil dari ini diabaikan")
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    flagged = 0
+
+    try:
+        samples = load_samples(cur)
+        sizes = table_sizes(cur)
+        print(f"Sampel parameter: {samples}\n")
+
+        for name, sql, params in ROUTE_QUERIES:
+            try:
+                plan = explain(cur, sql, params(samples))
+            except Exception as e:
+                conn.rollback()
+                print(f"⚠️  {name}: gagal EXPLAIN ({e})")
+                continue
+            finally:
+                # DELETE ikut dieksekusi oleh ANALYZE, jangan pernah di-commit
+                conn.rollback()
+
+            root = plan["Plan"]
+            seq_scans = [
+                n for n in walk_plan(root)
+                if n["Node Type"] == "Seq Scan"
+                and sizes.get(n.get("Relation Name"), 0) >= args.min_rows
+            ]
+            status = "❌" if seq_scans else "✅"
+            print(
+                f"{status} {name}: {plan['Execution Time']:.1f} ms, "
+                f"buffers hit={root.get('Shared Hit Blocks', 0)} read={root.get('Shared Read Blocks', 0)}"
+            )
+            for n in seq_scans:
+                flagged += 1
+                print(
+                    f"     Seq Scan on {n['Relation Name']} "
+                    f"(~{sizes.get(n['Relation Name'], 0)} rows, filter: {n.get('Filter', '-')})"
+                )
+    finally:
+        conn.rollback()
+        cur.close()
+        release_db_connection(conn)
+
+    print(f"\n{flagged} Seq Scan ditandai")
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
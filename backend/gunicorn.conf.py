@@ -0,0 +1,112 @@
+"""
+Konfigurasi gunicorn untuk wsgi:app. Dua profil worker (GUNICORN_PROFILE):
+
+    io      (default) gthread: sedikit proses, banyak thread. Cocok untuk
+            mayoritas request (paging /sellout/data, master data, /list/*)
+            yang kebanyakan menunggu PostgreSQL; thread berbagi satu pool.
+    cpu     sync: banyak proses, satu request per proses. Parse pandas saat
+            upload memegang GIL, jadi upload besar di profil io membuat
+            request baca di proses yang sama ikut lambat. Jalankan instance
+            terpisah (mis. hanya untuk /sellout/upload dan /sellout/preview)
+            jika beban upload tinggi.
+
+Semua nilai bisa di-override env: GUNICORN_WORKERS, GUNICORN_THREADS,
+GUNICORN_TIMEOUT, GUNICORN_MAX_REQUESTS, GUNICORN_BIND, GUNICORN_PRELOAD.
+
+preload_app mengimpor aplikasi sekali di master lalu fork (startup lebih
+cepat, halaman memori modul dibagi copy-on-write). Pool database TIDAK ikut
+terbuka di master: db.get_pool membuat pool per PID saat request pertama.
+Ukuran pool per proses (DB_POOL_MAX) diset dari jumlah thread bila belum
+diisi, total koneksi ke PostgreSQL = workers x DB_POOL_MAX.
+"""
+import multiprocessing
+import os
+import time
+
+from dotenv import load_dotenv
+
+# DB_POOL_MAX dari .env juga harus terlihat di sini, bukan hanya di db.py
+load_dotenv()
+
+PROFILES = {
+    "io": {
+        "worker_class": "gthread",
+        "workers": max(2, multiprocessing.cpu_count()),
+        "threads": 8
+    },
+    "cpu": {
+        "worker_class": "sync",
+        "workers": multiprocessing.cpu_count() * 2 + 1,
+        "threads": 1
+    }
+}
+
+profile_name = os.getenv("GUNICORN_PROFILE", "io")
+if profile_name not in PROFILES:
+    raise ValueError(f"GUNICORN_PROFILE '{profile_name}' tidak dikenal ({', '.join(PROFILES)})")
+profile = PROFILES[profile_name]
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+worker_class = profile["worker_class"]
+workers = int(os.getenv("GUNICORN_WORKERS", profile["workers"]))
+threads = int(os.getenv("GUNICORN_THREADS", profile["threads"]))
+
+# Upload file besar (parse + load temp) bisa lebih dari 30 detik default
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+graceful_timeout = 30
+keepalive = 5
+
+# Daur ulang worker berkala: fragmentasi memori setelah DataFrame besar
+# tidak selalu kembali ke OS. Jitter supaya tidak restart bersamaan.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = max_requests // 10
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+accesslog = "-"
+errorlog = "-"
+
+# Satu koneksi per thread + cadangan untuk /metrics (gauge antrian).
+# /readyz 503 hanya jika pool ini benar-benar habis
+pool_needed = threads + 2
+if "DB_POOL_MAX" not in os.environ:
+    os.environ["DB_POOL_MAX"] = str(pool_needed)
+elif int(os.environ["DB_POOL_MAX"]) < threads:
+    print(f"⚠️ DB_POOL_MAX={os.environ['DB_POOL_MAX']} < {threads} thread per worker: request akan dapat 503 pool habis")
+
+_boot = {}
+
+
+def on_starting(server):
+    _boot["at"] = time.monotonic()
+    server.log.info(
+        f"profil {profile_name}: {workers} worker {worker_class} x {threads} thread, "
+        f"pool {os.environ['DB_POOL_MAX']} koneksi/worker, preload={preload_app}"
+    )
+
+
+def when_ready(server):
+    if "at" in _boot:
+        server.log.info(f"siap dalam {time.monotonic() - _boot['at']:.2f} s (master)")
+
+
+def post_fork(server, worker):
+    worker._forked_at = time.monotonic()
+
+
+def post_worker_init(worker):
+    import sys
+    import metrics
+
+    metrics.PROCESS_START.set(time.time())
+    boot = time.monotonic() - getattr(worker, "_forked_at", time.monotonic())
+    worker.log.info(
+        f"worker {worker.pid} siap dalam {boot:.2f} s, RSS {metrics.process_rss() / 1024 / 1024:.1f} MB, "
+        f"pandas {'dimuat' if 'pandas' in sys.modules else 'belum dimuat'}"
+    )
+
+
+def worker_exit(server, worker):
+    from db import close_pool
+
+    close_pool()
@@ -0,0 +1,309 @@
+"""
+Registry metrics in-process dengan format teks Prometheus (exposition 0.0.4).
+
+Counter/Gauge/Histogram berlabel, thread-safe dengan satu lock per metric
+dan tanpa alokasi besar di jalur panas (observe = bisect + dua penjumlahan).
+Tiap proses punya registry sendiri: jalankan API dengan beberapa proses
+(gunicorn) berarti tiap proses di-scrape terpisah atau dijumlahkan di Prometheus.
+
+    API    : GET /metrics (init_app)
+    Worker : start_http_server(port) -> GET http://host:port/metrics
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket latency request HTTP (detik)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Bucket durasi job worker (detik): job finalize bisa sampai menit
+JOB_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{_escape(v)}"' for n, v in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"Metric {self.name} butuh label {self.labelnames}")
+        return tuple(str(v) for v in labels)
+
+    def header(self):
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}"
+        ]
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        lines = self.header()
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Nilai di-set langsung, atau dibaca dari callback saat scrape (set_function)"""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value, *labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set_function(self, function):
+        """function() -> angka (tanpa label) atau {tuple label: angka}"""
+        self._function = function
+
+    def render(self):
+        if self._function is not None:
+            value = self._function()
+            values = value if isinstance(value, dict) else {(): value}
+            with self._lock:
+                self._values = {self._key(k): v for k, v in values.items()}
+        return super().render()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [hitungan per bucket (+Inf terakhir), sum]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def render(self):
+        with self._lock:
+            items = [(k, list(s[0]), s[1]) for k, s in self._values.items()]
+        lines = self.header()
+        bounds = self.buckets + (float("inf"),)
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                return self._metrics[metric.name]
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # Callback gagal (mis. DB down) tidak boleh mematikan metrics lain
+                lines.append(f"# {metric.name} gagal dibaca: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+#  HTTP API
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "Jumlah request HTTP per route dan status",
+    ("method", "route", "status")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "Latency request HTTP per route",
+    ("method", "route")
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "Request yang sedang diproses")
+
+#  DB POOL (diisi db.py)
+DB_POOL_WAIT = REGISTRY.histogram(
+    "db_pool_acquire_seconds", "Waktu mengambil koneksi dari pool (termasuk connect baru)",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+)
+DB_POOL_IN_USE = REGISTRY.gauge("db_pool_in_use", "Koneksi pool yang sedang dipinjam")
+DB_POOL_MAX = REGISTRY.gauge("db_pool_max", "Ukuran maksimal pool")
+DB_POOL_ERRORS = REGISTRY.counter(
+    "db_pool_errors_total", "Gagal mengambil koneksi (pool habis / DB tidak bisa dihubungi)"
+)
+
+#  ANTRIAN (diisi job_queue.register_queue_metrics)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "sellout_queue_jobs", "Job di sellout_process_queue per status dan lane",
+    ("status", "lane")
+)
+QUEUE_OLDEST_PENDING = REGISTRY.gauge(
+    "sellout_queue_oldest_pending_seconds", "Umur job PENDING tertua yang sudah boleh diambil"
+)
+
+#  WORKER
+WORKER_JOBS = REGISTRY.counter(
+    "worker_jobs_total", "Job worker per tipe dan hasil (done/retry/dead/lost)",
+    ("job_type", "outcome")
+)
+WORKER_JOB_DURATION = REGISTRY.histogram(
+    "worker_job_duration_seconds", "Durasi job worker",
+    ("job_type",), buckets=JOB_BUCKETS
+)
+WORKER_ROWS = REGISTRY.counter(
+    "worker_rows_total", "Baris yang diproses worker (moved = ke sellout, error = ke mapping_error)",
+    ("kind",)
+)
+
+
+#  PROSES (RSS per worker gunicorn, lihat gunicorn.conf.py)
+PROCESS_RSS = REGISTRY.gauge("process_resident_memory_bytes", "RSS proses ini")
+PROCESS_START = REGISTRY.gauge("process_start_time_seconds", "Waktu start proses (unix)")
+
+
+def process_rss():
+    """RSS proses saat ini dalam byte (0 jika tidak bisa dibaca, mis. bukan Linux)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0
+
+
+PROCESS_RSS.set_function(process_rss)
+PROCESS_START.set(time.time())
+
+def init_app(app, route="/metrics"):
+    """Pasang hook latency/status di semua route Flask dan endpoint /metrics"""
+    from flask import Response, g, request
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_start = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+
+    @app.after_request
+    def _metrics_record(response):
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            HTTP_IN_FLIGHT.dec()
+            # Template route (/sellout/<id>) bukan path asli supaya label tidak meledak
+            rule = request.url_rule.rule if request.url_rule else "<unmatched>"
+            HTTP_LATENCY.observe(time.perf_counter() - start, request.method, rule)
+            HTTP_REQUESTS.inc(request.method, rule, response.status_code)
+        return response
+
+    @app.teardown_request
+    def _metrics_teardown(exc):
+        # Exception yang tidak tertangani tidak lewat after_request
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            HTTP_IN_FLIGHT.dec()
+            rule = request.url_rule.rule if request.url_rule else "<unmatched>"
+            HTTP_LATENCY.observe(time.perf_counter() - start, request.method, rule)
+            HTTP_REQUESTS.inc(request.method, rule, 500)
+
+    @app.route(route, methods=["GET"])
+    def metrics():
+        return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrape tiap beberapa detik tidak perlu dicetak
+        pass
+
+
+def start_http_server(port, addr="0.0.0.0"):
+    """Server /metrics di thread daemon untuk proses tanpa Flask (worker)"""
+    server = ThreadingHTTPServer((addr, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,122 @@
+import os
+import sys
+from db import get_db_connection, release_db_connection
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+NO_TRANSACTION_MARKER = "-- migrate:no-transaction"
+
+
+def split_statements(sql):
+    """Pecah file SQL per ';' dengan mengabaikan isi blok $$ ... $$ (function/trigger)"""
+    statements = []
+    current = []
+    in_dollar = False
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if not in_dollar and (not stripped or stripped.startswith("--")):
+            continue
+        current.append(line)
+        if line.count("$$") % 2 == 1:
+            in_dollar = not in_dollar
+        if not in_dollar and stripped.endswith(";"):
+            statements.append("\n".join(current).rstrip().rstrip(";"))
+            current = []
+    if "".join(current).strip():
+        statements.append("\n".join(current))
+    return statements
+
+
+def list_migrations():
+    files = sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql"))
+    return [(f.split("_", 1)[0], f) for f in files]
+
+
+def ensure_migration_table(conn):
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(20) PRIMARY KEY,
+            filename VARCHAR(200) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """)
+    conn.commit()
+    cur.close()
+
+
+def applied_versions(conn):
+    cur = conn.cursor()
+    cur.execute("SELECT version FROM schema_migrations")
+    versions = {r[0] for r in cur.fetchall()}
+    cur.close()
+    return versions
+
+
+def apply_migration(conn, version, filename):
+    with open(os.path.join(MIGRATIONS_DIR, filename), encoding="utf-8") as f:
+        sql = f.read()
+
+    statements = split_statements(sql)
+    no_transaction = sql.lstrip().startswith(NO_TRANSACTION_MARKER)
+
+    cur = conn.cursor()
+    try:
+        if no_transaction:
+            # CREATE INDEX CONCURRENTLY tidak boleh di dalam transaksi;
+            # statement harus idempotent (IF NOT EXISTS) agar aman diulang
+            conn.autocommit = True
+            for stmt in statements:
+                cur.execute(stmt)
+            conn.autocommit = False
+        else:
+            for stmt in statements:
+                cur.execute(stmt)
+
+        cur.execute(
+            "INSERT INTO schema_migrations (version, filename) VALUES (%s, %s)",
+            (version, filename)
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        conn.autocommit = False
+        raise
+    finally:
+        cur.close()
+
+
+def migrate():
+    conn = get_db_connection()
+    try:
+        ensure_migration_table(conn)
+        done = applied_versions(conn)
+        pending = [(v, f) for v, f in list_migrations() if v not in done]
+
+        if not pending:
+            print("✅ Schema sudah versi terbaru")
+            return
+
+        for version, filename in pending:
+            print(f"▶ Menjalankan {filename}")
+            apply_migration(conn, version, filename)
+        print(f"✅ {len(pending)} migration berhasil dijalankan")
+    finally:
+        release_db_connection(conn)
+
+
+def status():
+    conn = get_db_connection()
+    try:
+        ensure_migration_table(conn)
+        done = applied_versions(conn)
+        for version, filename in list_migrations():
+            print(f"{'[x]' if version in done else '[ ]'} {filename}")
+    finally:
+        release_db_connection(conn)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "status":
+        status()
+    else:
+        migrate()
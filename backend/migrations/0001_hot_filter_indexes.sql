@@ -0,0 +1,49 @@
+-- migrate:no-transaction
+-- Index untuk kolom filter yang dipakai route /data, delete per bulan
+-- dan join mapping di process_sellout_to_final.
+-- CONCURRENTLY supaya tabel besar tidak terkunci selama index dibuat.
+
+-- SELLOUT: /sellout/data + delete_sellout_final_by_month
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sellout_branch_invoice_date
+    ON sellout (branch_code, invoice_date);
+
+-- MAPPING ERROR: /mapping-error/data
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mapping_error_branch_invoice_date
+    ON mapping_error (kodebranch, invoice_date);
+
+-- MASTER PER BRANCH: /customer-prc/data, /customer-dist/data, dst
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customer_prc_branch_custno
+    ON customer_prc (kodebranch, custno);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customer_dist_branch_dist
+    ON customer_dist (branch_dist);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_product_dist_branch_dist
+    ON product_dist (branch_dist);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mapping_customer_branch_prc
+    ON mapping_customer (branch_prc);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mapping_product_branch_dist
+    ON mapping_product (branch_dist);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_salesman_master_branch_team
+    ON salesman_master (kodebranch, salesman_team);
+
+-- JOIN KEY MAPPING (sellout_temp -> mapping_*)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mapping_customer_custno_dist
+    ON mapping_customer (custno_dist);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mapping_product_pcode_dist
+    ON mapping_product (pcode_dist);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mapping_salesman_id_salesman_dist
+    ON mapping_salesman (id_salesman_dist);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mapping_branch_branch_dist
+    ON mapping_branch (branch_dist);
+
+-- SELLOUT TEMP: hanya baris yang belum dipindah ke sellout
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sellout_temp_batch_pending
+    ON sellout_temp (upload_batch_id)
+    WHERE flag_move = 'N';
@@ -0,0 +1,24 @@
+-- migrate:no-transaction
+-- Re-resolve mapping_error: simpan id baris sumber di sellout_temp supaya
+-- baris error bisa diproses ulang tanpa upload ulang file branch.
+-- Baris mapping_error lama (sellout_temp_id NULL) tidak bisa di-resolve ulang.
+ALTER TABLE mapping_error ADD COLUMN IF NOT EXISTS sellout_temp_id BIGINT;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mapping_error_sellout_temp_id
+    ON mapping_error (sellout_temp_id);
+
+-- Kode distributor yang dicari job re-resolve
+-- (kodebranch sudah tercakup idx_mapping_error_branch_invoice_date)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mapping_error_id_salesman
+    ON mapping_error (id_salesman);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mapping_error_id_customer
+    ON mapping_error (id_customer);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mapping_error_id_product
+    ON mapping_error (id_product);
+
+-- Queue worker sekarang punya lebih dari satu jenis job
+ALTER TABLE sellout_process_queue ADD COLUMN IF NOT EXISTS job_type VARCHAR(20) NOT NULL DEFAULT 'FINALIZE';
+ALTER TABLE sellout_process_queue ADD COLUMN IF NOT EXISTS payload JSONB;
+ALTER TABLE sellout_process_queue ALTER COLUMN upload_batch_id DROP NOT NULL;
@@ -0,0 +1,9 @@
+-- migrate:no-transaction
+-- /mapping-error/summary: GROUP BY (status, kode distributor) per branch dan
+-- periode bisa dijawab dengan index-only scan tanpa membaca heap mapping_error.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mapping_error_branch_date_summary
+    ON mapping_error (kodebranch, invoice_date)
+    INCLUDE (status, id_salesman, id_customer, id_product, grossamount);
+
+-- Sudah tercakup index di atas
+DROP INDEX CONCURRENTLY IF EXISTS idx_mapping_error_branch_invoice_date;
@@ -0,0 +1,12 @@
+-- Registry staging table per upload batch (sellout_stage_<uuid>).
+-- sellout_temp sekarang hanya menyimpan baris yang gagal mapping
+-- (sumber re-resolve mapping_error).
+CREATE TABLE IF NOT EXISTS sellout_staging (
+    upload_batch_id VARCHAR(36) PRIMARY KEY,
+    table_name VARCHAR(63) NOT NULL,
+    kodebranch VARCHAR(50),
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_sellout_staging_created_at
+    ON sellout_staging (created_at);
@@ -0,0 +1,22 @@
+-- Dedup upload ulang: hash file per upload dan hash isi per baris.
+-- Baris lama (row_hash NULL) membuat upload branch-bulan tersebut tetap
+-- replace penuh sampai data bulan itu di-upload ulang sekali.
+ALTER TABLE sellout_temp ADD COLUMN IF NOT EXISTS row_hash VARCHAR(32);
+ALTER TABLE sellout ADD COLUMN IF NOT EXISTS row_hash VARCHAR(32);
+
+CREATE TABLE IF NOT EXISTS sellout_upload (
+    id BIGSERIAL PRIMARY KEY,
+    branch VARCHAR(50) NOT NULL,
+    period DATE NOT NULL,
+    file_hash VARCHAR(64) NOT NULL,
+    upload_batch_id VARCHAR(36) NOT NULL,
+    row_count INTEGER NOT NULL,
+    mode VARCHAR(10) NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_sellout_upload_branch_hash
+    ON sellout_upload (branch, file_hash);
+
+CREATE INDEX IF NOT EXISTS idx_sellout_upload_branch_period
+    ON sellout_upload (branch, period, id);
@@ -0,0 +1,5 @@
+-- Engine parser csv/txt per branch ('c' = pandas default, 'pyarrow') dan
+-- format tanggal file distributor (strptime, mis. %d/%m/%Y) untuk engine
+-- dengan dtype eksplisit. Default mempertahankan perilaku lama.
+ALTER TABLE config ADD COLUMN IF NOT EXISTS parse_engine VARCHAR(10) NOT NULL DEFAULT 'c';
+ALTER TABLE config ADD COLUMN IF NOT EXISTS date_format VARCHAR(30);
@@ -0,0 +1,22 @@
+-- Siklus hidup job worker: lease + heartbeat, retry dengan backoff, dead-letter.
+-- Job PROCESSING yang lease-nya lewat diambil ulang (worker mati di tengah
+-- jalan); setelah max_attempts kali gagal job berstatus DEAD beserta errornya.
+ALTER TABLE sellout_process_queue ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE sellout_process_queue ADD COLUMN IF NOT EXISTS max_attempts INTEGER NOT NULL DEFAULT 5;
+ALTER TABLE sellout_process_queue ADD COLUMN IF NOT EXISTS available_at TIMESTAMP NOT NULL DEFAULT NOW();
+ALTER TABLE sellout_process_queue ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP;
+ALTER TABLE sellout_process_queue ADD COLUMN IF NOT EXISTS locked_by VARCHAR(100);
+ALTER TABLE sellout_process_queue ADD COLUMN IF NOT EXISTS last_error TEXT;
+
+-- Job yang tersangkut PROCESSING sebelum ada lease langsung bisa di-reclaim
+UPDATE sellout_process_queue
+SET lease_expires_at = NOW()
+WHERE status = 'PROCESSING' AND lease_expires_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_queue_pending_available
+    ON sellout_process_queue (available_at)
+    WHERE status = 'PENDING';
+
+CREATE INDEX IF NOT EXISTS idx_queue_processing_lease
+    ON sellout_process_queue (lease_expires_at)
+    WHERE status = 'PROCESSING';
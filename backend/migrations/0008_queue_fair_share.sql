@@ -0,0 +1,23 @@
+-- Penjadwalan antrian: prioritas, fair share per branch, jalur cepat.
+-- branch NULL = job tanpa branch (re-resolve), tidak ikut batas per branch.
+ALTER TABLE sellout_process_queue ADD COLUMN IF NOT EXISTS branch VARCHAR(50);
+ALTER TABLE sellout_process_queue ADD COLUMN IF NOT EXISTS priority SMALLINT NOT NULL DEFAULT 0;
+ALTER TABLE sellout_process_queue ADD COLUMN IF NOT EXISTS row_count INTEGER;
+ALTER TABLE sellout_process_queue ADD COLUMN IF NOT EXISTS lane VARCHAR(10) NOT NULL DEFAULT 'BULK';
+
+-- Job yang masih antri ikut dijadwalkan per branch
+UPDATE sellout_process_queue q
+SET branch = s.kodebranch
+FROM sellout_staging s
+WHERE s.upload_batch_id = q.upload_batch_id
+  AND q.status = 'PENDING'
+  AND q.branch IS NULL;
+
+-- Maksimal satu job berjalan per branch (klaim bersamaan ditolak index ini)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_queue_processing_branch
+    ON sellout_process_queue (branch)
+    WHERE status = 'PROCESSING' AND branch IS NOT NULL;
+
+-- Round-robin: kapan branch terakhir dilayani
+CREATE INDEX IF NOT EXISTS idx_queue_branch_started
+    ON sellout_process_queue (branch, started_at);
@@ -0,0 +1,41 @@
+-- Waktu per tahap dan jumlah baris per upload batch (ditulis route upload
+-- dan worker finalize), untuk melihat bottleneck dan regresi.
+CREATE TABLE IF NOT EXISTS sellout_batch_metrics (
+    upload_batch_id VARCHAR(36) PRIMARY KEY,
+    branch VARCHAR(50),
+    file_name VARCHAR(255),
+    mode VARCHAR(10),
+    bytes_read BIGINT,
+
+    -- route upload
+    parse_ms INTEGER,
+    transform_ms INTEGER,
+    coverage_ms INTEGER,
+    delete_ms INTEGER,
+    temp_load_ms INTEGER,
+    upload_ms INTEGER,
+    rows_total INTEGER,
+    rows_queued INTEGER,
+
+    -- worker finalize (akumulasi jika job di-retry)
+    queue_id BIGINT,
+    queue_wait_ms INTEGER,
+    finalize_ms INTEGER,
+    error_capture_ms INTEGER,
+    rows_moved INTEGER,
+    rows_error INTEGER,
+    attempts INTEGER,
+
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    finalized_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_sellout_batch_metrics_branch_created
+    ON sellout_batch_metrics (branch, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_sellout_batch_metrics_created
+    ON sellout_batch_metrics (created_at DESC);
+
+-- Status job per batch (halaman batch, sweeper staging, cek batch pending)
+CREATE INDEX IF NOT EXISTS idx_sellout_process_queue_batch
+    ON sellout_process_queue (upload_batch_id);
@@ -0,0 +1,52 @@
+-- Versi data tabel referensi, dinaikkan trigger per statement setiap
+-- insert/update/delete/truncate. process.reference_cache membandingkan
+-- versi ini di tiap lookup, jadi cache semua proses (worker gunicorn)
+-- langsung basi setelah write dari proses mana pun.
+CREATE TABLE IF NOT EXISTS reference_version (
+    table_name VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO reference_version (table_name)
+VALUES ('region'), ('entity'), ('area'), ('branch'), ('branch_dist'),
+       ('salesman_team'), ('product_prc'), ('customer_prc')
+ON CONFLICT (table_name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_reference_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE reference_version SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_reference_version ON region;
+CREATE TRIGGER trg_reference_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON region
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_reference_version();
+
+DROP TRIGGER IF EXISTS trg_reference_version ON entity;
+CREATE TRIGGER trg_reference_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON entity
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_reference_version();
+
+DROP TRIGGER IF EXISTS trg_reference_version ON area;
+CREATE TRIGGER trg_reference_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON area
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_reference_version();
+
+DROP TRIGGER IF EXISTS trg_reference_version ON branch;
+CREATE TRIGGER trg_reference_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON branch
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_reference_version();
+
+DROP TRIGGER IF EXISTS trg_reference_version ON branch_dist;
+CREATE TRIGGER trg_reference_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON branch_dist
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_reference_version();
+
+DROP TRIGGER IF EXISTS trg_reference_version ON salesman_team;
+CREATE TRIGGER trg_reference_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON salesman_team
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_reference_version();
+
+DROP TRIGGER IF EXISTS trg_reference_version ON product_prc;
+CREATE TRIGGER trg_reference_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON product_prc
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_reference_version();
+
+DROP TRIGGER IF EXISTS trg_reference_version ON customer_prc;
+CREATE TRIGGER trg_reference_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON customer_prc
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_reference_version();
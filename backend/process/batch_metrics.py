@@ -0,0 +1,128 @@
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """Durasi (ms) per tahap; tahap yang sama dijumlahkan"""
+
+    def __init__(self):
+        self.stages = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stages[name] = self.stages.get(name, 0) + elapsed
+
+    def ms(self, name):
+        value = self.stages.get(name)
+        return round(value) if value is not None else None
+
+    def total_ms(self):
+        return round((time.perf_counter() - self._started) * 1000)
+
+
+def record_upload_metrics(conn, upload_batch_id, branch, file_name, bytes_read,
+                          mode, timer, rows_total, rows_queued):
+    """
+    Ditulis di transaksi upload, bukan transaksi sendiri: commit bersama
+    data upload dan ikut rollback jika upload gagal
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            INSERT INTO sellout_batch_metrics (
+                upload_batch_id, branch, file_name, mode, bytes_read,
+                parse_ms, transform_ms, coverage_ms, delete_ms, temp_load_ms, upload_ms,
+                rows_total, rows_queued, created_at
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+            ON CONFLICT (upload_batch_id) DO NOTHING
+        """, (
+            upload_batch_id, branch, file_name, mode, bytes_read,
+            timer.ms("parse"), timer.ms("transform"), timer.ms("coverage"),
+            timer.ms("delete"), timer.ms("temp_load"), timer.total_ms(),
+            rows_total, rows_queued
+        ))
+    finally:
+        cur.close()
+
+
+def record_finalize_metrics(conn, upload_batch_id, queue_id, timer, rows_moved, rows_error):
+    """Akumulasi hasil worker; baris dibuat jika batch lama belum punya metrics"""
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            INSERT INTO sellout_batch_metrics (
+                upload_batch_id, branch, queue_id, queue_wait_ms,
+                finalize_ms, error_capture_ms, rows_moved, rows_error,
+                attempts, finalized_at
+            )
+            SELECT %(batch)s, q.branch, q.id,
+                   (EXTRACT(EPOCH FROM q.started_at - q.created_at) * 1000)::int,
+                   %(finalize)s, %(error_capture)s, %(moved)s, %(errors)s,
+                   q.attempts, NOW()
+            FROM sellout_process_queue q
+            WHERE q.id = %(queue_id)s
+            ON CONFLICT (upload_batch_id) DO UPDATE SET
+                queue_id = EXCLUDED.queue_id,
+                queue_wait_ms = COALESCE(sellout_batch_metrics.queue_wait_ms, EXCLUDED.queue_wait_ms),
+                finalize_ms = COALESCE(sellout_batch_metrics.finalize_ms, 0) + EXCLUDED.finalize_ms,
+                error_capture_ms = COALESCE(sellout_batch_metrics.error_capture_ms, 0) + EXCLUDED.error_capture_ms,
+                rows_moved = COALESCE(sellout_batch_metrics.rows_moved, 0) + EXCLUDED.rows_moved,
+                rows_error = COALESCE(sellout_batch_metrics.rows_error, 0) + EXCLUDED.rows_error,
+                attempts = EXCLUDED.attempts,
+                finalized_at = EXCLUDED.finalized_at
+        """, {
+            "batch": str(upload_batch_id),
+            "queue_id": queue_id,
+            "finalize": timer.ms("finalize") or 0,
+            "error_capture": timer.ms("error_capture") or 0,
+            "moved": rows_moved,
+            "errors": rows_error
+        })
+        conn.commit()
+    finally:
+        cur.close()
+
+
+# Throughput dihitung saat dibaca supaya selalu konsisten dengan durasinya
+BATCH_METRICS_SQL = """
+    SELECT
+        m.upload_batch_id, m.branch, m.file_name, m.mode, m.bytes_read,
+        m.parse_ms, m.transform_ms, m.coverage_ms, m.delete_ms, m.temp_load_ms, m.upload_ms,
+        m.rows_total, m.rows_queued,
+        m.queue_wait_ms, m.finalize_ms, m.error_capture_ms,
+        m.rows_moved, m.rows_error, m.attempts,
+        ROUND(m.rows_total * 1000.0 / NULLIF(m.upload_ms, 0), 1)::float8 AS upload_rows_per_sec,
+        ROUND((m.rows_moved + m.rows_error) * 1000.0
+              / NULLIF(m.finalize_ms + m.error_capture_ms, 0), 1)::float8 AS finalize_rows_per_sec,
+        ROUND(m.bytes_read * 1000.0 / NULLIF(m.parse_ms, 0) / 1048576, 2)::float8 AS parse_mb_per_sec,
+        q.status AS queue_status, q.priority AS queue_priority,
+        m.created_at, m.finalized_at
+    FROM sellout_batch_metrics m
+    LEFT JOIN LATERAL (
+        SELECT status, priority
+        FROM sellout_process_queue
+        WHERE upload_batch_id = m.upload_batch_id
+        ORDER BY id DESC
+        LIMIT 1
+    ) q ON TRUE
+    WHERE (%(branch)s::text IS NULL OR m.branch = %(branch)s::text)
+    ORDER BY m.created_at DESC
+    LIMIT %(limit)s OFFSET %(offset)s
+"""
+
+
+def list_batch_metrics(conn, branch=None, limit=50, offset=0):
+    cur = conn.cursor()
+    try:
+        cur.execute(BATCH_METRICS_SQL, {"branch": branch, "limit": limit, "offset": offset})
+        columns = [d[0] for d in cur.description]
+        return [dict(zip(columns, r)) for r in cur.fetchall()]
+    finally:
+        cur.close()
@@ -0,0 +1,95 @@
+import importlib.util
+import os
+from datetime import date, datetime
+
+import pandas as pd
+
+# Reader xlsx: "auto" = calamine (Rust, pip install python-calamine) jika
+# terpasang, selain itu openpyxl read_only. "openpyxl"/"calamine" memaksa.
+EXCEL_READER = os.getenv("EXCEL_READER", "auto")
+
+
+def _openpyxl_rows(file):
+    """Streaming per baris, workbook tidak dimuat utuh ke memori (DOM)"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for row in wb.worksheets[0].iter_rows(values_only=True):
+            yield row
+    finally:
+        wb.close()
+
+
+def _calamine_cell(value):
+    # Samakan dengan openpyxl: sel kosong None, angka bulat int, tanggal datetime
+    if value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if type(value) is date:
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def _calamine_rows(file):
+    from python_calamine import CalamineWorkbook
+
+    sheet = CalamineWorkbook.from_filelike(file).get_sheet_by_index(0)
+    for row in sheet.to_python(skip_empty_area=False):
+        yield [_calamine_cell(v) for v in row]
+
+
+ROW_READERS = {"openpyxl": _openpyxl_rows, "calamine": _calamine_rows}
+
+
+def resolve_reader(name=None, nrows=None):
+    name = name or EXCEL_READER
+    if name == "auto":
+        # calamine memuat seluruh sheet sekaligus; untuk beberapa baris
+        # (preview) streaming openpyxl berhenti lebih awal
+        if nrows is None and importlib.util.find_spec("python_calamine"):
+            return "calamine"
+        return "openpyxl"
+    if name not in ROW_READERS:
+        raise ValueError(f"Excel reader '{name}' tidak dikenal (auto/openpyxl/calamine)")
+    return name
+
+
+def iter_rows(file, skiprows=0, usecols=None, reader=None, nrows=None):
+    """
+    Baris sheet pertama satu per satu (tuple), mulai baris ke-skiprows+1,
+    maksimal nrows baris. usecols (index 0-based) memproyeksikan kolom;
+    kolom di luar lebar baris jadi None. Baris yang kosong semua dilewati.
+    """
+    if nrows is not None and nrows <= 0:
+        return
+    rows = ROW_READERS[resolve_reader(reader, nrows)](file)
+    taken = 0
+    for n, row in enumerate(rows):
+        if n < skiprows:
+            continue
+        if usecols is not None:
+            width = len(row)
+            row = tuple(row[i] if i < width else None for i in usecols)
+        if all(v is None for v in row):
+            continue
+        yield tuple(row)
+        taken += 1
+        if nrows is not None and taken >= nrows:
+            break
+
+
+def read_excel(file, skiprows=0, usecols=None, reader=None, nrows=None):
+    """
+    Pengganti pd.read_excel(header=None): label kolom = index kolom asli
+    (0-based), sama seperti hasil load_file untuk csv/txt.
+    """
+    records = list(iter_rows(file, skiprows, usecols, reader, nrows))
+    if usecols is None:
+        width = max((len(r) for r in records), default=0)
+        records = [r + (None,) * (width - len(r)) for r in records]
+        columns = list(range(width))
+    else:
+        columns = list(usecols)
+    return pd.DataFrame.from_records(records, columns=columns)
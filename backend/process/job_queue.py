@@ -0,0 +1,360 @@
+import os
+import socket
+import threading
+import time
+import traceback
+
+from psycopg2 import errors
+
+from db import get_db_connection, release_db_connection
+from metrics import QUEUE_DEPTH, QUEUE_OLDEST_PENDING
+
+# Lease job PROCESSING; diperpanjang heartbeat selama job berjalan. Worker
+# yang mati berhenti heartbeat, job-nya di-reclaim setelah lease lewat
+LEASE_SECONDS = 120
+HEARTBEAT_INTERVAL = 30
+
+# Backoff retry: RETRY_BASE_SECONDS * 2^(attempts-1), maksimal RETRY_MAX_SECONDS
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+# Job upload dengan baris <= ini masuk jalur cepat (lane FAST), dilayani
+# juga oleh worker khusus --lane fast sehingga tidak antri di belakang file besar
+FAST_LANE_MAX_ROWS = 5000
+LANES = {"FAST", "BULK"}
+
+# Rentang prioritas job finalize (lebih besar = diklaim lebih dulu)
+MIN_PRIORITY = 0
+MAX_PRIORITY = 10
+
+# Klaim yang bentrok dengan index satu-job-per-branch dicoba ulang sekian kali
+CLAIM_RETRIES = 3
+
+# Panjang maksimal teks error yang disimpan di last_error
+MAX_ERROR_LENGTH = 4000
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Status setelah gagal: retry (PENDING + backoff) atau dead-letter
+FAIL_STATUS_SQL = """
+    CASE WHEN attempts >= max_attempts THEN 'DEAD' ELSE 'PENDING' END
+"""
+BACKOFF_SQL = """
+    NOW() + make_interval(secs => LEAST(%(max)s, %(base)s * power(2, GREATEST(attempts - 1, 0))))
+"""
+
+
+RECLAIM_SQL = f"""
+    UPDATE sellout_process_queue
+    SET status = {FAIL_STATUS_SQL},
+        available_at = {BACKOFF_SQL},
+        last_error = 'Lease kedaluwarsa (worker ' || COALESCE(locked_by, '?') || ' berhenti heartbeat)',
+        lease_expires_at = NULL,
+        locked_by = NULL,
+        finished_at = CASE WHEN attempts >= max_attempts THEN NOW() END
+    WHERE status = 'PROCESSING'
+      AND lease_expires_at < NOW()
+    RETURNING id, status
+"""
+
+
+def _backoff_params():
+    return {"base": RETRY_BASE_SECONDS, "max": RETRY_MAX_SECONDS}
+
+
+def reclaim_expired(conn):
+    """
+    Job PROCESSING yang lease-nya lewat (worker mati / hang) dikembalikan
+    ke antrian dengan backoff, atau DEAD jika percobaan sudah habis.
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(RECLAIM_SQL, _backoff_params())
+        reclaimed = cur.fetchall()
+        conn.commit()
+        return reclaimed
+    finally:
+        cur.close()
+
+
+def lane_for(row_count):
+    return "FAST" if row_count is not None and row_count <= FAST_LANE_MAX_ROWS else "BULK"
+
+
+def clamp_priority(value):
+    """Prioritas dari input user (form/JSON), dibatasi ke MIN_PRIORITY..MAX_PRIORITY"""
+    try:
+        priority = int(value)
+    except (TypeError, ValueError):
+        return MIN_PRIORITY
+    return max(MIN_PRIORITY, min(priority, MAX_PRIORITY))
+
+
+def set_priority(conn, upload_batch_id, priority):
+    """Ubah prioritas job finalize batch yang masih PENDING. Return True jika ada job yang berubah"""
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            UPDATE sellout_process_queue
+            SET priority = %s
+            WHERE upload_batch_id = %s
+              AND status = 'PENDING'
+        """, (clamp_priority(priority), str(upload_batch_id)))
+        changed = cur.rowcount > 0
+        conn.commit()
+        return changed
+    finally:
+        cur.close()
+
+
+def enqueue_finalize(cur, upload_batch_id, branch, row_count, priority=MIN_PRIORITY):
+    cur.execute("""
+        INSERT INTO sellout_process_queue
+            (upload_batch_id, status, created_at, branch, row_count, lane, priority)
+        VALUES (%s, 'PENDING', NOW(), %s, %s, %s, %s)
+    """, (upload_batch_id, branch, row_count, lane_for(row_count), priority))
+
+
+# Urutan klaim: prioritas, lalu branch yang paling lama tidak dilayani
+# (round-robin antar branch), lalu FIFO. Branch yang sedang punya job
+# berjalan dilewati (fair share: satu job per branch).
+CLAIM_SQL = """
+    UPDATE sellout_process_queue q
+    SET status = 'PROCESSING',
+        started_at = NOW(),
+        attempts = q.attempts + 1,
+        lease_expires_at = NOW() + make_interval(secs => %(lease)s),
+        locked_by = %(worker)s
+    WHERE q.id = (
+        SELECT c.id
+        FROM sellout_process_queue c
+        WHERE c.status = 'PENDING'
+          AND c.available_at <= NOW()
+          AND (%(lane)s::text IS NULL OR c.lane = %(lane)s::text)
+          AND NOT EXISTS (
+              SELECT 1 FROM sellout_process_queue r
+              WHERE r.branch = c.branch
+                AND r.status = 'PROCESSING'
+          )
+        ORDER BY c.priority DESC,
+                 (SELECT MAX(h.started_at)
+                  FROM sellout_process_queue h
+                  WHERE h.branch = c.branch) ASC NULLS FIRST,
+                 c.created_at
+        LIMIT 1
+        FOR UPDATE OF c SKIP LOCKED
+    )
+    RETURNING q.id, q.upload_batch_id, q.job_type, q.payload, q.attempts, q.max_attempts
+"""
+
+
+def claim_job(conn, worker_id=WORKER_ID, lane=None):
+    """
+    Ambil satu job PENDING yang sudah waktunya, set lease. lane=None
+    mengambil semua jalur. None jika tidak ada job yang bisa diambil.
+    """
+    params = {"lease": LEASE_SECONDS, "worker": worker_id, "lane": lane}
+    cur = conn.cursor()
+    try:
+        for _ in range(CLAIM_RETRIES):
+            try:
+                cur.execute(CLAIM_SQL, params)
+            except errors.UniqueViolation:
+                # Worker lain baru saja mengambil job branch yang sama
+                conn.rollback()
+                continue
+            job = cur.fetchone()
+            conn.commit()
+            return job
+        return None
+    finally:
+        cur.close()
+
+
+def complete_job(conn, job_id, worker_id=WORKER_ID):
+    """False jika lease sudah diambil worker lain (hasil tetap aman, finalize idempoten)"""
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            UPDATE sellout_process_queue
+            SET status = 'DONE',
+                finished_at = NOW(),
+                lease_expires_at = NULL,
+                last_error = NULL
+            WHERE id = %s
+              AND status = 'PROCESSING'
+              AND locked_by = %s
+        """, (job_id, worker_id))
+        done = cur.rowcount == 1
+        conn.commit()
+        return done
+    finally:
+        cur.close()
+
+
+def fail_job(conn, job_id, error, worker_id=WORKER_ID, permanent=False):
+    """
+    Catat error; job dijadwalkan ulang dengan backoff atau DEAD. permanent=True
+    langsung DEAD (retry tidak akan berhasil). Return status baru
+    """
+    params = _backoff_params()
+    params.update({
+        "error": error[-MAX_ERROR_LENGTH:],
+        "id": job_id,
+        "worker": worker_id,
+        "permanent": permanent
+    })
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            UPDATE sellout_process_queue
+            SET status = CASE WHEN %(permanent)s THEN 'DEAD' ELSE {FAIL_STATUS_SQL} END,
+                available_at = {BACKOFF_SQL},
+                last_error = %(error)s,
+                lease_expires_at = NULL,
+                locked_by = NULL,
+                finished_at = CASE WHEN %(permanent)s OR attempts >= max_attempts THEN NOW() END
+            WHERE id = %(id)s
+              AND status = 'PROCESSING'
+              AND locked_by = %(worker)s
+            RETURNING status
+        """, params)
+        row = cur.fetchone()
+        conn.commit()
+        return row[0] if row else None
+    finally:
+        cur.close()
+
+
+def format_error(exc):
+    return "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+
+
+class Heartbeat:
+    """
+    Thread yang memperpanjang lease job selama diproses, dengan koneksi
+    sendiri (koneksi job sedang dipakai transaksi panjang finalize).
+    """
+
+    def __init__(self, job_id, worker_id=WORKER_ID, interval=HEARTBEAT_INTERVAL):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            conn = get_db_connection()
+            cur = conn.cursor()
+            try:
+                cur.execute("""
+                    UPDATE sellout_process_queue
+                    SET lease_expires_at = NOW() + make_interval(secs => %s)
+                    WHERE id = %s
+                      AND status = 'PROCESSING'
+                      AND locked_by = %s
+                """, (LEASE_SECONDS, self.job_id, self.worker_id))
+                renewed = cur.rowcount == 1
+                conn.commit()
+                if not renewed:
+                    self.lost = True
+                    print(f"⚠️ Lease job {self.job_id} sudah diambil worker lain")
+                    return
+            except Exception as e:
+                conn.rollback()
+                print("⚠️ Heartbeat gagal:", e)
+            finally:
+                cur.close()
+                release_db_connection(conn)
+
+
+def queue_stats(conn, hours=24):
+    """Antrian & waktu tunggu (created_at -> started_at) per branch dalam `hours` jam terakhir"""
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT
+                COALESCE(branch, '(re-resolve)') AS branch,
+                COUNT(1) FILTER (WHERE status = 'PENDING') AS pending,
+                COUNT(1) FILTER (WHERE status = 'PROCESSING') AS running,
+                COUNT(1) FILTER (WHERE status = 'DONE') AS done,
+                COUNT(1) FILTER (WHERE status = 'DEAD') AS dead,
+                ROUND(EXTRACT(EPOCH FROM MAX(NOW() - created_at) FILTER (WHERE status = 'PENDING'))::numeric, 1)::float8
+                    AS oldest_pending_s,
+                ROUND(EXTRACT(EPOCH FROM AVG(started_at - created_at))::numeric, 1)::float8 AS avg_wait_s,
+                ROUND(EXTRACT(EPOCH FROM percentile_cont(0.95) WITHIN GROUP (ORDER BY started_at - created_at))::numeric, 1)::float8
+                    AS p95_wait_s,
+                ROUND(EXTRACT(EPOCH FROM MAX(started_at - created_at))::numeric, 1)::float8 AS max_wait_s
+            FROM sellout_process_queue
+            WHERE created_at >= NOW() - make_interval(hours => %s)
+               OR status IN ('PENDING', 'PROCESSING')
+            GROUP BY 1
+            ORDER BY pending DESC, avg_wait_s DESC NULLS LAST
+        """, (hours,))
+        columns = [d[0] for d in cur.description]
+        return [dict(zip(columns, r)) for r in cur.fetchall()]
+    finally:
+        cur.close()
+
+
+# Hasil query kedalaman antrian di-cache supaya scrape yang sering tidak
+# membebani DB
+QUEUE_METRICS_TTL = 10
+
+
+def queue_depth(conn):
+    """{(status, lane): jumlah} untuk status aktif, dan umur PENDING tertua (detik)"""
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT status, COALESCE(lane, 'BULK'), COUNT(1)
+            FROM sellout_process_queue
+            WHERE status IN ('PENDING', 'PROCESSING', 'DEAD')
+            GROUP BY 1, 2
+        """)
+        depth = {(status, lane): count for status, lane, count in cur.fetchall()}
+        cur.execute("""
+            SELECT COALESCE(EXTRACT(EPOCH FROM NOW() - MIN(created_at)), 0)::float8
+            FROM sellout_process_queue
+            WHERE status = 'PENDING'
+              AND available_at <= NOW()
+        """)
+        oldest = cur.fetchone()[0]
+        conn.commit()
+        return depth, oldest
+    finally:
+        cur.close()
+
+
+def register_queue_metrics():
+    """Isi gauge antrian di registry metrics, dibaca saat /metrics di-scrape"""
+    state = {"at": 0, "depth": {}, "oldest": 0}
+    lock = threading.Lock()
+
+    def refresh():
+        with lock:
+            if time.monotonic() - state["at"] > QUEUE_METRICS_TTL:
+                conn = get_db_connection()
+                try:
+                    state["depth"], state["oldest"] = queue_depth(conn)
+                    state["at"] = time.monotonic()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    release_db_connection(conn)
+            return state
+
+    QUEUE_DEPTH.set_function(lambda: refresh()["depth"])
+    QUEUE_OLDEST_PENDING.set_function(lambda: refresh()["oldest"])
@@ -0,0 +1,65 @@
+from collections import Counter
+
+# dimensi -> (field baris sellout_temp, tabel mapping, kolom kode distributor)
+COVERAGE_DIMENSIONS = {
+    "branch": ("kodebranch", "mapping_branch", "branch_dist"),
+    "salesman": ("id_salesman", "mapping_salesman", "id_salesman_dist"),
+    "customer": ("id_customer", "mapping_customer", "custno_dist"),
+    "product": ("id_product", "mapping_product", "pcode_dist"),
+}
+
+# Jumlah kode belum ter-mapping yang dikirim balik per dimensi (urut baris terbanyak)
+MAX_CODES = 200
+
+
+def _unmapped_codes(cur, table, column, codes):
+    # Anti-join unnest(array) vs tabel mapping: satu query per dimensi,
+    # planner memakai hash anti join / index tanpa perlu temp table
+    cur.execute(f"""
+        SELECT u.code
+        FROM unnest(%s::text[]) AS u(code)
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {table} m WHERE m.{column} = u.code
+        )
+    """, (list(codes),))
+    return {r[0] for r in cur.fetchall()}
+
+
+def mapping_coverage(conn, rows, max_codes=MAX_CODES):
+    """
+    Cek kode distributor di file (hasil process_sellout) terhadap tabel
+    mapping sebelum data disimpan. Return laporan coverage per dimensi.
+    """
+    cur = conn.cursor()
+    dimensions = {}
+    unmapped_by_field = {}
+
+    try:
+        for dimension, (field, table, column) in COVERAGE_DIMENSIONS.items():
+            lines = Counter(r[field] for r in rows)
+            unmapped = _unmapped_codes(cur, table, column, lines.keys())
+            unmapped_by_field[field] = unmapped
+
+            top = sorted(unmapped, key=lambda c: (-lines[c], c))[:max_codes]
+            dimensions[dimension] = {
+                "distinct_codes": len(lines),
+                "unmapped_codes": len(unmapped),
+                "unmapped_lines": sum(lines[c] for c in unmapped),
+                "codes": [{"code": c, "lines": lines[c]} for c in top]
+            }
+    finally:
+        cur.close()
+
+    mapped_lines = sum(
+        1 for r in rows
+        if not any(r[field] in codes for field, codes in unmapped_by_field.items())
+    )
+    total = len(rows)
+
+    return {
+        "total_lines": total,
+        "mapped_lines": mapped_lines,
+        "coverage_pct": round(mapped_lines * 100 / total, 2) if total else 100.0,
+        "fully_mapped": mapped_lines == total,
+        "dimensions": dimensions
+    }
@@ -0,0 +1,187 @@
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+# Index kandidat (customer_prc per branch / product_prc) disimpan sebentar
+# supaya beberapa request saran berturut-turut tidak membangun ulang index
+INDEX_TTL = 300
+
+# Trigram yang dimiliki lebih dari sekian kandidat tidak dipakai untuk
+# blocking (mis. "JAY", "MAK"). Batas absolut, bukan fraksi, supaya biaya
+# satu pencarian tidak ikut membesar dengan jumlah kandidat
+MAX_GRAM_DF = 2000
+
+# Per pencarian hanya trigram paling jarang (IDF tertinggi) yang dipakai:
+# biaya blocking <= QUERY_GRAMS x MAX_GRAM_DF berapapun jumlah kandidat
+QUERY_GRAMS = 12
+
+# Jumlah kandidat (overlap trigram terbanyak) yang dihitung skor penuhnya
+BLOCK_SIZE = 50
+
+# Kata umum yang tidak membedakan nama
+STOPWORDS = {"PT", "CV", "UD", "PD", "TB", "TK", "TOKO", "APOTEK", "KIOS", "WARUNG"}
+
+_lock = threading.Lock()
+_indexes = {}
+
+
+def normalize(text):
+    text = re.sub(r"[^A-Z0-9 ]+", " ", str(text or "").upper())
+    return " ".join(w for w in text.split() if w not in STOPWORDS)
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(a, b):
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class TrigramIndex:
+    """Inverted index trigram -> kandidat, untuk blocking tanpa all-pairs"""
+
+    def __init__(self, candidates, text_of):
+        self.candidates = candidates
+        self.grams = [trigrams(normalize(text_of(c))) for c in candidates]
+
+        postings = defaultdict(list)
+        for idx, grams in enumerate(self.grams):
+            for g in grams:
+                postings[g].append(idx)
+
+        self.postings = {g: ids for g, ids in postings.items() if len(ids) <= MAX_GRAM_DF}
+
+    def search(self, text, top_n=3, min_score=0.3):
+        grams = trigrams(normalize(text))
+        rare = sorted((g for g in grams if g in self.postings), key=lambda g: len(self.postings[g]))
+        overlap = Counter()
+        for g in rare[:QUERY_GRAMS]:
+            overlap.update(self.postings[g])
+
+        scored = []
+        for idx, _ in overlap.most_common(BLOCK_SIZE):
+            score = dice(grams, self.grams[idx])
+            if score >= min_score:
+                scored.append((score, idx))
+
+        scored.sort(key=lambda s: -s[0])
+        return [(round(score, 4), self.candidates[idx]) for score, idx in scored[:top_n]]
+
+
+def _get_index(key, load, text_of):
+    with _lock:
+        entry = _indexes.get(key)
+        if entry and time.monotonic() - entry[0] < INDEX_TTL:
+            return entry[1]
+
+    index = TrigramIndex(load(), text_of)
+    with _lock:
+        _indexes[key] = (time.monotonic(), index)
+    return index
+
+
+def _fetch(cur, sql, params):
+    cur.execute(sql, params)
+    columns = [d[0] for d in cur.description]
+    return [dict(zip(columns, r)) for r in cur.fetchall()]
+
+
+def suggest_customers(conn, branch_dist, top_n=3, min_score=0.3, limit=None):
+    """
+    Saran custno PRC untuk customer_dist branch_dist yang belum ter-mapping
+    (limit=None -> LIMIT NULL, semua baris).
+    Kandidat dibatasi ke customer_prc di branch PRC hasil mapping_branch.
+    customer_dist hanya punya nama, jadi skor = kemiripan nama; kota PRC
+    yang ikut muncul di nama distributor menambah skor sedikit.
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT kodebranch FROM mapping_branch WHERE branch_dist = %s", (branch_dist,))
+        kodebranches = [r[0] for r in cur.fetchall()]
+        if not kodebranches:
+            return []
+
+        unmapped = _fetch(cur, """
+            SELECT cd.custno_dist, cd.custname
+            FROM customer_dist cd
+            WHERE cd.branch_dist = %s
+              AND NOT EXISTS (
+                  SELECT 1 FROM mapping_customer mc WHERE mc.custno_dist = cd.custno_dist
+              )
+            ORDER BY cd.custno_dist
+            LIMIT %s
+        """, (branch_dist, limit))
+
+        index = _get_index(
+            ("customer_prc", tuple(sorted(kodebranches))),
+            lambda: _fetch(cur, """
+                SELECT custno, custname, custadd, city, kodebranch
+                FROM customer_prc
+                WHERE kodebranch = ANY(%s)
+            """, (kodebranches,)),
+            lambda c: c["custname"]
+        )
+    finally:
+        cur.close()
+
+    result = []
+    for row in unmapped:
+        dist_words = set(normalize(row["custname"]).split())
+        candidates = []
+        for score, cand in index.search(row["custname"], top_n=top_n * 2, min_score=min_score):
+            city = normalize(cand.get("city"))
+            if city and set(city.split()) <= dist_words:
+                score = min(1.0, round(score + 0.05, 4))
+            candidates.append(dict(cand, score=score))
+        candidates.sort(key=lambda c: -c["score"])
+
+        result.append({
+            "custno_dist": row["custno_dist"],
+            "custname_dist": row["custname"],
+            "branch_dist": branch_dist,
+            "candidates": candidates[:top_n]
+        })
+    return result
+
+
+def suggest_products(conn, branch_dist, top_n=3, min_score=0.3, limit=None):
+    """Saran pcode PRC untuk product_dist branch_dist yang belum ter-mapping"""
+    cur = conn.cursor()
+    try:
+        unmapped = _fetch(cur, """
+            SELECT pd.pcode_dist, pd.pcodename
+            FROM product_dist pd
+            WHERE pd.branch_dist = %s
+              -- Predikat sama dengan finalize (JOIN mapping_product hanya by pcode_dist)
+              AND NOT EXISTS (
+                  SELECT 1 FROM mapping_product mp WHERE mp.pcode_dist = pd.pcode_dist
+              )
+            ORDER BY pd.pcode_dist
+            LIMIT %s
+        """, (branch_dist, limit))
+
+        index = _get_index(
+            ("product_prc",),
+            lambda: _fetch(cur, "SELECT pcode, pcodename, prlinname FROM product_prc", None),
+            lambda c: c["pcodename"]
+        )
+    finally:
+        cur.close()
+
+    return [
+        {
+            "pcode_dist": row["pcode_dist"],
+            "pcodename_dist": row["pcodename"],
+            "branch_dist": branch_dist,
+            "candidates": [
+                dict(cand, score=score)
+                for score, cand in index.search(row["pcodename"], top_n=top_n, min_score=min_score)
+            ]
+        }
+        for row in unmapped
+    ]
@@ -0,0 +1,198 @@
+import copy
+import threading
+import time
+
+# Plan disimpan per proses; invalidate() dipanggil route config setelah
+# insert/update/delete. TTL membatasi plan basi di proses gunicorn lain
+PLAN_TTL = 300
+
+# Batas wajar nomor kolom di config (1-based)
+MAX_COLUMN = 500
+
+FILE_EXTENSIONS = {"xlsx", "csv", "txt"}
+DEFAULT_SEPARATOR = {"csv": ",", "txt": "|"}
+
+# Engine parser csv/txt: "c" = pandas default (semua kolom di-infer),
+# "pyarrow" = multithread, hanya kolom terpakai, dtype eksplisit
+PARSE_ENGINES = {"c", "pyarrow"}
+
+# Kolom config yang wajib ada (tanpa ini baris tidak bisa di-mapping)
+REQUIRED_FIELDS = ("kodebranch", "id_salesman", "id_customer", "id_product", "invoice_date")
+
+# Kolom yang diambil apa adanya dari file (kolom 0/kosong -> None)
+VALUE_FIELDS = (
+    "qty1", "qty2", "qty3", "price", "grossamount", "dpp", "nett", "tax",
+    "discount1", "discount2", "discount3", "discount4",
+    "discount5", "discount6", "discount7", "discount8", "total_discount",
+    "order_no", "order_date", "invoice_no", "invoice_date", "invoice_type",
+)
+
+# Kode distributor selalu disimpan sebagai teks
+STR_FIELDS = ("kodebranch", "id_salesman", "id_customer", "id_product")
+
+# Tipe kolom untuk engine dengan dtype eksplisit (field lain: teks)
+NUMERIC_FIELDS = (
+    "qty1", "qty2", "qty3", "price", "grossamount", "dpp", "nett", "tax",
+    "discount1", "discount2", "discount3", "discount4",
+    "discount5", "discount6", "discount7", "discount8", "total_discount",
+)
+DATE_FIELDS = ("order_date", "invoice_date")
+
+_lock = threading.Lock()
+_plans = {}
+
+
+class ParsePlan:
+    """
+    Config branch yang sudah dikompilasi: posisi kolom (0-based, -1 = tidak
+    dipakai), aturan bonus, dan parameter baca file. Dibuat sekali, dipakai
+    ulang setiap upload/preview branch tsb.
+    """
+
+    def __init__(self, config):
+        self.source = config
+        self.branch = config.get("branch")
+
+        ext = str(config.get("file_extension") or "").strip().lower()
+        if ext not in FILE_EXTENSIONS:
+            raise ValueError(f"file_extension '{ext}' tidak didukung (xlsx/csv/txt)")
+        self.file_extension = ext
+        self.separator = config.get("separator_file") or DEFAULT_SEPARATOR.get(ext)
+
+        engine = str(config.get("parse_engine") or "c").strip().lower()
+        if engine not in PARSE_ENGINES:
+            raise ValueError(f"parse_engine '{engine}' tidak dikenal (c/pyarrow)")
+        if engine == "pyarrow" and ext != "xlsx" and len(self.separator) != 1:
+            raise ValueError("parse_engine pyarrow hanya mendukung separator 1 karakter")
+        self.engine = engine
+
+        date_format = config.get("date_format") or None
+        if date_format is not None and "%" not in date_format:
+            raise ValueError(f"date_format '{date_format}' harus format strptime, mis. %d/%m/%Y")
+        self.date_format = date_format
+
+        first_row = _to_index(config.get("first_row"), "first_row") or 1
+        self.skiprows = first_row - 1
+
+        self.columns = {}
+        for field in STR_FIELDS + VALUE_FIELDS:
+            idx = _to_index(config.get(field), field)
+            self.columns[field] = idx - 1 if idx else -1
+
+        missing = [f for f in REQUIRED_FIELDS if self.columns[f] < 0]
+        if missing:
+            raise ValueError(f"Kolom wajib belum diisi di config: {', '.join(missing)}")
+
+        bonus = _to_index(config.get("flag_bonus"), "flag_bonus")
+        self.bonus_column = bonus - 1 if bonus else -1
+        # Tanpa kolom grossamount, gross = qty3 * price
+        self.derive_gross = self.columns["grossamount"] < 0
+
+        # Kolom file yang dibaca (usecols) beserta tipenya
+        self.dtypes = {}
+        for field, idx in self.columns.items():
+            if idx < 0:
+                continue
+            if field in NUMERIC_FIELDS:
+                kind = "num"
+            elif field in DATE_FIELDS and self.date_format:
+                kind = "date"
+            else:
+                kind = "str"
+            # Kolom yang sama dipakai dua field -> teks menang
+            self.dtypes[idx] = kind if self.dtypes.get(idx, kind) == kind else "str"
+        if self.bonus_column >= 0:
+            self.dtypes[self.bonus_column] = "str"
+        self.usecols = sorted(self.dtypes)
+
+    @property
+    def typed_columns(self):
+        """True jika loader mengonversi tipe kolom (pyarrow csv/txt), bukan PostgreSQL"""
+        return self.engine == "pyarrow" and self.file_extension != "xlsx"
+
+    def as_text(self):
+        """Salinan plan yang membaca semua kolom sebagai teks (preview sel yang gagal konversi)"""
+        plan = copy.copy(self)
+        plan.dtypes = dict.fromkeys(self.dtypes, "str")
+        return plan
+
+    def bind(self, labels):
+        """
+        Index vector terhadap kolom DataFrame hasil load_file (label = nomor
+        kolom asli 0-based, dengan atau tanpa usecols). Kolom wajib yang tidak
+        ada ditolak; kolom opsional yang tidak ada dianggap kosong.
+        """
+        position = {label: pos for pos, label in enumerate(labels)}
+        missing = [
+            f"{f} (kolom {self.columns[f] + 1})"
+            for f in REQUIRED_FIELDS if self.columns[f] not in position
+        ]
+        if missing:
+            raise ValueError(
+                f"File tidak punya kolom yang dibutuhkan config branch {self.branch}: "
+                + ", ".join(missing)
+            )
+        columns = {f: position.get(i, -1) for f, i in self.columns.items()}
+        bonus = position.get(self.bonus_column, -1)
+        return columns, bonus
+
+
+def _to_index(value, field):
+    if value in (None, ""):
+        return None
+    try:
+        idx = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Nilai config {field} bukan angka: {value!r}")
+    if idx < 0 or idx > MAX_COLUMN:
+        raise ValueError(f"Nilai config {field} di luar jangkauan (1-{MAX_COLUMN}): {idx}")
+    return idx or None
+
+
+def compile_plan(config):
+    return ParsePlan(config)
+
+
+def load_config(conn, branch):
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT * FROM config
+            WHERE branch=%s
+            ORDER BY id DESC
+            LIMIT 1
+        """, (branch,))
+        row = cur.fetchone()
+        if not row:
+            return None
+        columns = [desc[0] for desc in cur.description]
+        return dict(zip(columns, row))
+    finally:
+        cur.close()
+
+
+def get_plan(conn, branch):
+    """Plan branch dari cache, dikompilasi ulang jika belum ada / kedaluwarsa. None jika config tidak ada"""
+    with _lock:
+        entry = _plans.get(branch)
+        if entry and time.monotonic() - entry[0] < PLAN_TTL:
+            return entry[1]
+
+    config = load_config(conn, branch)
+    if config is None:
+        return None
+
+    plan = compile_plan(config)
+    with _lock:
+        _plans[branch] = (time.monotonic(), plan)
+    return plan
+
+
+def invalidate(branches=None):
+    """Buang plan branch tertentu (atau semua) setelah config berubah"""
+    with _lock:
+        if branches is None:
+            _plans.clear()
+            return
+        for branch in branches:
+            _plans.pop(branch, None)
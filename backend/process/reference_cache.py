@@ -0,0 +1,149 @@
+import threading
+import time
+
+# Versi tiap tabel disimpan di reference_version dan dinaikkan trigger
+# (migration 0010) pada setiap insert/update/delete, dari proses mana pun.
+# Tiap lookup membaca versi itu (satu baris by primary key); cache proses
+# ini dipakai hanya jika versinya sama, jadi worker gunicorn lain tidak
+# memakai key set basi setelah branch dihapus/diubah.
+VERSION_SQL = "SELECT version FROM reference_version WHERE table_name = %s"
+
+# table -> (kolom key, kolom tambahan yang dipakai route, preload seluruh tabel)
+REFERENCE_TABLES = {
+    "region": ("koderegion", (), True),
+    "entity": ("id_entity", (), True),
+    "area": ("id_area", (), True),
+    "branch": ("kodebranch", ("nama_branch",), True),
+    "branch_dist": ("branch_dist", ("nama_branch_dist",), True),
+    "salesman_team": ("id", ("description",), True),
+    "product_prc": ("pcode", ("pcodename",), True),
+    # customer_prc bisa ratusan ribu baris, cukup simpan key yang pernah dicari
+    "customer_prc": ("custno", ("custname", "kodebranch"), False),
+}
+
+_lock = threading.Lock()
+_entries = {}
+_stats = {
+    table: {"hits": 0, "misses": 0, "loads": 0, "invalidations": 0}
+    for table in REFERENCE_TABLES
+}
+
+
+def _fetch(conn, table, keys=None):
+    key_col, extra_cols, _ = REFERENCE_TABLES[table]
+    columns = (key_col,) + extra_cols
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    params = None
+    if keys is not None:
+        sql += f" WHERE {key_col} = ANY(%s)"
+        params = (list(keys),)
+
+    cur = conn.cursor()
+    try:
+        cur.execute(sql, params)
+        return {row[0]: dict(zip(columns, row)) for row in cur.fetchall()}
+    finally:
+        cur.close()
+
+
+def _db_version(conn, table):
+    cur = conn.cursor()
+    try:
+        cur.execute(VERSION_SQL, (table,))
+        row = cur.fetchone()
+        return row[0] if row else None
+    finally:
+        cur.close()
+
+
+def _get_entry(conn, table):
+    # Versi dibaca sebelum data: write yang masuk di antaranya hanya membuat
+    # lookup berikutnya memuat ulang, tidak pernah menyimpan data lama
+    version = _db_version(conn, table)
+    with _lock:
+        entry = _entries.get(table)
+        if entry and version is not None and entry["version"] == version:
+            return entry
+
+    preload = REFERENCE_TABLES[table][2]
+    entry = {
+        "version": version,
+        "loaded_at": time.monotonic(),
+        "rows": _fetch(conn, table) if preload else {}
+    }
+
+    with _lock:
+        _stats[table]["loads"] += 1
+        current = _entries.get(table)
+        # Jangan timpa entry yang lebih baru dari thread lain
+        if current is None or version is None or current["version"] is None or current["version"] <= version:
+            _entries[table] = entry
+    return entry
+
+
+def lookup(conn, table, keys):
+    """
+    Ambil baris referensi untuk keys: {key: {kolom: nilai}}.
+    Key yang tidak ada di cache selalu dicek ulang ke database, jadi data
+    baru dari proses lain tetap valid; yang ditemukan ikut disimpan ke cache.
+    """
+    keys = {k for k in keys if k is not None}
+    if not keys:
+        return {}
+
+    entry = _get_entry(conn, table)
+
+    found = {}
+    missing = []
+    with _lock:
+        rows = entry["rows"]
+        for key in keys:
+            row = rows.get(key)
+            if row is None:
+                missing.append(key)
+            else:
+                found[key] = row
+        _stats[table]["hits"] += len(found)
+        _stats[table]["misses"] += len(missing)
+
+    if missing:
+        fetched = _fetch(conn, table, missing)
+        with _lock:
+            if _entries.get(table) is entry:
+                entry["rows"].update(fetched)
+        found.update(fetched)
+
+    return found
+
+
+def valid_keys(conn, table, keys):
+    """Set key yang terdaftar di tabel referensi"""
+    return set(lookup(conn, table, keys))
+
+
+def invalidate(*tables):
+    """
+    Buang cache lokal setelah write di proses ini. Proses lain tidak perlu
+    diberi tahu: versi di reference_version sudah dinaikkan trigger.
+    """
+    with _lock:
+        for table in tables:
+            if table not in REFERENCE_TABLES:
+                continue
+            _entries.pop(table, None)
+            _stats[table]["invalidations"] += 1
+
+
+def stats():
+    with _lock:
+        result = {}
+        for table, counters in _stats.items():
+            entry = _entries.get(table)
+            lookups = counters["hits"] + counters["misses"]
+            result[table] = dict(
+                counters,
+                version=entry["version"] if entry else None,
+                cached_rows=len(entry["rows"]) if entry else 0,
+                hit_ratio=round(counters["hits"] / lookups, 4) if lookups else None
+            )
+        return result
@@ -0,0 +1,154 @@
+import codecs
+import csv
+import json
+
+CHUNK_SIZE = 5000
+
+# Ukuran blok baca body untuk array JSON
+READ_SIZE = 64 * 1024
+# Satu elemen array lebih besar dari ini dianggap tidak valid, supaya JSON
+# rusak tidak membuat seluruh sisa body dibaca ke buffer
+MAX_ELEMENT_CHARS = 1024 * 1024
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+CSV_TYPES = ("text/csv", "application/csv")
+
+
+def _iter_lines(stream):
+    """Baca body request baris per baris tanpa memuat seluruh payload"""
+    for raw in stream:
+        line = raw.decode("utf-8-sig") if isinstance(raw, bytes) else raw
+        yield line
+
+
+def _iter_ndjson(stream):
+    for lineno, line in enumerate(_iter_lines(stream), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise ValueError(f"Baris {lineno} bukan JSON yang valid")
+        if not isinstance(row, dict):
+            raise ValueError(f"Baris {lineno} harus berupa object JSON")
+        yield row
+
+
+def _iter_csv(stream):
+    reader = csv.DictReader(_iter_lines(stream))
+    if not reader.fieldnames:
+        return
+    for row in reader:
+        yield {k.strip(): v for k, v in row.items() if k is not None}
+
+
+class _JsonArrayReader:
+    """
+    Parse array JSON `[{...}, {...}]` elemen per elemen dari stream: hanya
+    elemen yang sedang diparse yang ada di memori, bukan seluruh body.
+    """
+
+    def __init__(self, stream, read_size=READ_SIZE):
+        self.stream = stream
+        self.read_size = read_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Tambah satu blok ke buffer; False jika body sudah habis"""
+        if self.eof:
+            return False
+        block = self.stream.read(self.read_size)
+        if not block:
+            self.eof = True
+            self.buf = self.buf[self.pos:] + self.text_decoder.decode(b"", final=True)
+        else:
+            self.buf = self.buf[self.pos:] + self.text_decoder.decode(block)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Karakter non-spasi berikutnya (tanpa dikonsumsi), "" jika body habis"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            return False
+        self.pos += 1
+        return True
+
+    def rows(self):
+        index = 0
+        while True:
+            index += 1
+            if self.peek() != "{":
+                raise ValueError(f"Elemen ke-{index} harus berupa object JSON")
+            while True:
+                try:
+                    row, end = self.decoder.raw_decode(self.buf, self.pos)
+                    break
+                except ValueError:
+                    # Object belum lengkap di buffer: baca blok berikutnya
+                    if len(self.buf) - self.pos > MAX_ELEMENT_CHARS or not self._fill():
+                        raise ValueError(f"Elemen ke-{index} bukan JSON yang valid")
+            self.pos = end
+            yield row
+
+            if self.expect(","):
+                continue
+            if self.expect("]"):
+                if self.peek():
+                    raise ValueError("Ada data setelah akhir array JSON")
+                return
+            raise ValueError(f"Setelah elemen ke-{index} harus ',' atau ']'")
+
+
+def _chunked(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def body_chunks(req, chunk_size=CHUNK_SIZE):
+    """
+    Iterator list-of-dict per chunk dari body request /insert.
+
+    - application/x-ndjson : satu object JSON per baris, diparse bertahap
+    - text/csv             : header di baris pertama, diparse bertahap
+    - application/json     : array JSON, diparse bertahap per elemen
+
+    Return None jika body bukan array JSON yang berisi (dicek dari awal
+    body). Error parsing di tengah body dilempar sebagai ValueError saat
+    iterasi; chunk sebelumnya yang sudah di-commit route tetap tersimpan,
+    jadi route melaporkan jumlah baris yang sudah masuk.
+    """
+    mimetype = (req.mimetype or "").lower()
+
+    if mimetype in NDJSON_TYPES:
+        return _chunked(_iter_ndjson(req.stream), chunk_size)
+
+    if mimetype in CSV_TYPES:
+        return _chunked(_iter_csv(req.stream), chunk_size)
+
+    if not req.is_json:
+        return None
+    reader = _JsonArrayReader(req.stream)
+    # Array kosong / bukan array ditolak sebelum ada yang diproses (400)
+    if not reader.expect("[") or reader.peek() in ("]", ""):
+        return None
+    return _chunked(reader.rows(), chunk_size)
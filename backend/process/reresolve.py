@@ -0,0 +1,105 @@
+from psycopg2.extras import Json
+from process.sellout_service import (
+    insert_final_rows,
+    ERROR_STATUS_SQL,
+    ERROR_JOINS_SQL
+)
+
+# jenis mapping -> kolom kode distributor di mapping_error
+RERESOLVE_COLUMNS = {
+    "branch": "kodebranch",
+    "salesman": "id_salesman",
+    "customer": "id_customer",
+    "product": "id_product",
+}
+
+
+def enqueue_reresolve(cur, mapping, codes):
+    """
+    Antre job RERESOLVE untuk kode distributor yang baru di-mapping.
+    Dipanggil sebelum commit insert mapping, jadi job ikut ter-rollback
+    jika insert gagal. Return id job (None jika tidak ada kode).
+    """
+    codes = sorted({str(c).strip() for c in codes if c not in (None, "")})
+    if not codes:
+        return None
+
+    cur.execute("""
+        INSERT INTO sellout_process_queue (job_type, payload, status, created_at)
+        VALUES ('RERESOLVE', %s, 'PENDING', NOW())
+        RETURNING id
+    """, (Json({"mapping": mapping, "codes": codes}),))
+    row = cur.fetchone()
+    return row["id"] if isinstance(row, dict) else row[0]
+
+
+def reresolve_mapping_errors(conn, payload, batch_size=1000):
+    """
+    Proses ulang baris mapping_error untuk kode distributor di payload:
+    baris yang sekarang mapping-nya lengkap dipindah ke sellout (enrichment
+    sama dengan process_sellout_to_final) lalu dihapus dari mapping_error.
+    Sisanya di-update statusnya (misal CUSTOMER_NOT_MAPPED -> PRODUCT_NOT_MAPPED).
+    """
+    column = RERESOLVE_COLUMNS[payload["mapping"]]
+    codes = payload["codes"]
+    cur = conn.cursor()
+    resolved = 0
+
+    try:
+        while True:
+            # Join sama persis dengan INSERT_FINAL_SQL supaya setiap baris
+            # yang dipilih pasti ter-insert ke sellout
+            cur.execute(f"""
+                SELECT me.id, st.id
+                FROM mapping_error me
+                JOIN sellout_temp st ON st.id = me.sellout_temp_id
+                JOIN mapping_branch mb ON st.kodebranch = mb.branch_dist
+                JOIN branch b ON mb.kodebranch = b.kodebranch
+                JOIN area a ON b.id_area = a.id_area
+                JOIN entity e ON b.entity = e.id_entity
+                JOIN region r ON e.koderegion = r.koderegion
+                JOIN mapping_salesman ms ON st.id_salesman = ms.id_salesman_dist
+                JOIN mapping_customer mc ON st.id_customer = mc.custno_dist
+                JOIN customer_prc cp ON mc.custno = cp.custno
+                JOIN mapping_product mp ON st.id_product = mp.pcode_dist
+                JOIN product_group pg ON mp.pcode_prc = pg.pcode
+                WHERE me.{column} = ANY(%s)
+                ORDER BY me.id
+                LIMIT %s
+                FOR UPDATE OF me SKIP LOCKED
+            """, (codes, batch_size))
+
+            rows = cur.fetchall()
+            if not rows:
+                break
+
+            error_ids = list(dict.fromkeys(r[0] for r in rows))
+            temp_ids = list(dict.fromkeys(r[1] for r in rows))
+
+            insert_final_rows(cur, temp_ids)
+            cur.execute("DELETE FROM mapping_error WHERE id = ANY(%s)", (error_ids,))
+            conn.commit()
+            resolved += len(error_ids)
+
+        # Baris yang masih gagal: perbarui alasan gagalnya
+        cur.execute(f"""
+            UPDATE mapping_error me
+            SET status = s.status,
+                modified_date = NOW()
+            FROM (
+                SELECT st.id AS temp_id, {ERROR_STATUS_SQL} AS status
+                {ERROR_JOINS_SQL}
+                WHERE st.id IN (
+                    SELECT sellout_temp_id FROM mapping_error WHERE {column} = ANY(%s)
+                )
+            ) s
+            WHERE me.sellout_temp_id = s.temp_id
+              AND me.{column} = ANY(%s)
+              AND me.status IS DISTINCT FROM s.status
+        """, (codes, codes))
+        status_updated = cur.rowcount
+        conn.commit()
+    finally:
+        cur.close()
+
+    return {"resolved": resolved, "status_updated": status_updated}
@@ -0,0 +1,182 @@
+from datetime import date, datetime
+
+import pandas as pd
+from psycopg2 import DataError
+
+from process.mapping_coverage import mapping_coverage
+from process.parse_plan import DATE_FIELDS, NUMERIC_FIELDS, STR_FIELDS
+from process.sellout_temp import load_file, process_sellout
+
+DEFAULT_NROWS = 50
+MAX_NROWS = 1000
+
+# Jumlah kegagalan konversi tipe yang dikirim balik
+MAX_FAILURES = 200
+
+# Kolom internal yang tidak perlu ditampilkan di preview
+HIDDEN_FIELDS = {"upload_batch_id", "flag_move", "createdate", "createby", "row_hash"}
+
+
+def _coerce_error(value, kind, date_format):
+    """
+    Pesan jika nilai tidak akan lolos saat disimpan, None jika aman.
+    Tanggal teks tanpa date_format dicek belakangan ke PostgreSQL
+    (lihat _pg_rejected_dates), di sini dikembalikan apa adanya.
+    """
+    if kind == "num":
+        if isinstance(value, bool):
+            return "bukan angka"
+        if isinstance(value, (int, float)):
+            return None
+        try:
+            float(str(value))
+            return None
+        except ValueError:
+            return "bukan angka"
+
+    if kind == "date":
+        if isinstance(value, (datetime, date)):
+            return None
+        if not isinstance(value, str):
+            return "bukan tanggal"
+        if date_format:
+            try:
+                datetime.strptime(value.strip(), date_format)
+                return None
+            except ValueError:
+                return f"tidak sesuai date_format {date_format}"
+        return None
+
+    if kind == "code" and str(value).strip() == "":
+        return "kode kosong"
+    return None
+
+
+def _pg_rejected_dates(conn, texts):
+    """
+    {teks: pesan} untuk tanggal yang ditolak PostgreSQL. Tanpa konversi di
+    loader, teks disimpan apa adanya dan di-parse server (DateStyle), jadi
+    server juga yang menilai. Satu query jika semua lolos; jika ada yang
+    gagal, dicek satu per satu di savepoint (transaksi preview di-rollback).
+    """
+    if not texts:
+        return {}
+    rejected = {}
+    cur = conn.cursor()
+    try:
+        cur.execute("SAVEPOINT preview_dates")
+        try:
+            cur.execute("SELECT v::date FROM unnest(%s::text[]) v", (list(texts),))
+        except DataError:
+            cur.execute("ROLLBACK TO SAVEPOINT preview_dates")
+            for text in texts:
+                try:
+                    cur.execute("SELECT %s::date", (text,))
+                except DataError as e:
+                    rejected[text] = e.diag.message_primary or str(e).strip()
+                    cur.execute("ROLLBACK TO SAVEPOINT preview_dates")
+        cur.execute("RELEASE SAVEPOINT preview_dates")
+    finally:
+        cur.close()
+    return rejected
+
+
+def coercion_failures(conn, df, plan, max_failures=MAX_FAILURES):
+    """
+    Cek nilai mentah tiap kolom terpakai sesuai tipe field-nya, dengan aturan
+    yang sama seperti upload: date_format hanya berlaku untuk kolom yang
+    dikonversi loader (pyarrow), selain itu tanggal dinilai PostgreSQL.
+    """
+    cols, _ = plan.bind(df.columns)
+    checks = []
+    for field, pos in cols.items():
+        if pos < 0:
+            continue
+        if field in NUMERIC_FIELDS:
+            checks.append((field, pos, "num", None))
+        elif field in DATE_FIELDS:
+            typed = plan.typed_columns and plan.dtypes.get(plan.columns[field]) == "date"
+            checks.append((field, pos, "date", plan.date_format if typed else None))
+        elif field in STR_FIELDS:
+            checks.append((field, pos, "code", None))
+
+    failures = []
+    pg_dates = []
+    for n, row in enumerate(df.itertuples(index=False, name=None)):
+        for field, pos, kind, date_format in checks:
+            value = row[pos]
+            missing = value is None or (not isinstance(value, str) and pd.isna(value))
+            if missing:
+                if kind != "code":
+                    continue
+                error = "kode kosong"
+            else:
+                error = _coerce_error(value, kind, date_format)
+                if error is None and kind == "date" and isinstance(value, str) and not date_format:
+                    pg_dates.append((n, field, value))
+            if error:
+                failures.append((n, field, None if missing else str(value), error))
+
+    rejected = _pg_rejected_dates(conn, {value for _, _, value in pg_dates})
+    failures += [
+        (n, field, value, f"ditolak PostgreSQL: {rejected[value]}")
+        for n, field, value in pg_dates if value in rejected
+    ]
+    failures.sort(key=lambda f: f[0])
+
+    return [
+        {
+            "row": plan.skiprows + n + 1,
+            "field": field,
+            "column": plan.columns[field] + 1,
+            "value": value,
+            "error": error
+        }
+        for n, field, value, error in failures[:max_failures]
+    ]
+
+
+def _jsonable(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def preview_sellout(conn, file, plan, nrows=DEFAULT_NROWS):
+    """
+    Dry-run upload: baca nrows baris pertama setelah first_row, terapkan
+    parse plan, cek tipe dan sampel coverage mapping. Tidak menulis apa pun.
+    """
+    engine_error = None
+    try:
+        df = load_file(file, plan, nrows=nrows)
+    except ValueError as e:
+        if not plan.typed_columns:
+            raise
+        # pyarrow menolak seluruh file karena satu sel; baca ulang sebagai
+        # teks supaya sel yang gagal dilaporkan per kolom di coercion_failures
+        engine_error = str(e)
+        file.seek(0)
+        df = load_file(file, plan.as_text(), nrows=nrows)
+    rows = process_sellout(df, plan, "preview", None)
+
+    return {
+        "plan": {
+            "file_extension": plan.file_extension,
+            "separator": plan.separator,
+            "first_row": plan.skiprows + 1,
+            "engine": plan.engine,
+            "date_format": plan.date_format,
+            "columns": {f: i + 1 for f, i in plan.columns.items() if i >= 0},
+            "flag_bonus": plan.bonus_column + 1 if plan.bonus_column >= 0 else None
+        },
+        "rows_read": len(rows),
+        # Upload dengan plan ini akan gagal total (engine pyarrow)
+        "engine_error": engine_error,
+        "data": [
+            {k: _jsonable(v) for k, v in r.items() if k not in HIDDEN_FIELDS}
+            for r in rows
+        ],
+        "coercion_failures": coercion_failures(conn, df, plan),
+        "coverage": mapping_coverage(conn, rows) if rows else None
+    }
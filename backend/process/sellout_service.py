@@ -1,11 +1,193 @@
-def process_sellout_to_final(conn, upload_batch_id, batch_size=1000):
+from process.staging import staging_table_for, drop_staging_table, check_staging_intact
+from process.batch_metrics import StageTimer
+
+# Enrichment staging/sellout_temp -> sellout, dipakai finalize batch dan re-resolve mapping_error
+INSERT_FINAL_SQL = """
+    INSERT INTO sellout (
+        region_code,
+        region_name,
+        entity_code,
+        entity_name,
+        branch_code,
+        branch_name,
+        area_code,
+        area_name,
+        salesman_code,
+        salesman_name,
+        custcode_prc,
+        custcode_dist,
+        custname,
+        custaddress,
+        custcity,
+        sub_channel,
+        type_outlet,
+        order_no,
+        order_date,
+        invoice_no,
+        invoice_type,
+        invoice_date,
+        product_brand,
+        product_group1,
+        product_group2,
+        product_group3,
+        pcode,
+        pcode_name,
+        qty1,
+        qty2,
+        qty3,
+        flag_bonus,
+        grossamount,
+        discount1,
+        discount2,
+        discount3,
+        discount4,
+        discount5,
+        discount6,
+        discount7,
+        discount8,
+        total_discount,
+        dpp,
+        tax,
+        nett,
+        category,
+        vtkp,
+        npd,
+        createdate,
+        createby,
+        row_hash
+    )
+    SELECT
+        r.koderegion,
+        r.keterangan,
+        e.id_entity,
+        e.keterangan,
+        b.kodebranch,
+        b.nama_branch,
+        a.id_area,
+        a.description,
+        ms.id_salesman,
+        ms.nama_salesman,
+        mc.custno,
+        mc.custno_dist,
+        mc.custname_prc,
+        cp.custadd,
+        cp.city,
+        cp.type,
+        cp.type,
+        st.order_no,
+        st.order_date,
+        st.invoice_no,
+        st.invoice_type,
+        st.invoice_date,
+        pg.brand,
+        pg.product_group_1,
+        pg.product_group_2,
+        pg.product_group_3,
+        mp.pcode_prc,
+        mp.pcode_prc_name,
+        st.qty1,
+        st.qty2,
+        st.qty3,
+        st.flag_bonus,
+        st.grossamount,
+        st.discount1,
+        st.discount2,
+        st.discount3,
+        st.discount4,
+        st.discount5,
+        st.discount6,
+        st.discount7,
+        st.discount8,
+        st.total_discount,
+        st.dpp,
+        st.tax,
+        st.nett,
+        pg.category_item,
+        pg.vtkp,
+        pg.npd,
+        NOW(),
+        st.createby,
+        st.row_hash
+    FROM {source} st
+    JOIN mapping_branch mb ON st.kodebranch = mb.branch_dist
+    JOIN branch b ON mb.kodebranch = b.kodebranch
+    JOIN area a ON b.id_area = a.id_area
+    JOIN entity e ON b.entity = e.id_entity
+    JOIN region r ON e.koderegion = r.koderegion
+    JOIN mapping_salesman ms ON st.id_salesman = ms.id_salesman_dist
+    JOIN mapping_customer mc ON st.id_customer = mc.custno_dist
+    JOIN customer_prc cp ON mc.custno = cp.custno
+    JOIN mapping_product mp ON st.id_product = mp.pcode_dist
+    JOIN product_group pg ON mp.pcode_prc = pg.pcode
+    WHERE st.id = ANY(%s)
+"""
+
+# Alasan gagal mapping, urutan WHEN menentukan status yang dicatat
+ERROR_STATUS_SQL = """
+    CASE
+        WHEN mb.id IS NULL THEN 'BRANCH_NOT_MAPPED'
+        WHEN ms.id IS NULL THEN 'SALESMAN_NOT_MAPPED'
+        WHEN mc.id IS NULL THEN 'CUSTOMER_NOT_MAPPED'
+        WHEN mp.id IS NULL THEN 'PRODUCT_NOT_MAPPED'
+        -- PENYEBAB 21 DATA HILANG:
+        WHEN cp.id IS NULL THEN 'CUSTOMER_NOT_FOUND_IN_MASTER_PRC'
+        WHEN pg.id IS NULL THEN 'PRODUCT_NOT_FOUND_IN_PRODUCT_GROUP'
+        WHEN b.kodebranch IS NULL THEN 'BRANCH_CODE_NOT_FOUND_IN_MASTER'
+        ELSE 'UNKNOWN_REASON_CHECK_MASTER_DATA'
+    END
+"""
+
+ERROR_JOINS_SQL = """
+    FROM sellout_temp st
+    LEFT JOIN mapping_branch mb ON st.kodebranch = mb.branch_dist
+    LEFT JOIN branch b ON mb.kodebranch = b.kodebranch
+    LEFT JOIN mapping_salesman ms ON st.id_salesman = ms.id_salesman_dist
+    LEFT JOIN mapping_customer mc ON st.id_customer = mc.custno_dist
+    LEFT JOIN customer_prc cp ON mc.custno = cp.custno
+    LEFT JOIN mapping_product mp ON st.id_product = mp.pcode_dist
+    LEFT JOIN product_group pg ON mp.pcode_prc = pg.pcode
+"""
+
+
+def insert_final_rows(cur, temp_ids, source="sellout_temp"):
+    """Insert baris staging/sellout_temp (by id) yang mapping-nya lengkap ke sellout"""
+    cur.execute(INSERT_FINAL_SQL.format(source=source), (temp_ids,))
+    return cur.rowcount
+
+
+def process_sellout_to_final(conn, upload_batch_id, batch_size=1000, timer=None):
+    """
+    Pindahkan baris batch yang mapping-nya lengkap ke sellout, sisanya ke
+    mapping_error. Return (baris pindah, baris error). timer (StageTimer)
+    mencatat tahap "finalize" dan "error_capture".
+    """
+    timer = timer or StageTimer()
+    # Batch baru punya staging table sendiri; batch yang di-queue sebelum
+    # staging dipakai masih dibaca dari sellout_temp
+    stage = staging_table_for(conn, upload_batch_id)
+    source = stage or "sellout_temp"
+    if stage:
+        # Gagal (DEAD) daripada DONE dengan 0 baris jika staging hilang saat crash
+        check_staging_intact(conn, upload_batch_id, stage)
     cur = conn.cursor()
 
+    with timer.stage("finalize"):
+        moved = _move_mapped_rows(conn, cur, upload_batch_id, source, batch_size)
+
+    with timer.stage("error_capture"):
+        errors = _capture_errors(conn, cur, upload_batch_id, stage)
+
+    cur.close()
+    return moved, errors
+
+
+def _move_mapped_rows(conn, cur, upload_batch_id, source, batch_size):
+    moved = 0
     while True:
         # AMBIL SET ID YANG FIX
-        cur.execute("""
+        cur.execute(f"""
             SELECT st.id
-            FROM sellout_temp st
+            FROM {source} st
             JOIN mapping_branch mb
                 ON st.kodebranch = mb.branch_dist
             JOIN mapping_salesman ms
@@ -26,137 +208,43 @@ def process_sellout_to_final(conn, upload_batch_id, batch_size=1000):
             break
 
         # INSERT KE SELLOUT
-        cur.execute("""
-            INSERT INTO sellout (
-                region_code,
-                region_name,
-                entity_code,
-                entity_name,
-                branch_code,
-                branch_name,
-                area_code,
-                area_name,
-                salesman_code,
-                salesman_name,
-                custcode_prc,
-                custcode_dist,
-                custname,
-                custaddress,
-                custcity,
-                sub_channel,
-                type_outlet,
-                order_no,
-                order_date,
-                invoice_no,
-                invoice_type,
-                invoice_date,
-                product_brand,
-                product_group1,
-                product_group2,
-                product_group3,
-                pcode,
-                pcode_name,
-                qty1,
-                qty2,
-                qty3,
-                flag_bonus,
-                grossamount,
-                discount1,
-                discount2,
-                discount3,
-                discount4,
-                discount5,
-                discount6,
-                discount7,
-                discount8,
-                total_discount,
-                dpp,
-                tax,
-                nett,
-                category,
-                vtkp,
-                npd,
-                createdate,
-                createby
-            )
-            SELECT
-                r.koderegion,
-                r.keterangan,
-                e.id_entity,
-                e.keterangan,
-                b.kodebranch,
-                b.nama_branch,
-                a.id_area,
-                a.description,
-                ms.id_salesman,
-                ms.nama_salesman,
-                mc.custno,
-                mc.custno_dist,
-                mc.custname_prc,
-                cp.custadd,
-                cp.city,
-                cp.type,
-                cp.type,
-                st.order_no,
-                st.order_date,
-                st.invoice_no,
-                st.invoice_type,
-                st.invoice_date,
-                pg.brand,
-                pg.product_group_1,
-                pg.product_group_2,
-                pg.product_group_3,
-                mp.pcode_prc,
-                mp.pcode_prc_name,
-                st.qty1,
-                st.qty2,
-                st.qty3,
-                st.flag_bonus,
-                st.grossamount,
-                st.discount1,
-                st.discount2,
-                st.discount3,
-                st.discount4,
-                st.discount5,
-                st.discount6,
-                st.discount7,
-                st.discount8,
-                st.total_discount,
-                st.dpp,
-                st.tax,
-                st.nett,
-                pg.category_item,
-                pg.vtkp,
-                pg.npd,
-                NOW(),
-                st.createby
-            FROM sellout_temp st
-            JOIN mapping_branch mb ON st.kodebranch = mb.branch_dist
-            JOIN branch b ON mb.kodebranch = b.kodebranch
-            JOIN area a ON b.id_area = a.id_area
-            JOIN entity e ON b.entity = e.id_entity
-            JOIN region r ON e.koderegion = r.koderegion
-            JOIN mapping_salesman ms ON st.id_salesman = ms.id_salesman_dist
-            JOIN mapping_customer mc ON st.id_customer = mc.custno_dist
-            JOIN customer_prc cp ON mc.custno = cp.custno
-            JOIN mapping_product mp ON st.id_product = mp.pcode_dist
-            JOIN product_group pg ON mp.pcode_prc = pg.pcode
-            WHERE st.id = ANY(%s)
-        """, (batch_ids,))
+        moved += insert_final_rows(cur, batch_ids, source)
 
         # FLAG SUKSES (ID YANG SAMA)
-        cur.execute("""
-            UPDATE sellout_temp
+        cur.execute(f"""
+            UPDATE {source}
             SET flag_move = 'Y'
             WHERE id = ANY(%s)
         """, (batch_ids,))
 
         conn.commit()
+    return moved
+
+
+def _capture_errors(conn, cur, upload_batch_id, stage):
+    # Tahap akhir satu transaksi; lock per batch + NOT EXISTS supaya job yang
+    # di-reclaim (worker lama mungkin masih jalan) aman diulang
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (str(upload_batch_id),))
+    if stage and staging_table_for(conn, upload_batch_id) is None:
+        # Worker lain sudah menyelesaikan batch ini
+        conn.commit()
+        return 0
+
+    if stage:
+        # Hanya baris gagal yang disimpan permanen di sellout_temp (id sama,
+        # sequence-nya ikut LIKE ... INCLUDING DEFAULTS) untuk re-resolve
+        cur.execute(f"""
+            INSERT INTO sellout_temp
+            SELECT * FROM {stage} s
+            WHERE s.flag_move = 'N'
+              AND NOT EXISTS (SELECT 1 FROM sellout_temp t WHERE t.id = s.id)
+        """)
 
     # FAILED MAPPING
-    cur.execute("""
+    cur.execute(f"""
         INSERT INTO mapping_error (
             upload_batch_id,
+            sellout_temp_id,
             kodebranch,
             id_salesman,
             id_customer,
@@ -171,6 +259,7 @@ def process_sellout_to_final(conn, upload_batch_id, batch_size=1000):
         )
         SELECT 
             st.upload_batch_id,
+            st.id,
             st.kodebranch,
             st.id_salesman,
             st.id_customer,
@@ -180,36 +269,16 @@ def process_sellout_to_final(conn, upload_batch_id, batch_size=1000):
             st.price,
             st.qty3,
             st.grossamount,
-            CASE 
-                WHEN mb.id IS NULL THEN 'BRANCH_NOT_MAPPED'
-                WHEN ms.id IS NULL THEN 'SALESMAN_NOT_MAPPED'
-                WHEN mc.id IS NULL THEN 'CUSTOMER_NOT_MAPPED'
-                WHEN mp.id IS NULL THEN 'PRODUCT_NOT_MAPPED'
-                -- PENYEBAB 21 DATA HILANG:
-                WHEN cp.id IS NULL THEN 'CUSTOMER_NOT_FOUND_IN_MASTER_PRC'
-                WHEN pg.id IS NULL THEN 'PRODUCT_NOT_FOUND_IN_PRODUCT_GROUP'
-                WHEN b.kodebranch IS NULL THEN 'BRANCH_CODE_NOT_FOUND_IN_MASTER'
-                ELSE 'UNKNOWN_REASON_CHECK_MASTER_DATA'
-            END,
+            {ERROR_STATUS_SQL},
             NOW()
-        FROM sellout_temp st
-        LEFT JOIN mapping_branch mb ON st.kodebranch = mb.branch_dist
-        LEFT JOIN branch b ON mb.kodebranch = b.kodebranch
-        LEFT JOIN mapping_salesman ms ON st.id_salesman = ms.id_salesman_dist
-        LEFT JOIN mapping_customer mc ON st.id_customer = mc.custno_dist
-        LEFT JOIN customer_prc cp ON mc.custno = cp.custno
-        LEFT JOIN mapping_product mp ON st.id_product = mp.pcode_dist
-        LEFT JOIN product_group pg ON mp.pcode_prc = pg.pcode
+        {ERROR_JOINS_SQL}
         WHERE st.upload_batch_id = %s 
           AND st.flag_move = 'N'
+          AND NOT EXISTS (
+              SELECT 1 FROM mapping_error x WHERE x.sellout_temp_id = st.id
+          )
     """, (upload_batch_id,))
-
-    # 5. Flag sisa (error) sebagai selesai
-    cur.execute("""
-        UPDATE sellout_temp 
-        SET flag_move = 'Y' 
-        WHERE upload_batch_id = %s AND flag_move = 'N'
-    """, (upload_batch_id,))
+    errors = cur.rowcount
 
     # FLAG ERROR SEBAGAI SELESAI
     cur.execute("""
@@ -219,5 +288,8 @@ def process_sellout_to_final(conn, upload_batch_id, batch_size=1000):
           AND flag_move = 'N'
     """, (upload_batch_id,))
 
+    if stage:
+        drop_staging_table(conn, upload_batch_id)
+
     conn.commit()
-    cur.close()
+    return errors
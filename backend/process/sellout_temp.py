@@ -1,107 +1,219 @@
 from datetime import datetime
 import pandas as pd
 from psycopg2.extras import execute_values
+from process.upload_diff import row_hash
+from process.parse_plan import REQUIRED_FIELDS
+from process.excel_reader import read_excel
 
-def load_file(file, config):
-    start_row = config['first_row'] - 1
-    if config['file_extension'] == 'xlsx':
-        return pd.read_excel(file, header=None, skiprows=start_row)
-    if config['file_extension'] == 'csv':
-        return pd.read_csv(file, header=None, skiprows=start_row,
-                           sep=config.get('separator_file') or ',')
-    if config['file_extension'] == 'txt':
-        return pd.read_csv(file, header=None, skiprows=start_row,
-                           sep=config.get('separator_file') or '|')
+def load_file(file, plan, nrows=None):
+    """
+    DataFrame dengan label kolom = nomor kolom asli file (0-based).
+    xlsx dan engine pyarrow hanya membaca plan.usecols, engine c membaca semua kolom.
+    nrows membatasi jumlah baris data yang dibaca (preview).
+    """
+    if plan.file_extension == 'xlsx':
+        df = read_excel(file, skiprows=plan.skiprows, usecols=plan.usecols, nrows=nrows)
+        return check_required_columns(df, plan)
+    if plan.file_extension in ('csv', 'txt'):
+        if plan.engine == 'pyarrow':
+            try:
+                return load_csv_pyarrow(file, plan, nrows)
+            except ImportError:
+                print("pyarrow tidak terpasang, fallback ke engine c")
+        return pd.read_csv(file, header=None, skiprows=plan.skiprows, sep=plan.separator, nrows=nrows)
     raise Exception("Format file tidak didukung")
 
-def get_val(row, idx):
-    if not idx: return None
+def load_csv_pyarrow(file, plan, nrows=None):
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    arrow_types = {"str": pa.string(), "num": pa.float64(), "date": pa.timestamp("s")}
+    names = {idx: f"f{idx}" for idx in plan.usecols}
+
+    read_options = pa_csv.ReadOptions(
+        skip_rows=plan.skiprows,
+        autogenerate_column_names=True,
+        use_threads=True
+    )
+    parse_options = pa_csv.ParseOptions(delimiter=plan.separator)
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=list(names.values()),
+        include_missing_columns=True,
+        column_types={names[idx]: arrow_types[kind] for idx, kind in plan.dtypes.items()},
+        timestamp_parsers=[plan.date_format] if plan.date_format else None,
+        strings_can_be_null=True
+    )
     try:
-        val = row[idx - 1]
-        return None if pd.isna(val) else val
-    except Exception: return None
+        if nrows is None:
+            table = pa_csv.read_csv(
+                pa.BufferReader(file.read()),
+                read_options=read_options,
+                parse_options=parse_options,
+                convert_options=convert_options
+            )
+        else:
+            # Streaming per block, berhenti setelah nrows baris (preview)
+            reader = pa_csv.open_csv(
+                pa.PythonFile(file, mode="r"),
+                read_options=read_options,
+                parse_options=parse_options,
+                convert_options=convert_options
+            )
+            batches, total = [], 0
+            for batch in reader:
+                batches.append(batch)
+                total += batch.num_rows
+                if total >= nrows:
+                    break
+            table = pa.Table.from_batches(batches, schema=reader.schema).slice(0, nrows)
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Gagal parse file: {e}")
+
+    df = table.to_pandas()
+    df.columns = plan.usecols
+    return check_required_columns(df, plan)
+
+def check_required_columns(df, plan):
+    """
+    Reader dengan proyeksi kolom mengisi kolom yang tidak ada di file dengan
+    null; kolom wajib yang kosong semua berarti file lebih sempit dari config
+    """
+    if len(df):
+        empty = [
+            idx + 1 for idx in {plan.columns[f] for f in REQUIRED_FIELDS}
+            if df[idx].isna().all()
+        ]
+        if empty:
+            raise ValueError(
+                f"Kolom {', '.join(map(str, sorted(empty)))} kosong / tidak ada di file "
+                f"(config branch {plan.branch})"
+            )
+    return df
 
-def process_sellout(df, config, username, upload_batch_id):
+def get_val(row, idx):
+    if idx < 0: return None
+    val = row[idx]
+    return None if pd.isna(val) else val
+
+def process_sellout(df, plan, username, upload_batch_id):
     now = datetime.now()
     data = []
-    for _, row in df.iterrows():
-        qty3 = get_val(row, config.get('qty3'))
-        price = get_val(row, config.get('price'))
-        gross = get_val(row, config.get('grossamount'))
-        dpp = get_val(row, config.get('dpp'))
-        nett = get_val(row, config.get('nett'))
-
-        if not config.get('grossamount'):
+    # Posisi kolom sudah dikompilasi di plan; di sini hanya diikat ke lebar file
+    cols, bonus_col = plan.bind(df.columns)
+    c_kodebranch, c_salesman = cols['kodebranch'], cols['id_salesman']
+    c_customer, c_product = cols['id_customer'], cols['id_product']
+    c_qty1, c_qty2, c_qty3 = cols['qty1'], cols['qty2'], cols['qty3']
+    c_price, c_gross, c_dpp = cols['price'], cols['grossamount'], cols['dpp']
+    c_tax, c_nett = cols['tax'], cols['nett']
+    c_disc = [cols[f'discount{i}'] for i in range(1, 9)]
+    c_total_disc = cols['total_discount']
+    c_order_no, c_order_date = cols['order_no'], cols['order_date']
+    c_invoice_no, c_invoice_date = cols['invoice_no'], cols['invoice_date']
+    c_invoice_type = cols['invoice_type']
+    derive_gross = plan.derive_gross
+
+    for row in df.itertuples(index=False, name=None):
+        qty3 = get_val(row, c_qty3)
+        price = get_val(row, c_price)
+        gross = get_val(row, c_gross)
+        dpp = get_val(row, c_dpp)
+        nett = get_val(row, c_nett)
+
+        if derive_gross:
             gross = (qty3 or 0) * (price or 0)
 
-        discount8 = get_val(row, config.get('discount8'))
+        discount8 = get_val(row, c_disc[7])
         flag_bonus = 'N'
 
-        if config.get('flag_bonus') and get_val(row, config['flag_bonus']) == 'Y':
+        if bonus_col >= 0 and get_val(row, bonus_col) == 'Y':
             flag_bonus = 'Y'
             discount8, qty3 = qty3, 0
 
         if all(v in [0, None] for v in [price, gross, dpp, nett]):
             flag_bonus, discount8, qty3 = 'Y', qty3, 0
 
-        data.append({
+        item = {
             "upload_batch_id": upload_batch_id,
-            "kodebranch": str(get_val(row, config['kodebranch'])),
-            "id_salesman": str(get_val(row, config['id_salesman'])),
-            "id_customer": str(get_val(row, config['id_customer'])),
-            "id_product": str(get_val(row, config['id_product'])),
-            "qty1": get_val(row, config.get('qty1')),
-            "qty2": get_val(row, config.get('qty2')),
+            "kodebranch": str(get_val(row, c_kodebranch)),
+            "id_salesman": str(get_val(row, c_salesman)),
+            "id_customer": str(get_val(row, c_customer)),
+            "id_product": str(get_val(row, c_product)),
+            "qty1": get_val(row, c_qty1),
+            "qty2": get_val(row, c_qty2),
             "qty3": qty3,
             "price": price or 0,
             "grossamount": gross or 0,
-            "discount1": get_val(row, config.get('discount1')),
-            "discount2": get_val(row, config.get('discount2')),
-            "discount3": get_val(row, config.get('discount3')),
-            "discount4": get_val(row, config.get('discount4')),
-            "discount5": get_val(row, config.get('discount5')),
-            "discount6": get_val(row, config.get('discount6')),
-            "discount7": get_val(row, config.get('discount7')),
+            "discount1": get_val(row, c_disc[0]),
+            "discount2": get_val(row, c_disc[1]),
+            "discount3": get_val(row, c_disc[2]),
+            "discount4": get_val(row, c_disc[3]),
+            "discount5": get_val(row, c_disc[4]),
+            "discount6": get_val(row, c_disc[5]),
+            "discount7": get_val(row, c_disc[6]),
             "discount8": discount8,
-            "total_discount": get_val(row, config.get('total_discount')),
-            "dpp": dpp, "tax": get_val(row, config.get('tax')), "nett": nett,
-            "order_no": get_val(row, config.get('order_no')),
-            "order_date": get_val(row, config.get('order_date')),
-            "invoice_no": get_val(row, config.get('invoice_no')),
-            "invoice_date": get_val(row, config.get('invoice_date')),
-            "invoice_type": get_val(row, config.get('invoice_type')),
+            "total_discount": get_val(row, c_total_disc),
+            "dpp": dpp, "tax": get_val(row, c_tax), "nett": nett,
+            "order_no": get_val(row, c_order_no),
+            "order_date": get_val(row, c_order_date),
+            "invoice_no": get_val(row, c_invoice_no),
+            "invoice_date": get_val(row, c_invoice_date),
+            "invoice_type": get_val(row, c_invoice_type),
             "flag_bonus": flag_bonus, "flag_move": "N",
             "createdate": now, "createby": username
-        })
+        }
+        # Hash isi baris untuk diff upload ulang (lihat process.upload_diff)
+        item["row_hash"] = row_hash(item)
+        data.append(item)
     return data
 
 # --- FUNGSI OPTIMASI BARU ---
 
-def delete_sellout_temp_old_months(conn, target_date):
-    """Menghapus data di temp yang berbeda bulan/tahun agar tidak menumpuk"""
+def delete_mapping_error_by_month(conn, dist_branches, target_date, branch=None):
+    """
+    Error bulan yang sama diganti hasil upload baru (mencegah error ganda dan
+    re-resolve data lama). Dengan branch, hanya error dari upload branch tsb
+    bulan itu (sellout_upload) yang dihapus: baris yang memang digantikan
+    replace penuh. Error dari upload branch lain atau sebelum migrasi 0005
+    tidak disentuh.
+    """
     cur = conn.cursor()
-    cur.execute("""
-        DELETE FROM sellout_temp 
-        WHERE EXTRACT(MONTH FROM invoice_date) != EXTRACT(MONTH FROM %s::date)
-           OR EXTRACT(YEAR FROM invoice_date) != EXTRACT(YEAR FROM %s::date)
-    """, (target_date, target_date))
+    scope = ""
+    params = [list(dist_branches), target_date, target_date]
+    if branch is not None:
+        scope = """
+          AND EXISTS (
+              SELECT 1 FROM sellout_upload u
+              WHERE u.branch = %s
+                AND u.period = date_trunc('month', %s::date)
+                AND u.upload_batch_id = mapping_error.upload_batch_id::text
+          )"""
+        params += [branch, target_date]
+    cur.execute(f"""
+        DELETE FROM mapping_error
+        WHERE kodebranch = ANY(%s)
+          AND invoice_date >= date_trunc('month', %s::date)
+          AND invoice_date < date_trunc('month', %s::date) + INTERVAL '1 month'{scope}
+    """, params)
     cur.close()
 
+# Range tanggal (bukan EXTRACT) supaya index (branch_code, invoice_date) terpakai
+DELETE_SELLOUT_MONTH_SQL = """
+    DELETE FROM sellout
+    WHERE branch_code = %s
+      AND invoice_date >= date_trunc('month', %s::date)
+      AND invoice_date < date_trunc('month', %s::date) + INTERVAL '1 month'
+"""
+
 def delete_sellout_final_by_month(conn, branch, target_date):
     """Menghapus seluruh bulan di tabel final agar revisi data bersih (tidak parsial)"""
     cur = conn.cursor()
-    cur.execute("""
-        DELETE FROM sellout
-        WHERE branch_code = %s
-          AND EXTRACT(MONTH FROM invoice_date) = EXTRACT(MONTH FROM %s::date)
-          AND EXTRACT(YEAR FROM invoice_date) = EXTRACT(YEAR FROM %s::date)
-    """, (branch, target_date, target_date))
+    cur.execute(DELETE_SELLOUT_MONTH_SQL, (branch, target_date, target_date))
     cur.close()
 
-def insert_sellout(conn, rows):
+def insert_sellout(conn, rows, table="sellout_temp"):
     cur = conn.cursor()
     columns = rows[0].keys()
     values = [[r[c] for c in columns] for r in rows]
-    sql = f"INSERT INTO sellout_temp ({','.join(columns)}) VALUES %s"
+    sql = f"INSERT INTO {table} ({','.join(columns)}) VALUES %s"
     execute_values(cur, sql, values, page_size=1000)
     cur.close()
\ No newline at end of file
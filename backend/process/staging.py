@@ -0,0 +1,154 @@
+import uuid
+
+# Staging per upload batch: UNLOGGED (tanpa WAL) dan hanya dipakai satu
+# batch, jadi upload/finalize antar branch tidak saling mengunci sellout_temp
+STAGING_PREFIX = "sellout_stage_"
+
+# Staging yang job-nya tidak lagi PENDING/PROCESSING dan lebih tua dari ini
+# dianggap yatim dan di-drop oleh sweeper (job FAILED masih bisa dicek dulu)
+ORPHAN_MAX_AGE_HOURS = 24
+
+
+def staging_table_name(upload_batch_id):
+    # uuid.UUID() menolak input aneh, nama tabel aman dipakai di SQL
+    return STAGING_PREFIX + uuid.UUID(str(upload_batch_id)).hex
+
+
+def create_staging_table(conn, upload_batch_id, kodebranch=None):
+    table = staging_table_name(upload_batch_id)
+    cur = conn.cursor()
+    try:
+        cur.execute(f"CREATE UNLOGGED TABLE {table} (LIKE sellout_temp INCLUDING DEFAULTS)")
+        cur.execute("""
+            INSERT INTO sellout_staging (upload_batch_id, table_name, kodebranch, created_at)
+            VALUES (%s, %s, %s, NOW())
+        """, (str(upload_batch_id), table, kodebranch))
+    finally:
+        cur.close()
+    return table
+
+
+def index_staging_table(conn, table):
+    """Dipanggil setelah bulk insert: lebih cepat daripada insert ke tabel ber-index"""
+    cur = conn.cursor()
+    try:
+        cur.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+        cur.execute(f"ANALYZE {table}")
+    finally:
+        cur.close()
+
+
+def staging_table_for(conn, upload_batch_id):
+    """Nama staging table batch, None untuk batch lama yang masih di sellout_temp"""
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT table_name FROM sellout_staging WHERE upload_batch_id = %s
+        """, (str(upload_batch_id),))
+        row = cur.fetchone()
+        return row[0] if row else None
+    finally:
+        cur.close()
+
+
+class StagingLostError(Exception):
+    """Staging batch kosong padahal job mencatat baris: jangan di-retry / DONE"""
+
+
+def check_staging_intact(conn, upload_batch_id, table):
+    """
+    Staging UNLOGGED di-truncate PostgreSQL setelah crash, sementara
+    registrasinya di sellout_staging tetap ada. Finalize tabel kosong akan
+    memindahkan 0 baris dan menandai job DONE, padahal upload sudah menghapus
+    bulan itu dari sellout. Raise StagingLostError jika tabel kosong tetapi
+    row_count job > 0.
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT EXISTS (SELECT 1 FROM {table})")
+        if cur.fetchone()[0]:
+            return
+        cur.execute("""
+            SELECT COALESCE(MAX(row_count), 0)
+            FROM sellout_process_queue
+            WHERE upload_batch_id = %s
+        """, (str(upload_batch_id),))
+        expected = cur.fetchone()[0]
+    finally:
+        cur.close()
+    if expected > 0:
+        raise StagingLostError(
+            f"Staging {table} kosong padahal batch {upload_batch_id} berisi {expected} baris "
+            "(kemungkinan ter-truncate setelah PostgreSQL crash). Data bulan ini sudah "
+            "dihapus saat upload: upload ulang file branch ini."
+        )
+
+
+def drop_staging_table(conn, upload_batch_id):
+    table = staging_table_name(upload_batch_id)
+    cur = conn.cursor()
+    try:
+        cur.execute(f"DROP TABLE IF EXISTS {table}")
+        cur.execute("DELETE FROM sellout_staging WHERE upload_batch_id = %s", (str(upload_batch_id),))
+    finally:
+        cur.close()
+
+
+def sweep_orphans(conn, max_age_hours=ORPHAN_MAX_AGE_HOURS):
+    """
+    Drop staging table yang tertinggal (job gagal / upload terputus) dan
+    hapus baris sellout_temp yang sudah tidak dirujuk mapping_error.
+    Return jumlah (staging, baris sellout_temp) yang dibersihkan.
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT s.upload_batch_id
+            FROM sellout_staging s
+            WHERE s.created_at < NOW() - make_interval(hours => %s)
+              AND NOT EXISTS (
+                  SELECT 1 FROM sellout_process_queue q
+                  WHERE q.upload_batch_id = s.upload_batch_id
+                    AND q.status IN ('PENDING', 'PROCESSING')
+              )
+        """, (max_age_hours,))
+        orphans = [r[0] for r in cur.fetchall()]
+
+        for batch_id in orphans:
+            drop_staging_table(conn, batch_id)
+            conn.commit()
+
+        # Tabel staging tanpa registry (mis. dibuat manual / registry terhapus)
+        cur.execute("""
+            SELECT c.relname
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relkind = 'r'
+              AND n.nspname = current_schema()
+              AND c.relname LIKE %s
+              AND NOT EXISTS (
+                  SELECT 1 FROM sellout_staging s WHERE s.table_name = c.relname
+              )
+        """, (STAGING_PREFIX + "%",))
+        unregistered = [r[0] for r in cur.fetchall()]
+        for table in unregistered:
+            cur.execute(f'DROP TABLE IF EXISTS "{table}"')
+        conn.commit()
+
+        # Baris gagal yang sudah di-resolve / diganti upload baru
+        cur.execute("""
+            DELETE FROM sellout_temp st
+            WHERE st.flag_move = 'Y'
+              AND NOT EXISTS (
+                  SELECT 1 FROM mapping_error me WHERE me.sellout_temp_id = st.id
+              )
+        """)
+        deleted_temp = cur.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    return len(orphans) + len(unregistered), deleted_temp
@@ -0,0 +1,197 @@
+import hashlib
+import json
+from collections import Counter
+
+# Kolom yang tidak ikut hash baris (berubah setiap upload walau isi sama)
+HASH_EXCLUDE = {"upload_batch_id", "createdate", "createby", "flag_move", "row_hash"}
+
+MONTH_RANGE_SQL = """
+    invoice_date >= date_trunc('month', %(period)s::date)
+    AND invoice_date < date_trunc('month', %(period)s::date) + INTERVAL '1 month'
+"""
+
+
+def file_hash(data, config):
+    """Hash isi file + config branch (config berubah -> hasil parse berubah)"""
+    h = hashlib.sha256(data)
+    h.update(json.dumps(config, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def row_hash(row):
+    payload = "|".join(f"{k}={row[k]}" for k in sorted(row) if k not in HASH_EXCLUDE)
+    return hashlib.md5(payload.encode()).hexdigest()
+
+
+def find_identical_upload(conn, branch, fhash):
+    """
+    upload_batch_id upload terakhir (per bulan) dengan hash file sama yang
+    datanya sudah masuk, None jika tidak ada. Masuk = job finalize DONE, atau
+    upload tanpa job (diff tanpa baris baru). Job yang DEAD/gagal/masih
+    antri tidak dihitung, supaya user bisa upload ulang file yang sama.
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT u.upload_batch_id
+            FROM sellout_upload u
+            WHERE u.branch = %s
+              AND u.file_hash = %s
+              AND NOT EXISTS (
+                  SELECT 1 FROM sellout_upload n
+                  WHERE n.branch = u.branch
+                    AND n.period = u.period
+                    AND n.id > u.id
+              )
+              AND NOT EXISTS (
+                  SELECT 1 FROM sellout_process_queue q
+                  WHERE q.upload_batch_id = u.upload_batch_id
+                    AND q.status <> 'DONE'
+              )
+            LIMIT 1
+        """, (branch, fhash))
+        row = cur.fetchone()
+        return row[0] if row else None
+    finally:
+        cur.close()
+
+
+def record_upload(conn, branch, period, fhash, upload_batch_id, row_count, mode):
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            INSERT INTO sellout_upload (branch, period, file_hash, upload_batch_id, row_count, mode, created_at)
+            VALUES (%s, date_trunc('month', %s::date), %s, %s, %s, %s, NOW())
+        """, (branch, period, fhash, upload_batch_id, row_count, mode))
+    finally:
+        cur.close()
+
+
+def has_pending_batch(conn, branch):
+    """Batch branch ini yang belum selesai di-finalize (datanya belum ada di sellout)"""
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT 1
+            FROM sellout_staging s
+            JOIN sellout_process_queue q ON q.upload_batch_id = s.upload_batch_id
+            WHERE s.kodebranch = %s
+              AND q.status IN ('PENDING', 'PROCESSING')
+            LIMIT 1
+        """, (branch,))
+        return cur.fetchone() is not None
+    finally:
+        cur.close()
+
+
+def existing_hashes(conn, branch, dist_branches, period):
+    """
+    Hash baris yang sudah tersimpan untuk branch-bulan: (Counter sellout,
+    Counter mapping_error). None jika ada baris lama tanpa row_hash, karena
+    diff tidak bisa dihitung dan upload harus replace penuh.
+    """
+    params = {"branch": branch, "dist": list(dist_branches), "period": period}
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            SELECT row_hash, COUNT(1)
+            FROM sellout
+            WHERE branch_code = %(branch)s
+              AND {MONTH_RANGE_SQL}
+            GROUP BY row_hash
+        """, params)
+        final = Counter(dict(cur.fetchall()))
+
+        cur.execute(f"""
+            SELECT st.row_hash, COUNT(1)
+            FROM mapping_error me
+            LEFT JOIN sellout_temp st ON st.id = me.sellout_temp_id
+            WHERE me.kodebranch = ANY(%(dist)s)
+              AND {MONTH_RANGE_SQL.replace("invoice_date", "me.invoice_date")}
+            GROUP BY st.row_hash
+        """, params)
+        error = Counter(dict(cur.fetchall()))
+    finally:
+        cur.close()
+
+    if None in final or None in error:
+        return None
+    return final, error
+
+
+def plan_diff(rows, final, error):
+    """
+    Bandingkan multiset hash file baru dengan yang tersimpan.
+    Return (baris yang perlu di-insert, hapus dari sellout, hapus dari mapping_error, jumlah tetap).
+    """
+    new = Counter(r["row_hash"] for r in rows)
+
+    keep_final = final & new
+    remaining = new - keep_final
+    keep_error = error & remaining
+    to_insert = remaining - keep_error
+
+    rows_to_insert = []
+    quota = Counter(to_insert)
+    for r in rows:
+        if quota[r["row_hash"]] > 0:
+            quota[r["row_hash"]] -= 1
+            rows_to_insert.append(r)
+
+    unchanged = sum(keep_final.values()) + sum(keep_error.values())
+    return rows_to_insert, final - keep_final, error - keep_error, unchanged
+
+
+def _unnest_counts(counter):
+    hashes = list(counter)
+    return hashes, [counter[h] for h in hashes]
+
+
+def apply_removals(conn, branch, dist_branches, period, remove_final, remove_error):
+    """Hapus baris lama yang tidak ada lagi di file (sejumlah kemunculannya)"""
+    cur = conn.cursor()
+    try:
+        if remove_final:
+            hashes, counts = _unnest_counts(remove_final)
+            cur.execute(f"""
+                DELETE FROM sellout s
+                USING (
+                    SELECT x.ctid AS row_ctid
+                    FROM (
+                        SELECT ctid, row_hash,
+                               row_number() OVER (PARTITION BY row_hash) AS rn
+                        FROM sellout
+                        WHERE branch_code = %(branch)s
+                          AND {MONTH_RANGE_SQL}
+                          AND row_hash = ANY(%(hashes)s)
+                    ) x
+                    JOIN unnest(%(hashes)s::text[], %(counts)s::int[]) AS r(row_hash, n)
+                      ON r.row_hash = x.row_hash
+                    WHERE x.rn <= r.n
+                ) d
+                WHERE s.ctid = d.row_ctid
+            """, {"branch": branch, "period": period, "hashes": hashes, "counts": counts})
+
+        if remove_error:
+            hashes, counts = _unnest_counts(remove_error)
+            cur.execute(f"""
+                DELETE FROM mapping_error m
+                USING (
+                    SELECT x.id
+                    FROM (
+                        SELECT me.id, st.row_hash,
+                               row_number() OVER (PARTITION BY st.row_hash) AS rn
+                        FROM mapping_error me
+                        JOIN sellout_temp st ON st.id = me.sellout_temp_id
+                        WHERE me.kodebranch = ANY(%(dist)s)
+                          AND {MONTH_RANGE_SQL.replace("invoice_date", "me.invoice_date")}
+                          AND st.row_hash = ANY(%(hashes)s)
+                    ) x
+                    JOIN unnest(%(hashes)s::text[], %(counts)s::int[]) AS r(row_hash, n)
+                      ON r.row_hash = x.row_hash
+                    WHERE x.rn <= r.n
+                ) d
+                WHERE m.id = d.id
+            """, {"dist": list(dist_branches), "period": period, "hashes": hashes, "counts": counts})
+    finally:
+        cur.close()
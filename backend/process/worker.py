@@ -1,58 +1,108 @@
 import time
 from db import get_db_connection, release_db_connection
 from process.sellout_service import process_sellout_to_final
+from process.reresolve import reresolve_mapping_errors
+from process.staging import sweep_orphans, StagingLostError
+from process.batch_metrics import StageTimer, record_finalize_metrics
+from db_timing import start_stats, stop_stats
+from metrics import WORKER_JOBS, WORKER_JOB_DURATION, WORKER_ROWS
+from process.job_queue import (
+    Heartbeat,
+    claim_job,
+    complete_job,
+    fail_job,
+    format_error,
+    reclaim_expired
+)
 
-def sellout_worker():
+# Sweeper staging yatim dijalankan saat worker idle, paling sering tiap interval ini
+SWEEP_INTERVAL = 600
+
+# Reclaim lease kedaluwarsa paling sering tiap interval ini (detik)
+RECLAIM_INTERVAL = 15
+
+
+def run_job(conn, job_id, batch_id, job_type, payload):
+    if job_type == 'RERESOLVE':
+        result = reresolve_mapping_errors(conn, payload)
+        print(f"🔁 Re-resolve {payload['mapping']}: {result['resolved']} baris pindah ke sellout")
+        WORKER_ROWS.inc("moved", amount=result["resolved"])
+        return
+
+    timer = StageTimer()
+    moved, errors = process_sellout_to_final(conn, batch_id, timer=timer)
+    WORKER_ROWS.inc("moved", amount=moved)
+    WORKER_ROWS.inc("error", amount=errors)
+    try:
+        record_finalize_metrics(conn, batch_id, job_id, timer, moved, errors)
+    except Exception as e:
+        # Metrics tidak boleh menggagalkan job yang datanya sudah pindah
+        conn.rollback()
+        print(f"⚠️ Metrics batch {batch_id} tidak tercatat:", e)
+
+
+def sellout_worker(lane=None):
+    """lane "FAST"/"BULK" membatasi jalur yang diambil, None = semua jalur"""
+    last_sweep = 0
+    last_reclaim = 0
     while True:
         conn = get_db_connection()
-        cur = conn.cursor()
+        job_id = None
 
         try:
-            cur.execute("""
-                SELECT id, upload_batch_id
-                FROM sellout_process_queue
-                WHERE status = 'PENDING'
-                ORDER BY created_at
-                LIMIT 1
-                FOR UPDATE SKIP LOCKED
-            """)
-
-            job = cur.fetchone()
+            if time.monotonic() - last_reclaim > RECLAIM_INTERVAL:
+                last_reclaim = time.monotonic()
+                for reclaimed_id, status in reclaim_expired(conn):
+                    print(f"♻️ Job {reclaimed_id} lease kedaluwarsa -> {status}")
+
+            job = claim_job(conn, lane=lane)
             if not job:
-                conn.commit()
+                if time.monotonic() - last_sweep > SWEEP_INTERVAL:
+                    last_sweep = time.monotonic()
+                    dropped, deleted = sweep_orphans(conn)
+                    if dropped or deleted:
+                        print(f"🧹 Sweeper: {dropped} staging di-drop, {deleted} baris sellout_temp dihapus")
                 time.sleep(2)
                 continue
 
-            job_id, batch_id = job
+            job_id, batch_id, job_type, payload, attempts, max_attempts = job
+            started = time.perf_counter()
 
-            cur.execute("""
-                UPDATE sellout_process_queue
-                SET status = 'PROCESSING',
-                    started_at = NOW()
-                WHERE id = %s
-            """, (job_id,))
-            conn.commit()
+            # Slow query log menyebut job-nya
+            _, stats_token = start_stats(f"job {job_type} {job_id}")
+            try:
+                with Heartbeat(job_id):
+                    run_job(conn, job_id, batch_id, job_type, payload)
+            finally:
+                stop_stats(stats_token)
 
-            process_sellout_to_final(conn, batch_id)
-
-            cur.execute("""
-                UPDATE sellout_process_queue
-                SET status = 'DONE',
-                    finished_at = NOW()
-                WHERE id = %s
-            """, (job_id,))
-            conn.commit()
+            WORKER_JOB_DURATION.observe(time.perf_counter() - started, job_type)
+            started = None
+            if complete_job(conn, job_id):
+                WORKER_JOBS.inc(job_type, "done")
+            else:
+                WORKER_JOBS.inc(job_type, "lost")
+                print(f"⚠️ Job {job_id} selesai tetapi lease sudah diambil worker lain")
 
         except Exception as e:
             conn.rollback()
-            cur.execute("""
-                UPDATE sellout_process_queue
-                SET status = 'FAILED'
-                WHERE id = %s
-            """, (job_id,))
-            conn.commit()
-            print("❌ Worker error:", e)
+            if job_id is None:
+                # Gagal sebelum/saat klaim job (mis. koneksi DB putus)
+                print("❌ Worker error:", e)
+                time.sleep(2)
+            else:
+                try:
+                    if started is not None:
+                        WORKER_JOB_DURATION.observe(time.perf_counter() - started, job_type)
+                    # Staging hilang: retry hanya akan DONE dengan 0 baris
+                    status = fail_job(conn, job_id, format_error(e), permanent=isinstance(e, StagingLostError))
+                    outcome = {"PENDING": "retry", "DEAD": "dead"}.get(status, "lost")
+                    WORKER_JOBS.inc(job_type, outcome)
+                    print(f"❌ Job {job_id} gagal (percobaan {attempts}/{max_attempts}) -> {status}: {e}")
+                except Exception as fail_error:
+                    # Lease tidak diperpanjang lagi, job di-reclaim setelah kedaluwarsa
+                    conn.rollback()
+                    print(f"❌ Job {job_id} gagal, status tidak tercatat: {e} / {fail_error}")
 
         finally:
-            cur.close()
             release_db_connection(conn)
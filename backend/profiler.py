@@ -0,0 +1,214 @@
+"""
+Profiling on-demand satu request API, khusus admin.
+
+Aktif hanya jika PROFILE_ADMINS (id_user dipisah koma) diisi; jika kosong
+hook tidak dipasang sama sekali. Request diprofile jika membawa header
+X-Profile atau query ?_profile=, dan token-nya milik admin:
+
+    X-Profile: 1 / cprofile   deterministik (cProfile) -> .pstats
+    X-Profile: sampling       sampling (pip install pyinstrument) -> speedscope JSON
+
+Hasil disimpan di PROFILE_DIR sebagai ring buffer PROFILE_KEEP file
+terakhir; id-nya dikirim di header X-Profile-Id dan bisa diunduh lewat
+GET /debug/profiles/<id> (buka .pstats dengan snakeviz/pstats, JSON di
+https://www.speedscope.app).
+
+Hanya satu request yang diprofile pada satu waktu per proses; request
+admin lain yang datang bersamaan dilayani tanpa profile dan mendapat
+header X-Profile-Skipped: busy.
+"""
+import cProfile
+import importlib.util
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+import jwt
+
+SECRET_KEY = os.getenv("SECRET_KEY", "dev_secret")
+
+PROFILE_ADMINS = {u.strip() for u in os.getenv("PROFILE_ADMINS", "").split(",") if u.strip()}
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "sellout-profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+
+MODES = {"1": "cprofile", "cprofile": "cprofile", "sampling": "sampling"}
+EXTENSIONS = {"cprofile": ".pstats", "sampling": ".speedscope.json"}
+
+_prune_lock = threading.Lock()
+# Satu profile aktif per proses: cProfile (Python 3.12+, sys.monitoring) dan
+# pyinstrument menolak profiler kedua yang aktif bersamaan (ValueError)
+_active_lock = threading.Lock()
+
+
+def enabled():
+    return bool(PROFILE_ADMINS)
+
+
+def admin_user(token):
+    """id_user jika token valid dan termasuk PROFILE_ADMINS, selain itu None"""
+    if not token or not PROFILE_ADMINS:
+        return None
+    try:
+        user = jwt.decode(token, SECRET_KEY, algorithms=["HS256"]).get("id_user")
+    except Exception:
+        return None
+    return user if user in PROFILE_ADMINS else None
+
+
+def _slug(path):
+    return re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-")[:60] or "root"
+
+
+class _Session:
+    def __init__(self, mode):
+        self.mode = mode
+        self.started = time.perf_counter()
+        if mode == "sampling":
+            from pyinstrument import Profiler
+            self.profiler = Profiler(async_mode="disabled")
+        else:
+            self.profiler = cProfile.Profile()
+
+    def start(self):
+        if self.mode == "sampling":
+            self.profiler.start()
+        else:
+            self.profiler.enable()
+
+    def stop(self):
+        if self.mode == "sampling":
+            self.profiler.stop()
+        else:
+            self.profiler.disable()
+        return (time.perf_counter() - self.started) * 1000
+
+    def dump(self, path):
+        if self.mode == "sampling":
+            from pyinstrument.renderers import SpeedscopeRenderer
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.profiler.output(renderer=SpeedscopeRenderer()))
+        else:
+            self.profiler.dump_stats(path)
+
+
+def save(session, method, path, user, status, elapsed_ms):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile_id = f"{time.time_ns() // 1000}-{method.lower()}-{_slug(path)}"
+    file_name = profile_id + EXTENSIONS[session.mode]
+    session.dump(os.path.join(PROFILE_DIR, file_name))
+    meta = {
+        "id": profile_id,
+        "file": file_name,
+        "mode": session.mode,
+        "method": method,
+        "path": path,
+        "user": user,
+        "status": status,
+        "elapsed_ms": round(elapsed_ms, 1),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+    with open(os.path.join(PROFILE_DIR, profile_id + ".meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    prune()
+    return profile_id
+
+
+def list_profiles():
+    """Metadata profile, terbaru dulu"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    result = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if not name.endswith(".meta.json"):
+            continue
+        try:
+            with open(os.path.join(PROFILE_DIR, name), encoding="utf-8") as f:
+                result.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return result
+
+
+def find_profile(profile_id):
+    """(path file, mode) atau None. profile_id divalidasi dari metadata, bukan path mentah"""
+    for meta in list_profiles():
+        if meta["id"] == profile_id:
+            return os.path.join(PROFILE_DIR, meta["file"]), meta["mode"]
+    return None
+
+
+def prune(keep=None):
+    """Ring buffer: hapus profile terlama di luar `keep` terakhir"""
+    keep = PROFILE_KEEP if keep is None else keep
+    with _prune_lock:
+        for meta in list_profiles()[keep:]:
+            for name in (meta["file"], meta["id"] + ".meta.json"):
+                try:
+                    os.remove(os.path.join(PROFILE_DIR, name))
+                except OSError:
+                    pass
+
+
+def init_app(app):
+    """Pasang hook profiling; tanpa PROFILE_ADMINS tidak ada hook sama sekali"""
+    if not enabled():
+        return
+
+    from flask import g, request
+
+    sampling_available = importlib.util.find_spec("pyinstrument") is not None
+
+    @app.before_request
+    def _profile_start():
+        flag = request.headers.get("X-Profile") or request.args.get("_profile")
+        if not flag:
+            return
+        user = admin_user(request.headers.get("Authorization"))
+        mode = MODES.get(flag.lower())
+        if user is None or mode is None:
+            return
+        if mode == "sampling" and not sampling_available:
+            mode = "cprofile"
+        if not _active_lock.acquire(blocking=False):
+            # Request admin lain sedang diprofile: layani tanpa profile
+            g._profile_skipped = True
+            return
+        try:
+            session = _Session(mode)
+            session.start()
+        except Exception:
+            _active_lock.release()
+            raise
+        g._profile = (session, user)
+
+    @app.after_request
+    def _profile_stop(response):
+        if g.pop("_profile_skipped", False):
+            response.headers["X-Profile-Skipped"] = "busy"
+        state = g.pop("_profile", None)
+        if state is None:
+            return response
+        session, user = state
+        try:
+            elapsed_ms = session.stop()
+        finally:
+            _active_lock.release()
+        try:
+            profile_id = save(session, request.method, request.path, user, response.status_code, elapsed_ms)
+            response.headers["X-Profile-Id"] = profile_id
+        except Exception as e:
+            print("⚠️ Profile gagal disimpan:", e)
+        return response
+
+    @app.teardown_request
+    def _profile_teardown(exc):
+        # Exception tak tertangani: profiler tetap dimatikan
+        state = g.pop("_profile", None)
+        if state is not None:
+            try:
+                state[0].stop()
+            finally:
+                _active_lock.release()
@@ -4,6 +4,8 @@ import jwt, os
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
+from process.reresolve import enqueue_reresolve
 
 mapping_branch_bp = Blueprint('mapping_branch', __name__, url_prefix='/mapping-branch')
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev_secret')
@@ -78,22 +80,12 @@ def insert_mapping_branch():
     branchdists = [row.get("branch_dist") for row in data if row.get("branch_dist")]
 
     # CEK DATA BRANCH
-    cur.execute("""
-        SELECT kodebranch, nama_branch 
-        FROM branch 
-        WHERE kodebranch = ANY(%s::varchar[])
-    """, (kodebranches,))
-    branch_rows = cur.fetchall()
-    branch_map = {r["kodebranch"]: r["nama_branch"] for r in branch_rows}
+    branch_rows = reference_cache.lookup(conn, "branch", kodebranches)
+    branch_map = {k: r["nama_branch"] for k, r in branch_rows.items()}
 
     # CEK DATA BRANCH_DIST
-    cur.execute("""
-        SELECT branch_dist, nama_branch_dist
-        FROM branch_dist
-        WHERE branch_dist = ANY(%s::varchar[])
-    """, (branchdists,))
-    branchdist_rows = cur.fetchall()
-    branchdist_map = {r["branch_dist"]: r["nama_branch_dist"] for r in branchdist_rows}
+    branchdist_rows = reference_cache.lookup(conn, "branch_dist", branchdists)
+    branchdist_map = {k: r["nama_branch_dist"] for k, r in branchdist_rows.items()}
 
     # CEK DUPLIKAT DI mapping_branch 
     cur.execute("""
@@ -144,6 +136,9 @@ def insert_mapping_branch():
         execute_values(cur, insert_sql, rows_to_insert)
         inserted_count = len(rows_to_insert)
 
+    # Proses ulang mapping_error untuk kode dist yang baru di-mapping
+    reresolve_job = enqueue_reresolve(cur, "branch", [r[2] for r in rows_to_insert])
+
     conn.commit()
     cur.close()
     release_db_connection(conn)
@@ -152,7 +147,8 @@ def insert_mapping_branch():
         "message": f"{inserted_count} data berhasil diinsert",
         "invalid_kodebranch": list(set(invalid_branch)),
         "invalid_branchdist": list(set(invalid_branchdist)),
-        "skipped_duplicate": list(set(skipped_duplicate))
+        "skipped_duplicate": list(set(skipped_duplicate)),
+        "reresolve_jobs": [reresolve_job] if reresolve_job else []
     }), 200
 
 # DELETE MAPPING BRANCH
@@ -4,6 +4,7 @@ import jwt, os
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
 
 area_bp = Blueprint('area', __name__, url_prefix='/area')
 SECRET_KEY = os.getenv("SECRET_KEY", "dev_secret")
@@ -103,6 +104,7 @@ def insert_area():
         inserted_count = len(rows_to_insert)
     
     conn.commit()
+    reference_cache.invalidate("area")
     cur.close()
     release_db_connection(conn)
 
@@ -136,6 +138,7 @@ def update_area_route(id_area):
             (description, datetime.now(), updateby, id_area)
         )
         conn.commit()
+        reference_cache.invalidate("area")
     except Exception as e:
         conn.rollback()
         cursor.close()
@@ -164,6 +167,7 @@ def delete_areas_route():
         format_strings = ",".join(["%s"] * len(id_areas))
         cursor.execute(f"DELETE FROM area WHERE id_area IN ({format_strings})", tuple(id_areas))
         conn.commit()
+        reference_cache.invalidate("area")
     except Exception as e:
         conn.rollback()
         cursor.close()
@@ -4,6 +4,7 @@ import jwt, os
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
 
 branch_bp = Blueprint('branch', __name__, url_prefix='/branch')
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev_secret')
@@ -109,19 +110,13 @@ def insert_branch():
     existing_ids = [row["kodebranch"] for row in existing_rows] if existing_rows else []
 
     # CEK KODEREGION VALID
-    cur.execute("SELECT koderegion FROM region WHERE koderegion = ANY(%s)", (koderegions,))
-    region_rows = cur.fetchall()
-    valid_koderegion = [row["koderegion"] for row in region_rows]
+    valid_koderegion = reference_cache.valid_keys(conn, "region", koderegions)
 
     # CEK ENTITY VALID
-    cur.execute("SELECT id_entity FROM entity WHERE id_entity = ANY(%s)", (kodeentity,))
-    entity_rows = cur.fetchall()
-    valid_entity = [row["id_entity"] for row in entity_rows]
+    valid_entity = reference_cache.valid_keys(conn, "entity", kodeentity)
 
     # CEK AREA VALID
-    cur.execute("SELECT id_area FROM area WHERE id_area = ANY(%s)", (id_areas,))
-    area_rows = cur.fetchall()
-    valid_area = [row["id_area"] for row in area_rows]
+    valid_area = reference_cache.valid_keys(conn, "area", id_areas)
 
     # FILTER VALID ROWS
     rows_valid = [
@@ -142,6 +137,7 @@ def insert_branch():
         inserted_count = len(rows_to_insert)
 
     conn.commit()
+    reference_cache.invalidate("branch")
     cur.close()
     release_db_connection(conn)
 
@@ -176,6 +172,7 @@ def update_branch_route(kodebranch):
             (nama_branch, alamat, host, ftp_user, ftp_password, datetime.now(), updateby, kodebranch)
         )
         conn.commit()
+        reference_cache.invalidate("branch")
     except Exception as e:
         conn.rollback()
         cursor.close()
@@ -204,6 +201,7 @@ def delete_entity_route():
         format_strings = ",".join(["%s"] * len(kodebranch))
         cursor.execute(f"DELETE FROM branch WHERE kodebranch IN ({format_strings})", tuple(kodebranch))
         conn.commit()
+        reference_cache.invalidate("branch")
     except Exception as e:
         conn.rollback()
         cursor.close()
@@ -4,6 +4,7 @@ import jwt, os
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
 
 branch_dist_bp = Blueprint('branch_dist', __name__, url_prefix='/branch-dist')
 SECRET_KEY = os.getenv('SECRET_KEY', "dev_secret")
@@ -111,6 +112,7 @@ def insert_branch_dist():
         inserted_count = len(rows_to_insert)
 
     conn.commit()
+    reference_cache.invalidate("branch_dist")
     cur.close()
     release_db_connection(conn)
 
@@ -140,6 +142,7 @@ def update_branch_dist_route(branch_dist):
             (nama_branch_dist, alamat, datetime.now(), updateby, branch_dist)
         )
         conn.commit()
+        reference_cache.invalidate("branch_dist")
     except Exception as e:
         conn.rollback()
         cursor.close()
@@ -168,6 +171,7 @@ def delete_branch_dist_route():
         format_strings = ",".join(["%s"] * len(branch_dist))
         cursor.execute(f"DELETE FROM branch_dist WHERE branch_dist IN ({format_strings})", tuple(branch_dist))
         conn.commit()
+        reference_cache.invalidate("branch_dist")
     except Exception as e: 
         conn.rollback()
         cursor.close()
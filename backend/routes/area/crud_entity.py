@@ -4,6 +4,7 @@ import jwt, os
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
 
 entity_bp = Blueprint('entity', __name__, url_prefix='/entity')
 SECRET_KEY = os.getenv('SECRET_KEY', "dev_secret")
@@ -99,13 +100,7 @@ def insert_entity():
     existing_ids = [row["id_entity"] for row in existing_rows] if existing_rows else []
 
     #CEK VALIDASI KODEREGION
-    cur.execute(
-        "select koderegion from region where koderegion = ANY(%s)",
-        (koderegions,)
-    )
-
-    region_rows = cur.fetchall()
-    valid_koderegion = [row["koderegion"] for row in region_rows] if region_rows else []
+    valid_koderegion = reference_cache.valid_keys(conn, "region", koderegions)
 
     # ROW INVALID KODEREGION
     invalid_region_rows = [r for r in rows if r[2] not in valid_koderegion]
@@ -127,6 +122,7 @@ def insert_entity():
         inserted_count = len(rows_to_insert)
 
     conn.commit()
+    reference_cache.invalidate("entity")
     cur.close()
     release_db_connection(conn)
 
@@ -160,6 +156,7 @@ def update_entity_route(id_entity):
             (keterangan, datetime.now(), updateby, id_entity)
         )
         conn.commit()
+        reference_cache.invalidate("entity")
     except Exception as e:
         conn.rollback()
         cursor.close()
@@ -189,6 +186,7 @@ def delete_entity_route():
         format_strings = ",".join(["%s"] * len(id_entity))
         cursor.execute(f"DELETE FROM entity where id_entity IN ({format_strings})", tuple(id_entity))
         conn.commit()
+        reference_cache.invalidate("entity")
     except Exception as e:
         conn.rollback()
         cursor.close()
@@ -4,6 +4,7 @@ import jwt, os
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
 
 region_bp = Blueprint('region', __name__, url_prefix='/region')
 SECRET_KEY = os.getenv("SECRET_KEY", "dev_secret")
@@ -106,6 +107,7 @@ def insert_region():
         inserted_count = len(rows_to_insert)
 
     conn.commit()
+    reference_cache.invalidate("region")
     cur.close()
     release_db_connection(conn)
 
@@ -141,6 +143,7 @@ def update_area_route(koderegion):
             (keterangan,pin, datetime.now(), updateby, koderegion)
         )
         conn.commit()
+        reference_cache.invalidate("region")
     except Exception as e:
         conn.rollback()
         cursor.close()
@@ -168,6 +171,7 @@ def delete_region():
         format_strings = ",".join(["%s"] * len(koderegion))
         cursor.execute(f"DELETE FROM region WHERE koderegion IN ({format_strings})", tuple(koderegion))
         conn.commit()
+        reference_cache.invalidate("region")
     except Exception as e:
         conn.rollback()
         cursor.close()
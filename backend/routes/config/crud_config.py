@@ -4,6 +4,7 @@ import jwt, os
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache, parse_plan
 
 config_bp = Blueprint('config', __name__, url_prefix='/config')
 SECRET_KEY = os.getenv('SECRET_KEY', "dev_secret")
@@ -41,7 +42,7 @@ def get_config():
     cursor.execute(""" 
         SELECT c.branch, b.nama_branch, c.id_salesman, c.id_customer, c.id_product, c.qty1, c.qty2, c.qty3, c.price, c.grossamount, c.discount1, c.discount2,
         c.discount3, c.discount4, c.discount5, c.discount6, c.discount7, c.discount8, c.total_discount, c.flag_bonus, c.dpp, c.tax, c.nett, c.order_no, c.order_date,
-        c.invoice_no, c.invoice_date, c.invoice_type, c.sfa_order_no, c.sfa_order_date, c.kodebranch, c.file_extension, c.separator_file, c.first_row, c.createdate, c.createby,
+        c.invoice_no, c.invoice_date, c.invoice_type, c.sfa_order_no, c.sfa_order_date, c.kodebranch, c.file_extension, c.separator_file, c.first_row, c.parse_engine, c.date_format, c.createdate, c.createby,
         c.updatedate, c.updateby
         FROM config c
         INNER JOIN branch b ON c.branch = b.kodebranch
@@ -113,6 +114,8 @@ def insert_config():
             "separator_file": row.get("separator_file"),
             "first_row": row.get("first_row"),
             "flag_bonus": row.get("flag_bonus"),
+            "parse_engine": row.get("parse_engine") or "c",
+            "date_format": row.get("date_format"),
             "createdate": row.get("createdate") or datetime.now(),
             "createby": row.get("createby") or "SYSTEM"
         })
@@ -134,19 +137,12 @@ def insert_config():
     existing_branches = {r["branch"] for r in cur.fetchall()}
 
     # VALIDASI BRANCH TERDAFTAR
-    cur.execute(
-        """
-        SELECT kodebranch
-        FROM branch
-        WHERE kodebranch = ANY(%s)
-        """,
-        (branches,)
-    )
-    valid_branches = {r["kodebranch"] for r in cur.fetchall()}
+    valid_branches = reference_cache.valid_keys(conn, "branch", branches)
 
     rows_to_insert = []
     skipped_duplicate = []
     skipped_invalid_branch = []
+    skipped_invalid_config = []
 
     for r in rows_input:
         # DUPLIKAT
@@ -159,6 +155,13 @@ def insert_config():
             skipped_invalid_branch.append(r["branch"])
             continue
 
+        # CONFIG HARUS BISA DIKOMPILASI JADI PARSE PLAN
+        try:
+            parse_plan.compile_plan(r)
+        except ValueError as e:
+            skipped_invalid_config.append({"branch": r["branch"], "error": str(e)})
+            continue
+
         rows_to_insert.append((
             r["branch"],
             r["kodebranch"],
@@ -193,6 +196,8 @@ def insert_config():
             r["separator_file"],
             r["first_row"],
             r["flag_bonus"],
+            r["parse_engine"],
+            r["date_format"],
             r["createdate"],
             r["createby"]
         ))
@@ -210,6 +215,7 @@ def insert_config():
                 order_no, order_date, invoice_no, invoice_date, invoice_type,
                 sfa_order_no, sfa_order_date,
                 file_extension, separator_file, first_row, flag_bonus,
+                parse_engine, date_format,
                 createdate, createby
             )
             VALUES %s
@@ -218,6 +224,7 @@ def insert_config():
         inserted_count = len(rows_to_insert)
 
     conn.commit()
+    parse_plan.invalidate([r[0] for r in rows_to_insert])
     cur.close()
     release_db_connection(conn)
 
@@ -225,7 +232,8 @@ def insert_config():
         "message": f"{inserted_count} record berhasil ditambahkan",
         "inserted": inserted_count,
         "skipped_duplicate": list(set(skipped_duplicate)),
-        "skipped_invalid_branch": list(set(skipped_invalid_branch))
+        "skipped_invalid_branch": list(set(skipped_invalid_branch)),
+        "skipped_invalid_config": skipped_invalid_config
     }), 200
 
 
@@ -280,6 +288,13 @@ def update_config(id):
     # STRING FIELDS
     file_extension = payload.get("file_extension")
     separator_file = payload.get("separator_file")
+    parse_engine   = payload.get("parse_engine") or "c"
+    date_format    = payload.get("date_format") or None
+
+    try:
+        parse_plan.compile_plan(dict(payload, branch=id))
+    except ValueError as e:
+        return jsonify({"error": f"Config tidak valid: {e}"}), 400
 
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -320,6 +335,8 @@ def update_config(id):
                 separator_file=%s,
                 first_row=%s,
                 flag_bonus=%s,
+                parse_engine=%s,
+                date_format=%s,
                 updatedate=%s,
                 updateby=%s
             WHERE branch=%s
@@ -356,6 +373,8 @@ def update_config(id):
             separator_file,
             first_row,
             flag_bonus,
+            parse_engine,
+            date_format,
             datetime.now(),
             updateby,
             id   
@@ -366,6 +385,7 @@ def update_config(id):
             return jsonify({"error": "Data tidak ditemukan"}), 404
 
         conn.commit()
+        parse_plan.invalidate([id])
 
     except Exception as e:
         conn.rollback()
@@ -396,6 +416,7 @@ def delete_areas_route():
         format_strings = ",".join(["%s"] * len(branch))
         cursor.execute(f"DELETE FROM config WHERE branch IN ({format_strings})", tuple(branch))
         conn.commit()
+        parse_plan.invalidate(branch)
     except Exception as e:
         conn.rollback()
         cursor.close()
@@ -1,13 +1,26 @@
 from datetime import datetime
 from flask import Blueprint, jsonify, request
 import jwt, os
+import psycopg2
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
+from process.request_stream import body_chunks
+from process.reresolve import enqueue_reresolve
+from process.mapping_suggest import suggest_customers
 
 mapping_customer_bp = Blueprint('mapping_customer', __name__, url_prefix='/mapping-customer')
 SECRET_KEY = os.getenv('SECRET_KEY', "dev_secret")
 
+# Query halaman /data (juga di-EXPLAIN oleh explain_routes.py)
+DATA_SQL = """
+    SELECT *
+    FROM mapping_customer
+    WHERE branch_prc = %s
+    LIMIT %s OFFSET %s
+"""
+
 # Middleware untuk verifikasi token
 def token_required(f):
     @wraps(f)
@@ -48,12 +61,7 @@ def get_mapping_customer():
 
     try:
         
-        cursor.execute("""
-                SELECT * 
-                FROM mapping_customer
-                WHERE branch_prc = %s
-                LIMIT %s OFFSET %s
-            """, (kodebranch, limit, offset))
+        cursor.execute(DATA_SQL, (kodebranch, limit, offset))
         data = cursor.fetchall()
 
         cursor.execute("""
@@ -81,109 +89,169 @@ def get_mapping_customer():
 @mapping_customer_bp.route('/insert', methods=['POST'])
 @token_required
 def insert_mapping_customer():
-    data = request.json
-    if not data or not isinstance(data, list):
+    chunks = body_chunks(request)
+    if chunks is None:
         return jsonify({"error": "Data tidak valid"}), 400
 
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    # 1. Ambil semua custno & custno_dist dari request untuk batch checking
-    custnos_prc = [str(row.get("custno")).strip() for row in data]
-    custnos_dist = [str(row.get("custno_dist")).strip() for row in data]
-
-    # 2. CEK DUPLIKAT (LOGIKA BARU)
-    # Kita cek apakah custno_dist sudah pernah di-mapping ke MANAPUN sebelumnya
-    cur.execute(
-        "SELECT custno_dist, custno FROM mapping_customer WHERE custno_dist = ANY(%s)",
-        (custnos_dist,)
-    )
-    existing_rows = cur.fetchall()
-    # Buat dictionary untuk mapping yang sudah ada: { 'KODE_DIST': 'KODE_PRC' }
-    existing_dist_map = {r["custno_dist"]: r["custno"] for r in existing_rows}
-
-    # 3. Ambil data master (Sama seperti sebelumnya)
-    cur.execute("SELECT custno, custname, kodebranch FROM customer_prc WHERE custno = ANY(%s)", (custnos_prc,))
-    customer_prc_data = {r["custno"]: r for r in cur.fetchall()}
-
-    cur.execute("SELECT custno_dist, custname, branch_dist FROM customer_dist WHERE custno_dist = ANY(%s)", (custnos_dist,))
-    customer_dist_data = {r["custno_dist"]: r for r in cur.fetchall()}
-
-    rows_valid = []
+    inserted_count = 0
+    # Baris yang sudah di-commit (chunk sebelumnya tetap tersimpan jika body rusak di tengah)
+    committed_count = 0
+    # Baris payload (valid maupun di-skip) dari chunk yang sudah di-commit;
+    # client cukup mengirim ulang baris sesudahnya
+    processed_count = 0
+    reresolve_jobs = []
     skipped_duplicate = []
     skipped_prc = []
     skipped_dist = []
-    
+
     # Set internal untuk menangani jika di dalam file upload sendiri ada ID Dist yang ganda
     processed_in_batch = set()
 
-    for row in data:
-        custno = str(row.get("custno")).strip()
-        custno_dist = str(row.get("custno_dist")).strip()
-        kodebranch = row.get("kodebranch")
-        branch_dist = row.get("branch_dist")
-        createby = row.get("createby") or "SYSTEM"
-        createdate = row.get("createdate") or datetime.now()
-
-        # --- VALIDASI 1: CEK DUPLIKAT DI DATABASE ---
-        if custno_dist in existing_dist_map:
-            # Jika sudah ada mapping, kita catat detailnya untuk info di frontend
-            skipped_duplicate.append({
-                "custno_dist": custno_dist,
-                "already_mapped_to": existing_dist_map[custno_dist],
-                "reason": "ID Distributor sudah ter-mapping ke Kode PRC lain"
-            })
-            continue
-
-        # --- VALIDASI 2: CEK DUPLIKAT DI DALAM FILE UPLOAD ITU SENDIRI ---
-        if custno_dist in processed_in_batch:
-            skipped_duplicate.append({
-                "custno_dist": custno_dist,
-                "reason": "ID Distributor muncul dua kali di file upload"
-            })
-            continue
-
-        # --- VALIDASI 3: CEK MASTER PRC ---
-        prc_data = customer_prc_data.get(custno)
-        if not prc_data or prc_data["kodebranch"] != kodebranch:
-            skipped_prc.append(custno)
-            continue
-        custname_prc = prc_data["custname"]
-
-        # --- VALIDASI 4: CEK MASTER DIST ---
-        dist_data = customer_dist_data.get(custno_dist)
-        if not dist_data or dist_data["branch_dist"] != branch_dist:
-            skipped_dist.append(custno_dist)
-            continue
-        custname_dist = dist_data["custname"]
-
-        # Jika lolos semua, tambahkan ke list insert dan tandai sudah diproses
-        rows_valid.append((
-            custno, custname_prc, custno_dist, custname_dist, 
-            createdate, createby, kodebranch, branch_dist
-        ))
-        processed_in_batch.add(custno_dist)
-
-    # 4. EKSEKUSI INSERT
-    inserted_count = 0
-    if rows_valid:
-        insert_sql = """
-            INSERT INTO mapping_customer
-            (custno, custname_prc, custno_dist, custname_dist, createdate, createby, branch_prc, branch_dist)
-            VALUES %s
-        """
-        execute_values(cur, insert_sql, rows_valid, page_size=500)
-        inserted_count = len(rows_valid)
-
-    conn.commit()
-    cur.close()
-    release_db_connection(conn)
+    try:
+        # PROSES PER CHUNK (JSON / NDJSON / CSV)
+        for data in chunks:
+            # 1. Ambil semua custno & custno_dist dari chunk untuk batch checking
+            custnos_prc = [str(row.get("custno")).strip() for row in data]
+            custnos_dist = [str(row.get("custno_dist")).strip() for row in data]
+
+            # 2. CEK DUPLIKAT (LOGIKA BARU)
+            # Kita cek apakah custno_dist sudah pernah di-mapping ke MANAPUN sebelumnya
+            cur.execute(
+                "SELECT custno_dist, custno FROM mapping_customer WHERE custno_dist = ANY(%s)",
+                (custnos_dist,)
+            )
+            existing_rows = cur.fetchall()
+            # Buat dictionary untuk mapping yang sudah ada: { 'KODE_DIST': 'KODE_PRC' }
+            existing_dist_map = {r["custno_dist"]: r["custno"] for r in existing_rows}
+
+            # 3. Ambil data master (Sama seperti sebelumnya)
+            customer_prc_data = reference_cache.lookup(conn, "customer_prc", custnos_prc)
+
+            cur.execute("SELECT custno_dist, custname, branch_dist FROM customer_dist WHERE custno_dist = ANY(%s)", (custnos_dist,))
+            customer_dist_data = {r["custno_dist"]: r for r in cur.fetchall()}
+
+            rows_valid = []
+
+            for row in data:
+                custno = str(row.get("custno")).strip()
+                custno_dist = str(row.get("custno_dist")).strip()
+                kodebranch = row.get("kodebranch")
+                branch_dist = row.get("branch_dist")
+                createby = row.get("createby") or "SYSTEM"
+                createdate = row.get("createdate") or datetime.now()
+
+                # --- VALIDASI 1: CEK DUPLIKAT DI DALAM FILE UPLOAD ITU SENDIRI ---
+                # (dicek lebih dulu karena chunk sebelumnya sudah masuk ke database)
+                if custno_dist in processed_in_batch:
+                    skipped_duplicate.append({
+                        "custno_dist": custno_dist,
+                        "reason": "ID Distributor muncul dua kali di file upload"
+                    })
+                    continue
+
+                # --- VALIDASI 2: CEK DUPLIKAT DI DATABASE ---
+                if custno_dist in existing_dist_map:
+                    # Jika sudah ada mapping, kita catat detailnya untuk info di frontend
+                    skipped_duplicate.append({
+                        "custno_dist": custno_dist,
+                        "already_mapped_to": existing_dist_map[custno_dist],
+                        "reason": "ID Distributor sudah ter-mapping ke Kode PRC lain"
+                    })
+                    continue
+
+                # --- VALIDASI 3: CEK MASTER PRC ---
+                prc_data = customer_prc_data.get(custno)
+                if not prc_data or prc_data["kodebranch"] != kodebranch:
+                    skipped_prc.append(custno)
+                    continue
+                custname_prc = prc_data["custname"]
+
+                # --- VALIDASI 4: CEK MASTER DIST ---
+                dist_data = customer_dist_data.get(custno_dist)
+                if not dist_data or dist_data["branch_dist"] != branch_dist:
+                    skipped_dist.append(custno_dist)
+                    continue
+                custname_dist = dist_data["custname"]
+
+                # Jika lolos semua, tambahkan ke list insert dan tandai sudah diproses
+                rows_valid.append((
+                    custno, custname_prc, custno_dist, custname_dist,
+                    createdate, createby, kodebranch, branch_dist
+                ))
+                processed_in_batch.add(custno_dist)
+
+            # 4. EKSEKUSI INSERT
+            if rows_valid:
+                insert_sql = """
+                    INSERT INTO mapping_customer
+                    (custno, custname_prc, custno_dist, custname_dist, createdate, createby, branch_prc, branch_dist)
+                    VALUES %s
+                """
+                execute_values(cur, insert_sql, rows_valid, page_size=500)
+                inserted_count += len(rows_valid)
+
+                # Proses ulang mapping_error untuk kode dist yang baru di-mapping
+                job_id = enqueue_reresolve(cur, "customer", [r[2] for r in rows_valid])
+                if job_id:
+                    reresolve_jobs.append(job_id)
+
+            conn.commit()
+            committed_count = inserted_count
+            processed_count += len(data)
+
+    except (ValueError, psycopg2.Error) as e:
+        # Body rusak atau chunk ditolak database: chunk berjalan di-rollback,
+        # chunk sebelumnya sudah di-commit
+        conn.rollback()
+        client_error = isinstance(e, (ValueError, psycopg2.DataError, psycopg2.IntegrityError))
+        return jsonify({
+            "error": str(e).strip(),
+            "message": f"{committed_count} record dari chunk sebelumnya sudah tersimpan",
+            "inserted": committed_count,
+            "committed": committed_count,
+            "processed": processed_count
+        }), 400 if client_error else 500
+    finally:
+        cur.close()
+        release_db_connection(conn)
 
     return jsonify({
         "message": f"{inserted_count} record berhasil ditambahkan",
         "skipped_duplicate": skipped_duplicate,
         "skipped_invalid_prc": skipped_prc,
-        "skipped_invalid_dist": skipped_dist
+        "skipped_invalid_dist": skipped_dist,
+        "reresolve_jobs": reresolve_jobs
+    }), 200
+
+# SARAN MAPPING CUSTOMER (FUZZY, UNTUK KODE DIST YANG BELUM TER-MAPPING)
+@mapping_customer_bp.route('/suggest', methods=['POST'])
+@token_required
+def suggest_mapping():
+    payload = request.json or {}
+    branch_dist = payload.get("branch_dist")
+    if not branch_dist:
+        return jsonify({"error": "branch_dist wajib diisi"}), 400
+
+    try:
+        top_n = int(payload.get("top_n", 3))
+        min_score = float(payload.get("min_score", 0.3))
+        limit = int(payload["limit"]) if payload.get("limit") else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "top_n, min_score atau limit tidak valid"}), 400
+
+    conn = get_db_connection()
+    try:
+        data = suggest_customers(conn, branch_dist, top_n=top_n, min_score=min_score, limit=limit)
+    finally:
+        release_db_connection(conn)
+
+    return jsonify({
+        "data": data,
+        "total": len(data),
+        "with_candidate": sum(1 for r in data if r["candidates"])
     }), 200
 
 # DELETE MAPPING CUSTOMER
@@ -1,13 +1,26 @@
 from datetime import datetime
 from flask import Blueprint, jsonify, request
 import jwt, os
+import psycopg2
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
+from process.request_stream import body_chunks
 
 customer_prc_bp = Blueprint('customer_prc',__name__, url_prefix='/customer-prc')
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev_secret')
 
+# Query halaman /data (juga di-EXPLAIN oleh explain_routes.py)
+DATA_SQL = """
+    SELECT cp.custno, cp.custname, cp.custadd, cp.city, cp.type, cp.gharga, cp.kodebranch, b.nama_branch, cp.createdate, cp.createby, cp.updatedate, cp.updateby
+    FROM customer_prc cp
+    INNER JOIN branch b ON cp.kodebranch = b.kodebranch
+    WHERE cp.kodebranch = %s
+    ORDER BY cp.custno
+    LIMIT %s OFFSET %s
+"""
+
 #MIDDLEWARE TOKEN
 def token_required(f):
     @wraps(f)
@@ -48,14 +61,7 @@ def get_customer_prc():
     cursor = conn.cursor(cursor_factory=RealDictCursor)
 
     try:
-        cursor.execute("""
-                SELECT cp.custno, cp.custname, cp.custadd, cp.city, cp.type, cp.gharga, cp.kodebranch, b.nama_branch, cp.createdate, cp.createby, cp.updatedate, cp.updateby
-                FROM customer_prc cp
-                INNER JOIN branch b ON cp.kodebranch = b.kodebranch
-                WHERE cp.kodebranch = %s
-                ORDER BY cp.custno
-                LIMIT %s OFFSET %s
-            """, (kodebranch, limit, offset))
+        cursor.execute(DATA_SQL, (kodebranch, limit, offset))
         data = cursor.fetchall()
 
         cursor.execute("""
@@ -83,75 +89,104 @@ def get_customer_prc():
 @customer_prc_bp.route('/insert', methods=['POST'])
 @token_required
 def insert_customer_prc():
-    data = request.json
-    if not data or not isinstance(data, list):
+    chunks = body_chunks(request)
+    if chunks is None:
         return jsonify({"error": "Data tidak valid"}), 400
 
-    rows = []
-
-    for row in data:
-        custno = row.get("custno")
-        custname = row.get("custname")
-        custadd = row.get("custadd")
-        city = row.get("city")
-        type = row.get("type")
-        gharga = row.get("gharga")
-        kodebranch = row.get("kodebranch")
-
-        createdate = row.get("createdate") or datetime.now()
-        createby = row.get("createby") or "SYSTEM"
-
-        rows.append((custno, custname, custadd, city, type, gharga, kodebranch, createdate, createby))
-
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    # Ambil semua custno
-    ids = [r[0] for r in rows]
-    kodebranches = [r[6] for r in rows]
-
-    # Cek DUPLIKAT di database
-    cur.execute("SELECT custno FROM customer_prc WHERE custno = ANY(%s)", (ids,))
-    existing_rows = cur.fetchall()
-    existing_ids = {r["custno"] for r in existing_rows}
-
-    # Cek VALID branch
-    cur.execute("SELECT kodebranch FROM branch WHERE kodebranch = ANY(%s)", (kodebranches,))
-    branch_rows = cur.fetchall()
-    valid_branches = {r["kodebranch"] for r in branch_rows}
-
-    # Filter valid rows
-    rows_valid = []
+    inserted_count = 0
+    # Baris yang sudah di-commit (chunk sebelumnya tetap tersimpan jika body rusak di tengah)
+    committed_count = 0
+    # Baris payload (valid maupun di-skip) dari chunk yang sudah di-commit;
+    # client cukup mengirim ulang baris sesudahnya
+    processed_count = 0
+    existing_ids = set()
+    seen_ids = set()
     invalid_kodebranch = []
 
-    for r in rows:
-        custno, custname, custadd, city, type, gharga, kodebranch, createdate, createby = r
-
-        # Skip duplikat custno
-        if custno in existing_ids:
-            continue
-
-        # Skip invalid branch
-        if kodebranch not in valid_branches:
-            invalid_kodebranch.append(kodebranch)
-            continue
-
-        rows_valid.append(r)
-
-    # Insert data
-    inserted_count = 0
-    if rows_valid:
-        insert_sql = """
-        INSERT INTO customer_prc
-        (custno, custname, custadd, city, type, gharga, kodebranch, createdate, createby)
-        VALUES %s
-        """
-        execute_values(cur, insert_sql, rows_valid, page_size=500)
-        inserted_count = len(rows_valid)
-
-    conn.commit()
-    cur.close()
-    release_db_connection(conn)
+    try:
+        # PROSES PER CHUNK (JSON / NDJSON / CSV)
+        for data in chunks:
+            rows = []
+
+            for row in data:
+                custno = row.get("custno")
+                custname = row.get("custname")
+                custadd = row.get("custadd")
+                city = row.get("city")
+                type = row.get("type")
+                gharga = row.get("gharga")
+                kodebranch = row.get("kodebranch")
+
+                createdate = row.get("createdate") or datetime.now()
+                createby = row.get("createby") or "SYSTEM"
+
+                rows.append((custno, custname, custadd, city, type, gharga, kodebranch, createdate, createby))
+
+            # Ambil semua custno
+            ids = [r[0] for r in rows]
+            kodebranches = [r[6] for r in rows]
+
+            # Cek DUPLIKAT di database
+            cur.execute("SELECT custno FROM customer_prc WHERE custno = ANY(%s)", (ids,))
+            chunk_existing = {r["custno"] for r in cur.fetchall()}
+            existing_ids |= chunk_existing
+
+            # Cek VALID branch (cache referensi)
+            valid_branches = reference_cache.valid_keys(conn, "branch", kodebranches)
+
+            # Filter valid rows
+            rows_valid = []
+
+            for r in rows:
+                custno, custname, custadd, city, type, gharga, kodebranch, createdate, createby = r
+
+                # Skip duplikat custno (database, atau muncul lagi di payload:
+                # yang pertama yang disimpan)
+                if custno in chunk_existing or custno in seen_ids:
+                    existing_ids.add(custno)
+                    continue
+
+                # Skip invalid branch
+                if kodebranch not in valid_branches:
+                    invalid_kodebranch.append(kodebranch)
+                    continue
+
+                rows_valid.append(r)
+                seen_ids.add(custno)
+
+            # Insert data
+            if rows_valid:
+                insert_sql = """
+                INSERT INTO customer_prc
+                (custno, custname, custadd, city, type, gharga, kodebranch, createdate, createby)
+                VALUES %s
+                """
+                execute_values(cur, insert_sql, rows_valid, page_size=500)
+                inserted_count += len(rows_valid)
+
+            conn.commit()
+            committed_count = inserted_count
+            processed_count += len(data)
+            reference_cache.invalidate("customer_prc")
+
+    except (ValueError, psycopg2.Error) as e:
+        # Body rusak atau chunk ditolak database: chunk berjalan di-rollback,
+        # chunk sebelumnya sudah di-commit
+        conn.rollback()
+        client_error = isinstance(e, (ValueError, psycopg2.DataError, psycopg2.IntegrityError))
+        return jsonify({
+            "error": str(e).strip(),
+            "message": f"{committed_count} record dari chunk sebelumnya sudah tersimpan",
+            "inserted": committed_count,
+            "committed": committed_count,
+            "processed": processed_count
+        }), 400 if client_error else 500
+    finally:
+        cur.close()
+        release_db_connection(conn)
 
     return jsonify({
         "message": f"{inserted_count} record berhasil ditambahkan",
@@ -182,6 +217,7 @@ def update_customer_prc(custno):
             (custname, custadd, city, typecustomer, gharga, datetime.now(), updateby, custno)
         )
         conn.commit()
+        reference_cache.invalidate("customer_prc")
     except Exception as e:
         conn.rollback()
         cursor.close()
@@ -210,6 +246,7 @@ def delete_customer_prc_route():
         format_strings = ",".join(["%s"] * len(custno))
         cursor.execute(f"DELETE FROM customer_prc where custno IN ({format_strings})", tuple(custno))
         conn.commit()
+        reference_cache.invalidate("customer_prc")
     except Exception as e:
         conn.rollback()
         cursor.close()
@@ -0,0 +1,44 @@
+import os
+from functools import wraps
+from flask import Blueprint, jsonify, request, send_file
+import profiler
+
+debug_bp = Blueprint('debug', __name__, url_prefix='/debug')
+
+
+# ADMIN (PROFILE_ADMINS)
+def admin_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not profiler.enabled():
+            return jsonify({"error": "Profiler tidak aktif (PROFILE_ADMINS kosong)"}), 404
+        token = request.headers.get('Authorization')
+        if not token:
+            return jsonify({"error": "Token tidak ditemukan"}), 401
+        if profiler.admin_user(token) is None:
+            return jsonify({"error": "Hanya admin"}), 403
+        return f(*args, **kwargs)
+    return decorated
+
+
+#  DAFTAR PROFILE
+@debug_bp.route('/profiles', methods=['GET'])
+@admin_required
+def get_profiles():
+    return jsonify({
+        "data": profiler.list_profiles(),
+        "keep": profiler.PROFILE_KEEP
+    }), 200
+
+
+#  UNDUH PROFILE
+@debug_bp.route('/profiles/<profile_id>', methods=['GET'])
+@admin_required
+def download_profile(profile_id):
+    found = profiler.find_profile(profile_id)
+    if not found or not os.path.exists(found[0]):
+        return jsonify({"error": "Profile tidak ditemukan"}), 404
+
+    path, mode = found
+    mimetype = "application/json" if mode == "sampling" else "application/octet-stream"
+    return send_file(path, mimetype=mimetype, as_attachment=True, download_name=os.path.basename(path))
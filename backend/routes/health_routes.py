@@ -0,0 +1,191 @@
+"""
+Probe untuk orchestrator / load balancer (tanpa token):
+
+    GET /healthz  proses hidup, tanpa I/O (liveness)
+    GET /readyz   checkout pool + SELECT 1 dalam batas READY_DB_TIMEOUT_MS,
+                  saturasi pool proses ini dan lag antrian worker (readiness).
+                  503 jika DB tidak menjawab dalam batas waktu atau pool
+                  benar-benar habis (checkout berikutnya akan PoolError),
+                  supaya traffic dialihkan sebelum request mulai gagal.
+
+Cek DB berjalan di thread terpisah dan ditunggu paling lama
+READY_DB_TIMEOUT_MS, jadi connect baru yang menggantung (DB_CONNECT_TIMEOUT
+beberapa detik) tidak membuat probe ikut lambat. Selama cek sebelumnya
+belum selesai, probe berikutnya langsung 503 tanpa menumpuk checkout baru.
+
+Lag antrian hanya dilaporkan: worker yang tertinggal tidak membuat API ini
+tidak siap, dan mengalihkan traffic API tidak mempercepat worker.
+"""
+import os
+import threading
+import time
+from flask import Blueprint, jsonify
+from psycopg2.pool import PoolError
+from db import get_db_connection, release_db_connection, pool_stats
+from process.job_queue import queue_depth, QUEUE_METRICS_TTL
+
+health_bp = Blueprint('health', __name__)
+
+# Batas total cek DB di /readyz: checkout + SELECT 1 (ms)
+READY_DB_TIMEOUT_MS = int(os.getenv("READY_DB_TIMEOUT_MS", "500"))
+
+# Hasil queue_depth di-cache: probe tiap beberapa detik dari beberapa LB
+# tidak perlu GROUP BY antrian setiap kali. Satu thread yang refresh,
+# probe lain memakai nilai terakhir (lock tidak dipegang selama query)
+_queue_cache = {"at": 0, "value": None, "refreshing": False}
+_queue_lock = threading.Lock()
+
+# Cek DB yang sedang berjalan (single-flight)
+_db_check = {"done": None}
+_db_check_lock = threading.Lock()
+
+
+def pool_saturation(in_use, capacity):
+    """
+    (rasio, jenuh) pool proses ini. in_use diukur sebelum checkout probe
+    sendiri, jadi thread probe tidak ikut dihitung. Jenuh hanya jika pool
+    benar-benar habis: ThreadedConnectionPool tidak mengantri, getconn
+    berikutnya langsung PoolError.
+
+    Profil cpu (sync, 1 thread, pool 1 + 2), idle saat melayani probe:
+
+    >>> pool_saturation(0, 3)
+    (0.0, False)
+
+    Profil io (gthread, 8 thread, pool 8 + 2), 7 thread lain memegang koneksi:
+
+    >>> pool_saturation(7, 10)
+    (0.7, False)
+    >>> pool_saturation(10, 10)
+    (1.0, True)
+
+    DB_POOL_MAX lebih kecil dari jumlah thread (salah konfigurasi):
+
+    >>> pool_saturation(4, 4)
+    (1.0, True)
+    >>> pool_saturation(0, 0)
+    (1.0, True)
+    """
+    if capacity <= 0:
+        return 1.0, True
+    return round(in_use / capacity, 3), in_use >= capacity
+
+
+def _ms(start):
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def _refresh_queue_lag(conn):
+    with _queue_lock:
+        fresh = time.monotonic() - _queue_cache["at"] <= QUEUE_METRICS_TTL
+        if fresh or _queue_cache["refreshing"]:
+            return
+        _queue_cache["refreshing"] = True
+    value = None
+    try:
+        depth, oldest = queue_depth(conn)
+        counts = {}
+        for (status, _lane), count in depth.items():
+            counts[status.lower()] = counts.get(status.lower(), 0) + count
+        value = {
+            "pending": counts.get("pending", 0),
+            "processing": counts.get("processing", 0),
+            "dead": counts.get("dead", 0),
+            "oldest_pending_s": round(oldest, 1)
+        }
+    except Exception as e:
+        conn.rollback()
+        value = {"error": str(e).strip()}
+    finally:
+        with _queue_lock:
+            _queue_cache["refreshing"] = False
+            if value is not None:
+                _queue_cache["value"] = value
+                _queue_cache["at"] = time.monotonic()
+
+
+def _check_db(result, done):
+    """Checkout + SELECT 1, lalu refresh cache antrian (setelah `done` di-set)"""
+    start = time.perf_counter()
+    conn = None
+    try:
+        conn = get_db_connection()
+        result["checkout_ms"] = _ms(start)
+        cur = conn.cursor()
+        # SET LOCAL berlaku sampai commit/rollback, tidak bocor ke request lain
+        cur.execute("SET LOCAL statement_timeout = %s", (READY_DB_TIMEOUT_MS,))
+        query_start = time.perf_counter()
+        cur.execute("SELECT 1")
+        cur.fetchone()
+        cur.close()
+        result["query_ms"] = _ms(query_start)
+        result["ok"] = True
+    except PoolError:
+        result["error"] = "pool habis"
+    except Exception as e:
+        result["error"] = str(e).strip()
+    finally:
+        result["latency_ms"] = _ms(start)
+        done.set()
+
+    try:
+        if result.get("ok"):
+            # Query antrian tidak menahan response probe
+            _refresh_queue_lag(conn)
+    finally:
+        if conn is not None:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            release_db_connection(conn)
+
+
+def _run_db_check():
+    with _db_check_lock:
+        previous = _db_check["done"]
+        if previous is not None and not previous.is_set():
+            return {"ok": False, "error": "cek DB sebelumnya belum selesai"}
+        done = threading.Event()
+        _db_check["done"] = done
+
+    result = {"ok": False}
+    threading.Thread(target=_check_db, args=(result, done), daemon=True).start()
+    if not done.wait(READY_DB_TIMEOUT_MS / 1000):
+        return {"ok": False, "error": f"timeout {READY_DB_TIMEOUT_MS} ms", "latency_ms": READY_DB_TIMEOUT_MS}
+    return dict(result)
+
+
+#  LIVENESS
+@health_bp.route('/healthz', methods=['GET'])
+def healthz():
+    return jsonify({"status": "ok", "pid": os.getpid()}), 200
+
+
+#  READINESS
+@health_bp.route('/readyz', methods=['GET'])
+def readyz():
+    # Thread habis (semua sibuk) tidak terlihat di sini: probe-nya sendiri
+    # tidak dilayani dan timeout di sisi load balancer
+    in_use, max_conn = pool_stats()
+    saturation, saturated = pool_saturation(in_use, max_conn)
+    pool = {
+        "in_use": in_use,
+        "max": max_conn,
+        "saturation": saturation,
+        "saturated": saturated
+    }
+
+    db = _run_db_check()
+    with _queue_lock:
+        queue = _queue_cache["value"]
+
+    ready = db["ok"] and not saturated
+    body = {
+        "status": "ready" if ready else "not_ready",
+        "pid": os.getpid(),
+        "checks": {"db": db, "pool": pool, "queue": queue}
+    }
+    if not ready:
+        return jsonify(body), 503, {"Retry-After": "1"}
+    return jsonify(body), 200
@@ -1,9 +1,10 @@
 from datetime import datetime
-from flask import Blueprint, jsonify, request
-import jwt, os
+from flask import Blueprint, Response, jsonify, request
+import jwt, os, json, hashlib, threading
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
 
 list_bp = Blueprint('list', __name__, url_prefix='/list')
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev_secret')
@@ -22,66 +23,109 @@ def token_required(f):
         return f(*args, **kwargs)
     return decorated
 
+# VERSI DATA PER TABEL: jumlah baris + waktu perubahan terakhir.
+# Insert/update/delete dari proses mana pun akan mengubah nilai ini.
+TABLE_VERSION_SQL = {
+    "region": "SELECT COUNT(1), MAX(GREATEST(createdate, updatedate)) FROM region",
+    "entity": "SELECT COUNT(1), MAX(GREATEST(createdate, updatedate)) FROM entity",
+    "branch": "SELECT COUNT(1), MAX(GREATEST(createdate, updatedate)) FROM branch",
+    "mapping_branch": "SELECT COUNT(1), MAX(createdate) FROM mapping_branch",
+}
+
+AREA_SQL = """
+    SELECT 
+        r.koderegion,
+        r.keterangan AS region_name,
+        e.id_entity,
+        e.keterangan AS entity_name,
+        b.kodebranch,
+        b.nama_branch
+    FROM region r
+    LEFT JOIN entity e ON r.koderegion = e.koderegion
+    LEFT JOIN branch b ON e.id_entity = b.entity
+    ORDER BY r.koderegion, e.id_entity, b.kodebranch
+"""
+
+AREA_MAPPING_SQL = """
+    SELECT 
+        r.koderegion,
+        r.keterangan AS region_name,
+        e.id_entity,
+        e.keterangan AS entity_name,
+        mp.branch_dist,
+        mp.nama_branch_dist
+    FROM region r
+    LEFT JOIN entity e ON r.koderegion = e.koderegion
+    LEFT JOIN branch b ON e.id_entity = b.entity
+    INNER JOIN mapping_branch mp ON b.kodebranch = mp.kodebranch 
+    ORDER BY r.koderegion, e.id_entity, b.kodebranch, mp.kodebranch
+"""
+
+_hierarchy_lock = threading.Lock()
+_hierarchy_cache = {}
+
+
+def _tables_version(cursor, tables):
+    sql = " UNION ALL ".join(f"({TABLE_VERSION_SQL[t]})" for t in tables)
+    cursor.execute(sql)
+    parts = [f"{count}:{changed}" for count, changed in cursor.fetchall()]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:20]
+
+
+def _serve_hierarchy(name, sql, tables):
+    """
+    Kirim hasil query hierarki dari cache memori. ETag = versi tabel sumber,
+    jadi client cukup revalidasi (304) tanpa query join dan tanpa body.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        etag = f"{name}-{_tables_version(cursor, tables)}"
+
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            with _hierarchy_lock:
+                entry = _hierarchy_cache.get(name)
+
+            if not entry or entry["etag"] != etag:
+                cursor.execute(sql)
+                columns = [desc[0] for desc in cursor.description]
+                data = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                entry = {"etag": etag, "body": json.dumps({"data": data}, default=str)}
+                with _hierarchy_lock:
+                    _hierarchy_cache[name] = entry
+
+            response = Response(entry["body"], status=200, mimetype="application/json")
+
+        conn.commit()
+    finally:
+        cursor.close()
+        release_db_connection(conn)
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
 # GET ALL REGION + ENTITY + BRANCH 
 @list_bp.route('/area', methods=['GET'])
 @token_required
 def get_region_entity_branch_mapping():
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    cursor.execute("""
-        SELECT 
-            r.koderegion,
-            r.keterangan AS region_name,
-            e.id_entity,
-            e.keterangan AS entity_name,
-            b.kodebranch,
-            b.nama_branch
-        FROM region r
-        LEFT JOIN entity e ON r.koderegion = e.koderegion
-        LEFT JOIN branch b ON e.id_entity = b.entity
-        ORDER BY r.koderegion, e.id_entity, b.kodebranch
-    """)
-
-    data = cursor.fetchall()
-
-    cursor.close()
-    conn.close()
-    release_db_connection(conn)
-
-    return jsonify({
-        "data": data
-    }), 200
+    return _serve_hierarchy("area", AREA_SQL, ("region", "entity", "branch"))
 
 # GETT ALL REGION + ENTITY + MAPPING BRANCH
 @list_bp.route('/area-mapping', methods=['GET'])
 @token_required
 def get_region_entity_mapping_branch():
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    cursor.execute("""
-        SELECT 
-            r.koderegion,
-            r.keterangan AS region_name,
-            e.id_entity,
-            e.keterangan AS entity_name,
-            mp.branch_dist,
-            mp.nama_branch_dist
-        FROM region r
-        LEFT JOIN entity e ON r.koderegion = e.koderegion
-        LEFT JOIN branch b ON e.id_entity = b.entity
-        INNER JOIN mapping_branch mp ON b.kodebranch = mp.kodebranch 
-        ORDER BY r.koderegion, e.id_entity, b.kodebranch, mp.kodebranch
-    """)
-
-    data = cursor.fetchall()
-
-    cursor.close()
-    conn.close()
-    release_db_connection(conn)
+    return _serve_hierarchy("area-mapping", AREA_MAPPING_SQL, ("region", "entity", "branch", "mapping_branch"))
 
+
+# STATISTIK CACHE REFERENSI (hit/miss per tabel)
+@list_bp.route('/reference-cache', methods=['GET'])
+@token_required
+def get_reference_cache_stats():
     return jsonify({
-        "data": data
+        "tables": reference_cache.stats()
     }), 200
-
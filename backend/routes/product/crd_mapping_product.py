@@ -1,13 +1,25 @@
 from datetime import datetime
 from flask import Blueprint, jsonify, request
 import jwt, os
+import psycopg2
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
+from process.request_stream import body_chunks
+from process.reresolve import enqueue_reresolve
+from process.mapping_suggest import suggest_products
 
 mapping_product_bp = Blueprint('mapping_product',__name__, url_prefix='/mapping-product')
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev_secret')
 
+# Query halaman /data (juga di-EXPLAIN oleh explain_routes.py)
+DATA_SQL = """
+    SELECT * FROM mapping_product
+    WHERE branch_dist = %s
+    LIMIT %s OFFSET %s
+"""
+
 #MIDDLEWARE TOKEN
 def token_required(f):
     @wraps(f)
@@ -47,11 +59,7 @@ def get_mapping_product():
     cursor = conn.cursor(cursor_factory=RealDictCursor)
 
     try:
-        cursor.execute("""
-                SELECT * FROM mapping_product
-                WHERE branch_dist = %s
-                LIMIT %s OFFSET %s
-            """, (kodebranch, limit, offset))
+        cursor.execute(DATA_SQL, (kodebranch, limit, offset))
         data = cursor.fetchall()
 
         cursor.execute("""
@@ -79,101 +87,160 @@ def get_mapping_product():
 @mapping_product_bp.route('/insert', methods=['POST'])
 @token_required
 def insert_mapping_customer():
-    data = request.json
-    if not data or not isinstance(data, list):
+    chunks = body_chunks(request)
+    if chunks is None:
         return jsonify({"error": "Data tidak valid"}), 400
 
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    # Ambil semua pcode_prc & pcode_dist dari request
-    pcodes_prc = [str(row.get("pcode_prc")).strip() for row in data]
-    pcodes_dist = [str(row.get("pcode_dist")).strip() for row in data]
-
-    # CEK DUPLIKAT di mapping_product
-    cur.execute(
-        "SELECT pcode_prc, pcode_dist FROM mapping_product WHERE pcode_prc = ANY(%s) AND pcode_dist = ANY(%s)",
-        (pcodes_prc, pcodes_dist)
-    )
-    existing_rows = cur.fetchall()
-    existing_pairs = {(r["pcode_prc"], r["pcode_dist"]) for r in existing_rows}
-
-    # Ambil data product_prc
-    cur.execute(
-        "SELECT pcode, pcodename FROM product_prc WHERE pcode = ANY(%s)",
-        (pcodes_prc,)
-    )
-    pcode_prc_data = {r["pcode"]: r for r in cur.fetchall()}
-
-    # Ambil data product_dist
-    cur.execute(
-        "SELECT pcode_dist, pcodename, branch_dist FROM product_dist WHERE pcode_dist = ANY(%s)",
-        (pcodes_dist,)
-    )
-    pcode_dist_data = {r["pcode_dist"]: r for r in cur.fetchall()}
-
-    rows_valid = []
+    inserted_count = 0
+    # Baris yang sudah di-commit (chunk sebelumnya tetap tersimpan jika body rusak di tengah)
+    committed_count = 0
+    # Baris payload (valid maupun di-skip) dari chunk yang sudah di-commit;
+    # client cukup mengirim ulang baris sesudahnya
+    processed_count = 0
+    reresolve_jobs = []
     skipped_prc = []
     skipped_dist = []
     skipped_duplicate = []
+    # Pasangan yang sudah diproses di payload ini (duplikat di file sendiri)
+    processed_in_batch = set()
 
-    for row in data:
-        pcode_prc = str(row.get("pcode_prc")).strip()
-        pcode_dist = str(row.get("pcode_dist")).strip()
-        branch_dist = row.get("branch_dist")
-        createby = row.get("createby") or "SYSTEM"
-        createdate = row.get("createdate") or datetime.now()
-
-        # CEK DUPLIKAT
-        if (pcode_prc, pcode_dist) in existing_pairs:
-            skipped_duplicate.append((pcode_prc, pcode_dist))
-            continue
-
-        # CEK PRODUCT PRC
-        prc_data = pcode_prc_data.get(pcode_prc)
-        if not prc_data or prc_data["pcode"] != pcode_prc:
-            skipped_prc.append(pcode_prc)
-            continue
-        pcodename_prc = prc_data["pcodename"]
-
-        # CEK CUSTOMER DIST
-        dist_data = pcode_dist_data.get(pcode_dist)
-        if not dist_data or dist_data["branch_dist"] != branch_dist:
-            skipped_dist.append(pcode_dist)
-            continue
-        pcodename_dist = dist_data["pcodename"]
-
-        # Jika semua valid → tambahkan ke list insert
-        rows_valid.append((
-            pcode_prc,
-            pcodename_prc,
-            pcode_dist,
-            pcodename_dist,
-            createdate,
-            createby,
-            branch_dist
-        ))
-
-    # INSERT DATA
-    inserted_count = 0
-    if rows_valid:
-        insert_sql = """
-            INSERT INTO mapping_product
-            (pcode_prc, pcode_prc_name, pcode_dist, pcode_dist_name, createdate, createby, branch_dist)
-            VALUES %s
-        """
-        execute_values(cur, insert_sql, rows_valid, page_size=500)
-        inserted_count = len(rows_valid)
-
-    conn.commit()
-    cur.close()
-    release_db_connection(conn)
+    try:
+        # PROSES PER CHUNK (JSON / NDJSON / CSV)
+        for data in chunks:
+            # Ambil semua pcode_prc & pcode_dist dari chunk
+            pcodes_prc = [str(row.get("pcode_prc")).strip() for row in data]
+            pcodes_dist = [str(row.get("pcode_dist")).strip() for row in data]
+
+            # CEK DUPLIKAT di mapping_product
+            cur.execute(
+                "SELECT pcode_prc, pcode_dist FROM mapping_product WHERE pcode_prc = ANY(%s) AND pcode_dist = ANY(%s)",
+                (pcodes_prc, pcodes_dist)
+            )
+            existing_rows = cur.fetchall()
+            existing_pairs = {(r["pcode_prc"], r["pcode_dist"]) for r in existing_rows}
+
+            # Ambil data product_prc
+            pcode_prc_data = reference_cache.lookup(conn, "product_prc", pcodes_prc)
+
+            # Ambil data product_dist
+            cur.execute(
+                "SELECT pcode_dist, pcodename, branch_dist FROM product_dist WHERE pcode_dist = ANY(%s)",
+                (pcodes_dist,)
+            )
+            pcode_dist_data = {r["pcode_dist"]: r for r in cur.fetchall()}
+
+            rows_valid = []
+
+            for row in data:
+                pcode_prc = str(row.get("pcode_prc")).strip()
+                pcode_dist = str(row.get("pcode_dist")).strip()
+                branch_dist = row.get("branch_dist")
+                createby = row.get("createby") or "SYSTEM"
+                createdate = row.get("createdate") or datetime.now()
+
+                # CEK DUPLIKAT (database atau file upload itu sendiri)
+                if (pcode_prc, pcode_dist) in existing_pairs or (pcode_prc, pcode_dist) in processed_in_batch:
+                    skipped_duplicate.append((pcode_prc, pcode_dist))
+                    continue
+
+                # CEK PRODUCT PRC
+                prc_data = pcode_prc_data.get(pcode_prc)
+                if not prc_data or prc_data["pcode"] != pcode_prc:
+                    skipped_prc.append(pcode_prc)
+                    continue
+                pcodename_prc = prc_data["pcodename"]
+
+                # CEK CUSTOMER DIST
+                dist_data = pcode_dist_data.get(pcode_dist)
+                if not dist_data or dist_data["branch_dist"] != branch_dist:
+                    skipped_dist.append(pcode_dist)
+                    continue
+                pcodename_dist = dist_data["pcodename"]
+
+                # Jika semua valid → tambahkan ke list insert
+                rows_valid.append((
+                    pcode_prc,
+                    pcodename_prc,
+                    pcode_dist,
+                    pcodename_dist,
+                    createdate,
+                    createby,
+                    branch_dist
+                ))
+                processed_in_batch.add((pcode_prc, pcode_dist))
+
+            # INSERT DATA
+            if rows_valid:
+                insert_sql = """
+                    INSERT INTO mapping_product
+                    (pcode_prc, pcode_prc_name, pcode_dist, pcode_dist_name, createdate, createby, branch_dist)
+                    VALUES %s
+                """
+                execute_values(cur, insert_sql, rows_valid, page_size=500)
+                inserted_count += len(rows_valid)
+
+                # Proses ulang mapping_error untuk kode dist yang baru di-mapping
+                job_id = enqueue_reresolve(cur, "product", [r[2] for r in rows_valid])
+                if job_id:
+                    reresolve_jobs.append(job_id)
+
+            conn.commit()
+            committed_count = inserted_count
+            processed_count += len(data)
+
+    except (ValueError, psycopg2.Error) as e:
+        # Body rusak atau chunk ditolak database: chunk berjalan di-rollback,
+        # chunk sebelumnya sudah di-commit
+        conn.rollback()
+        client_error = isinstance(e, (ValueError, psycopg2.DataError, psycopg2.IntegrityError))
+        return jsonify({
+            "error": str(e).strip(),
+            "message": f"{committed_count} record dari chunk sebelumnya sudah tersimpan",
+            "inserted": committed_count,
+            "committed": committed_count,
+            "processed": processed_count
+        }), 400 if client_error else 500
+    finally:
+        cur.close()
+        release_db_connection(conn)
 
     return jsonify({
         "message": f"{inserted_count} record berhasil ditambahkan",
         "skipped_duplicate": skipped_duplicate,
         "skipped_invalid_prc": skipped_prc,
-        "skipped_invalid_dist": skipped_dist
+        "skipped_invalid_dist": skipped_dist,
+        "reresolve_jobs": reresolve_jobs
+    }), 200
+
+# SARAN MAPPING PRODUCT (FUZZY, UNTUK KODE DIST YANG BELUM TER-MAPPING)
+@mapping_product_bp.route('/suggest', methods=['POST'])
+@token_required
+def suggest_mapping():
+    payload = request.json or {}
+    branch_dist = payload.get("branch_dist")
+    if not branch_dist:
+        return jsonify({"error": "branch_dist wajib diisi"}), 400
+
+    try:
+        top_n = int(payload.get("top_n", 3))
+        min_score = float(payload.get("min_score", 0.3))
+        limit = int(payload["limit"]) if payload.get("limit") else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "top_n, min_score atau limit tidak valid"}), 400
+
+    conn = get_db_connection()
+    try:
+        data = suggest_products(conn, branch_dist, top_n=top_n, min_score=min_score, limit=limit)
+    finally:
+        release_db_connection(conn)
+
+    return jsonify({
+        "data": data,
+        "total": len(data),
+        "with_candidate": sum(1 for r in data if r["candidates"])
     }), 200
 
 # DELETE MAPPING CUSTOMER
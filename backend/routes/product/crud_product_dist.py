@@ -1,13 +1,26 @@
 from datetime import datetime
 from flask import Blueprint, jsonify, request
 import jwt, os
+import psycopg2
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
+from process.request_stream import body_chunks
 
 product_dist_bp = Blueprint('product_dist',__name__, url_prefix='/product-dist')
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev_secret')
 
+# Query halaman /data (juga di-EXPLAIN oleh explain_routes.py)
+DATA_SQL = """
+    SELECT pd.pcode_dist, pd.pcodename, pd.branch_dist, b.nama_branch_dist, pd.createdate, pd.createby, pd.updatedate, pd.updateby
+    FROM product_dist pd
+    INNER JOIN branch_dist b ON pd.branch_dist = b.branch_dist
+    WHERE pd.branch_dist = %s
+    ORDER BY pd.pcode_dist
+    LIMIT %s OFFSET %s
+"""
+
 #MIDDLEWARE TOKEN
 def token_required(f):
     @wraps(f)
@@ -47,14 +60,7 @@ def get_customer_prc():
     cursor = conn.cursor(cursor_factory=RealDictCursor)
 
     try:
-        cursor.execute("""
-                SELECT pd.pcode_dist, pd.pcodename, pd.branch_dist, b.nama_branch_dist, pd.createdate, pd.createby, pd.updatedate, pd.updateby
-                FROM product_dist pd
-                INNER JOIN branch_dist b ON pd.branch_dist = b.branch_dist
-                WHERE pd.branch_dist = %s
-                ORDER BY pd.pcode_dist
-                LIMIT %s OFFSET %s
-            """, (kodebranch, limit, offset))
+        cursor.execute(DATA_SQL, (kodebranch, limit, offset))
         data = cursor.fetchall()
 
         cursor.execute("""
@@ -83,83 +89,106 @@ def get_customer_prc():
 @product_dist_bp.route('/insert', methods=['POST'])
 @token_required
 def insert_customer_dist():
-    data = request.json
-    if not data or not isinstance(data, list):
+    chunks = body_chunks(request)
+    if chunks is None:
         return jsonify({"error": "Data tidak valid"}), 400
 
-    rows = []
-
-    for row in data:
-        pcode_dist = str(row.get("pcode_dist")).strip()
-        pcodename = row.get("pcodename")
-        branch_dist = str(row.get("branch_dist")).strip()
-
-        createdate = row.get("createdate") or datetime.now()
-        createby = row.get("createby") or "SYSTEM"
-
-        rows.append((pcode_dist, pcodename, branch_dist, createdate, createby))
-
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    # --- CEK DUPLIKAT DI DATABASE
-    ids = [r[0] for r in rows]
-    cur.execute(
-        "SELECT pcode_dist FROM product_dist WHERE pcode_dist = ANY(%s)",
-        (ids,)
-    )
-    existing_rows = cur.fetchall()
-    existing_ids = {r["pcode_dist"] for r in existing_rows}
-
-    # --- CEK DUPLIKAT INTERNAL DALAM PAYLOAD
+    inserted_count = 0
+    # Baris yang sudah di-commit (chunk sebelumnya tetap tersimpan jika body rusak di tengah)
+    committed_count = 0
+    # Baris payload (valid maupun di-skip) dari chunk yang sudah di-commit;
+    # client cukup mengirim ulang baris sesudahnya
+    processed_count = 0
+    existing_ids = set()
     internal_seen = set()
     internal_duplicates = set()
-
-    for r in rows:
-        if r[0] in internal_seen:
-            internal_duplicates.add(r[0])
-        internal_seen.add(r[0])
-
-    # --- CEK VALID BRANCH
-    branch_list = [r[2] for r in rows]
-    cur.execute("SELECT branch_dist FROM branch_dist WHERE branch_dist = ANY(%s)", (branch_list,))
-    branch_rows = cur.fetchall()
-    valid_branches = {r["branch_dist"] for r in branch_rows}
-
-    rows_valid = []
     invalid_kodebranch = []
 
-    for r in rows:
-        pcode_dist, pcodename, branch_dist, createdate, createby = r
-
-        # Skip duplikat database
-        if pcode_dist in existing_ids:
-            continue
-
-        # Skip duplikat internal payload
-        if pcode_dist in internal_duplicates:
-            continue
-
-        # Skip branch tidak valid
-        if branch_dist not in valid_branches:
-            invalid_kodebranch.append(branch_dist)
-            continue
-
-        rows_valid.append(r)
-
-    inserted_count = 0
-    if rows_valid:
-        insert_sql = """
-        INSERT INTO product_dist
-        (pcode_dist, pcodename, branch_dist, createdate, createby)
-        VALUES %s
-        """
-        execute_values(cur, insert_sql, rows_valid, page_size=500)
-        inserted_count = len(rows_valid)
-
-    conn.commit()
-    cur.close()
-    release_db_connection(conn)
+    try:
+        # PROSES PER CHUNK (JSON / NDJSON / CSV)
+        for data in chunks:
+            rows = []
+
+            for row in data:
+                pcode_dist = str(row.get("pcode_dist")).strip()
+                pcodename = row.get("pcodename")
+                branch_dist = str(row.get("branch_dist")).strip()
+
+                createdate = row.get("createdate") or datetime.now()
+                createby = row.get("createby") or "SYSTEM"
+
+                rows.append((pcode_dist, pcodename, branch_dist, createdate, createby))
+
+            # --- CEK DUPLIKAT DI DATABASE
+            ids = [r[0] for r in rows]
+            cur.execute(
+                "SELECT pcode_dist FROM product_dist WHERE pcode_dist = ANY(%s)",
+                (ids,)
+            )
+            chunk_existing = {r["pcode_dist"] for r in cur.fetchall()}
+            existing_ids |= chunk_existing
+
+            # --- CEK DUPLIKAT INTERNAL DALAM PAYLOAD (lintas chunk)
+            for r in rows:
+                if r[0] in internal_seen:
+                    internal_duplicates.add(r[0])
+                internal_seen.add(r[0])
+
+            # --- CEK VALID BRANCH (cache referensi)
+            branch_list = [r[2] for r in rows]
+            valid_branches = reference_cache.valid_keys(conn, "branch_dist", branch_list)
+
+            rows_valid = []
+
+            for r in rows:
+                pcode_dist, pcodename, branch_dist, createdate, createby = r
+
+                # Skip duplikat database
+                if pcode_dist in chunk_existing:
+                    continue
+
+                # Skip duplikat internal payload
+                if pcode_dist in internal_duplicates:
+                    continue
+
+                # Skip branch tidak valid
+                if branch_dist not in valid_branches:
+                    invalid_kodebranch.append(branch_dist)
+                    continue
+
+                rows_valid.append(r)
+
+            if rows_valid:
+                insert_sql = """
+                INSERT INTO product_dist
+                (pcode_dist, pcodename, branch_dist, createdate, createby)
+                VALUES %s
+                """
+                execute_values(cur, insert_sql, rows_valid, page_size=500)
+                inserted_count += len(rows_valid)
+
+            conn.commit()
+            committed_count = inserted_count
+            processed_count += len(data)
+
+    except (ValueError, psycopg2.Error) as e:
+        # Body rusak atau chunk ditolak database: chunk berjalan di-rollback,
+        # chunk sebelumnya sudah di-commit
+        conn.rollback()
+        client_error = isinstance(e, (ValueError, psycopg2.DataError, psycopg2.IntegrityError))
+        return jsonify({
+            "error": str(e).strip(),
+            "message": f"{committed_count} record dari chunk sebelumnya sudah tersimpan",
+            "inserted": committed_count,
+            "committed": committed_count,
+            "processed": processed_count
+        }), 400 if client_error else 500
+    finally:
+        cur.close()
+        release_db_connection(conn)
 
     return jsonify({
         "message": f"{inserted_count} record berhasil ditambahkan",
@@ -4,6 +4,7 @@ import jwt, os, uuid
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
 
 product_group_bp = Blueprint('product_group',__name__, url_prefix='/product-group')
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev_secret')
@@ -117,8 +118,7 @@ def insert_product_prc():
     existing_group = {row["pcode"] for row in cur.fetchall()}
 
     # Proteksi 3: Pastikan pcode terdaftar di MASTER PRC
-    cur.execute("SELECT pcode FROM product_prc WHERE pcode = ANY(%s)", (pcodes,))
-    valid_prc = {row["pcode"] for row in cur.fetchall()}
+    valid_prc = reference_cache.valid_keys(conn, "product_prc", pcodes)
 
     # Filter akhir sebelum insert
     rows_to_insert = [
@@ -4,6 +4,7 @@ import jwt, os
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
 
 product_prc_bp = Blueprint('product_prc',__name__, url_prefix='/product-prc')
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev_secret')
@@ -122,6 +123,7 @@ def insert_product_prc():
         inserted_count = len(rows_to_insert)
 
     conn.commit()
+    reference_cache.invalidate("product_prc")
     release_db_connection(conn)
 
     return jsonify({
@@ -154,6 +156,7 @@ def update_pcode_prc(pcode):
             (pcodename, unit1, unit2, unit3, convunit2, convunit3, prlin, prlinname, datetime.now(), updateby, pcode)
         )
         conn.commit()
+        reference_cache.invalidate("product_prc")
     except Exception as e:
         conn.rollback()
         
@@ -181,6 +184,7 @@ def delete_product_prc_route():
         format_strings = ",".join(["%s"] * len(pcode))
         cursor.execute(f"DELETE FROM product_prc where pcode IN ({format_strings})", tuple(pcode))
         conn.commit()
+        reference_cache.invalidate("product_prc")
     except Exception as e:
         conn.rollback()
         
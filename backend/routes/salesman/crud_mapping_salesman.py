@@ -4,10 +4,21 @@ import jwt, os
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process.reresolve import enqueue_reresolve
 
 mapping_salesman_bp = Blueprint('mapping_salesman', __name__, url_prefix='/mapping-salesman')
 SECRET_KEY = os.getenv('SECRET_KEY', "dev_secret")
 
+# Query halaman /data (juga di-EXPLAIN oleh explain_routes.py)
+DATA_SQL = """
+    SELECT sm.kodebranch, b.nama_branch, sm.id_salesman, sm.nama, ms.id_salesman_dist, ms.nama_salesman_dist, ms.createdate, ms.createby, ms.updatedate, ms.updateby
+    FROM mapping_salesman ms
+    INNER JOIN salesman_master sm ON ms.id_salesman = sm.id_salesman
+    INNER JOIN branch b ON sm.kodebranch = b.kodebranch
+    WHERE sm.kodebranch = %s
+    LIMIT %s OFFSET %s
+"""
+
 # Middleware untuk verifikasi token
 def token_required(f):
     @wraps(f)
@@ -48,14 +59,7 @@ def get_mapping_salesman():
 
     try:
         
-        cursor.execute("""
-                SELECT sm.kodebranch, b.nama_branch, sm.id_salesman, sm.nama, ms.id_salesman_dist, ms.nama_salesman_dist, ms.createdate, ms.createby, ms.updatedate, ms.updateby
-                FROM mapping_salesman ms 
-                INNER JOIN salesman_master sm ON ms.id_salesman = sm.id_salesman
-                INNER JOIN branch b ON sm.kodebranch = b.kodebranch
-                WHERE sm.kodebranch = %s
-                LIMIT %s OFFSET %s
-            """, (kodebranch, limit, offset))
+        cursor.execute(DATA_SQL, (kodebranch, limit, offset))
         data = cursor.fetchall()
 
         cursor.execute("""
@@ -165,6 +169,9 @@ def insert_entity():
         execute_values(cur, insert_sql, rows_to_insert, page_size=500)
         inserted_count = len(rows_to_insert)
 
+    # Proses ulang mapping_error untuk kode dist yang baru di-mapping
+    reresolve_job = enqueue_reresolve(cur, "salesman", [r[2] for r in rows_to_insert])
+
     conn.commit()
     cur.close()
     release_db_connection(conn)
@@ -177,7 +184,8 @@ def insert_entity():
         "invalid_id_salesman": list(set([r[0] for r in invalid_id_salesman_rows])),
         "skipped_duplicate_internal": len(duplicate_internal),
         "skipped_duplicate_db": len(existing_ids),
-        "skipped_invalid_id_salesman": len(invalid_id_salesman_rows)
+        "skipped_invalid_id_salesman": len(invalid_id_salesman_rows),
+        "reresolve_jobs": [reresolve_job] if reresolve_job else []
     }), 200
 
 #UPDATE ENTITY
@@ -197,6 +205,7 @@ def update_entity_route(id_salesman):
             "UPDATE mapping_salesman SET id_salesman_dist=%s, nama_salesman_dist=%s, updatedate=%s, updateby=%s where id_salesman=%s ",
             (id_salesman_dist,nama_salesman_dist, datetime.now(), updateby, id_salesman)
         )
+        enqueue_reresolve(cursor, "salesman", [id_salesman_dist])
         conn.commit()
     except Exception as e:
         conn.rollback()
@@ -4,10 +4,19 @@ import jwt, os
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
 
 salesman_master_bp = Blueprint('salesman_master',__name__, url_prefix='/salesman-master')
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev_secret')
 
+# Query halaman /data (juga di-EXPLAIN oleh explain_routes.py)
+DATA_SQL = """
+    SELECT *
+    FROM salesman_master
+    WHERE kodebranch = %s
+    LIMIT %s OFFSET %s
+"""
+
 #MIDDLEWARE TOKEN
 def token_required(f):
     @wraps(f)
@@ -51,12 +60,7 @@ def get_salesman_master():
     try:
         # CASE 1: Hanya kodebranch
         if not salesman_team:
-            cursor.execute("""
-                SELECT *
-                FROM salesman_master
-                WHERE kodebranch = %s
-                LIMIT %s OFFSET %s
-            """, (kodebranch, limit, offset))
+            cursor.execute(DATA_SQL, (kodebranch, limit, offset))
             data = cursor.fetchall()
 
             cursor.execute("""
@@ -132,14 +136,12 @@ def insert_salesman_master():
     existing_ids = [r["id_salesman"] for r in existing_rows] if existing_rows else []
 
     # CEK id_team VALID
-    cur.execute("SELECT id, description FROM salesman_team WHERE id = ANY(%s)", (id_teams,))
-    team_rows = cur.fetchall()
-    valid_teams = {r["id"]: r["description"] for r in team_rows}
+    team_rows = reference_cache.lookup(conn, "salesman_team", id_teams)
+    valid_teams = {k: r["description"] for k, r in team_rows.items()}
 
     # CEK kodebranch VALID
-    cur.execute("SELECT kodebranch, nama_branch FROM branch WHERE kodebranch = ANY(%s)", (kodebranches,))
-    branch_rows = cur.fetchall()
-    valid_branches = {r["kodebranch"]: r["nama_branch"] for r in branch_rows}
+    branch_rows = reference_cache.lookup(conn, "branch", kodebranches)
+    valid_branches = {k: r["nama_branch"] for k, r in branch_rows.items()}
 
     # FILTER VALID ROWS DAN ISI salesman_team & nama_branch
     rows_valid = []
@@ -4,6 +4,7 @@ import jwt, os
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor, execute_values
+from process import reference_cache
 
 salesman_team_bp = Blueprint('salesman_team', __name__, url_prefix='/salesman-team')
 SECRET_KEY = os.getenv("SECRET_KEY", "dev_secret")
@@ -108,6 +109,7 @@ def insert_salesman_team():
         inserted_count = len(rows_to_insert)
 
     conn.commit()
+    reference_cache.invalidate("salesman_team")
     cur.close()
     release_db_connection(conn)
 
@@ -142,6 +144,7 @@ def update_area_route(id):
             (description, datetime.now(), updateby, id)
         )
         conn.commit()
+        reference_cache.invalidate("salesman_team")
     except Exception as e:
         conn.rollback()
         cursor.close()
@@ -170,6 +173,7 @@ def delete_salesman_team():
         format_strings = ",".join(["%s"] * len(ID))
         cursor.execute(f"DELETE FROM salesman_team WHERE id IN ({format_strings})", tuple(ID))
         conn.commit()
+        reference_cache.invalidate("salesman_team")
     except Exception as e:
         conn.rollback()
         cursor.close()
@@ -1,7 +1,6 @@
 from datetime import datetime
 from flask import Blueprint, jsonify, request
 import jwt, os, uuid
-import pandas as pd
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor
@@ -9,6 +8,43 @@ from psycopg2.extras import RealDictCursor
 mapping_error_bp = Blueprint('mapping_error', __name__, url_prefix='/mapping-error')
 SECRET_KEY = os.getenv('SECRET_KEY', "dev_secret")
 
+# Kode distributor penyebab error sesuai status
+ERROR_CODE_SQL = """
+    CASE
+        WHEN status IN ('BRANCH_NOT_MAPPED', 'BRANCH_CODE_NOT_FOUND_IN_MASTER') THEN kodebranch
+        WHEN status = 'SALESMAN_NOT_MAPPED' THEN id_salesman
+        WHEN status IN ('CUSTOMER_NOT_MAPPED', 'CUSTOMER_NOT_FOUND_IN_MASTER_PRC') THEN id_customer
+        WHEN status IN ('PRODUCT_NOT_MAPPED', 'PRODUCT_NOT_FOUND_IN_PRODUCT_GROUP') THEN id_product
+    END
+"""
+
+# Query halaman /data dan /summary (juga di-EXPLAIN oleh explain_routes.py)
+DATA_SQL = """
+    SELECT
+        kodebranch, id_salesman, id_customer, order_no, order_date, sfa_order_no, sfa_order_date, invoice_no, invoice_date,
+        id_product, price, qty1, qty2, qty3, grossamount, status, modified_date, upload_batch_id
+    FROM mapping_error
+    WHERE kodebranch=%s
+      AND invoice_date BETWEEN %s AND %s
+    ORDER BY invoice_date
+    LIMIT %s OFFSET %s
+"""
+
+SUMMARY_SQL = f"""
+    SELECT
+        status,
+        {ERROR_CODE_SQL} AS code,
+        COUNT(1) AS lines,
+        COALESCE(SUM(grossamount), 0) AS grossamount,
+        MIN(invoice_date) AS first_invoice_date,
+        MAX(invoice_date) AS last_invoice_date
+    FROM mapping_error
+    WHERE kodebranch=%s
+      AND invoice_date BETWEEN %s AND %s
+    GROUP BY 1, 2
+    ORDER BY lines DESC, status, code
+"""
+
 # TOKEN 
 def token_required(f):
     @wraps(f)
@@ -50,16 +86,7 @@ def get_sellout():
     cursor = conn.cursor(cursor_factory=RealDictCursor)
 
     try:
-        cursor.execute("""
-            SELECT
-                kodebranch, id_salesman, id_customer, order_no, order_date, sfa_order_no, sfa_order_date, invoice_no, invoice_date,
-                id_product, price, qty1, qty2, qty3, grossamount, status, modified_date, upload_batch_id
-            FROM mapping_error
-            WHERE kodebranch=%s
-              AND invoice_date BETWEEN %s AND %s
-            ORDER BY invoice_date
-            LIMIT %s OFFSET %s
-        """, (kodebranch, date_from, date_to, limit, offset))
+        cursor.execute(DATA_SQL, (kodebranch, date_from, date_to, limit, offset))
 
         data = cursor.fetchall()
 
@@ -81,4 +108,36 @@ def get_sellout():
 
     finally:
         cursor.close()
-        release_db_connection(conn)
\ No newline at end of file
+        release_db_connection(conn)
+
+
+#  GET RINGKASAN MAPPING ERROR (PER STATUS + KODE DISTRIBUTOR)
+@mapping_error_bp.route('/summary', methods=['GET'])
+@token_required
+def get_mapping_error_summary():
+    kodebranch = request.args.get('kodebranch')
+    date_from = request.args.get('date_from')
+    date_to = request.args.get('date_to')
+
+    if not kodebranch:
+        return jsonify({"error": "kodebranch wajib diisi"}), 400
+    if not date_from or not date_to:
+        return jsonify({"error": "date_from dan date_to wajib diisi"}), 400
+
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+    try:
+        cursor.execute(SUMMARY_SQL, (kodebranch, date_from, date_to))
+
+        data = cursor.fetchall()
+
+        return jsonify({
+            "data": data,
+            "total_lines": sum(r["lines"] for r in data),
+            "total_grossamount": sum(r["grossamount"] for r in data)
+        }), 200
+
+    finally:
+        cursor.close()
+        release_db_connection(conn)
@@ -1,21 +1,65 @@
 from datetime import datetime
 from flask import Blueprint, jsonify, request
-import jwt, os, uuid
-import pandas as pd
+import jwt, os, uuid, json, time
 from functools import wraps
 from db import get_db_connection, release_db_connection
 from psycopg2.extras import RealDictCursor
-from process.sellout_temp import (
-    load_file,
-    process_sellout,
-    insert_sellout,
-    delete_sellout_final_by_month,
-    delete_sellout_temp_old_months
+from process.staging import create_staging_table, index_staging_table
+from process.job_queue import enqueue_finalize, queue_stats, clamp_priority, set_priority, MAX_PRIORITY
+from process.batch_metrics import StageTimer, record_upload_metrics, list_batch_metrics
+from process.upload_diff import (
+    file_hash,
+    find_identical_upload,
+    record_upload,
+    has_pending_batch,
+    existing_hashes,
+    plan_diff,
+    apply_removals
 )
+from process.mapping_coverage import mapping_coverage
+from process.parse_plan import get_plan, compile_plan, load_config
 
 sellout_bp = Blueprint('sellout', __name__, url_prefix='/sellout')
+# Batas baris per halaman /batches (LATERAL join ke antrian per baris)
+MAX_BATCHES_LIMIT = 500
 SECRET_KEY = os.getenv('SECRET_KEY', "dev_secret")
 
+# Query halaman /data (juga di-EXPLAIN oleh explain_routes.py)
+DATA_SQL = """
+    SELECT
+        region_code, region_name,
+        entity_code, entity_name,
+        branch_code, branch_name,
+        area_code, area_name,
+        salesman_code, salesman_name,
+        custcode_prc, custcode_dist, custname, custaddress,
+        custcity, sub_channel, type_outlet,
+        order_no, order_date,
+        invoice_no, invoice_type, invoice_date,
+        product_brand, product_group1, product_group2, product_group3,
+        pcode, pcode_name,
+        qty1, qty2, qty3, qty4, qty5,
+        flag_bonus,
+        grossamount,
+        discount1, discount2, discount3, discount4,
+        discount5, discount6, discount7, discount8,
+        total_discount, dpp, tax, nett,
+        category, vtkp, npd,
+        createdate, createby, updatedate, updateby
+    FROM sellout
+    WHERE branch_code=%s
+      AND invoice_date BETWEEN %s AND %s
+    ORDER BY invoice_date
+    LIMIT %s OFFSET %s
+"""
+
+COUNT_SQL = """
+    SELECT COUNT(1) AS total
+    FROM sellout
+    WHERE branch_code=%s
+      AND invoice_date BETWEEN %s AND %s
+"""
+
 # TOKEN 
 def token_required(f):
     @wraps(f)
@@ -31,25 +75,6 @@ def token_required(f):
     return decorated
 
 
-# CONFIG
-def get_branch_config(branch_code, conn):
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT * FROM config
-        WHERE branch=%s
-        ORDER BY id DESC
-        LIMIT 1
-    """, (branch_code,))
-    row = cur.fetchone()
-    if not row:
-        cur.close()
-        return None
-    columns = [desc[0] for desc in cur.description]
-    config = dict(zip(columns, row))
-    cur.close()
-    return config
-
-
 #  GET DATA SELLOUT 
 @sellout_bp.route('/data', methods=['GET'])
 @token_required
@@ -77,42 +102,11 @@ def get_sellout():
     cursor = conn.cursor(cursor_factory=RealDictCursor)
 
     try:
-        cursor.execute("""
-            SELECT
-                region_code, region_name,
-                entity_code, entity_name,
-                branch_code, branch_name,
-                area_code, area_name,
-                salesman_code, salesman_name,
-                custcode_prc, custcode_dist, custname, custaddress,
-                custcity, sub_channel, type_outlet,
-                order_no, order_date,
-                invoice_no, invoice_type, invoice_date,
-                product_brand, product_group1, product_group2, product_group3,
-                pcode, pcode_name,
-                qty1, qty2, qty3, qty4, qty5,
-                flag_bonus,
-                grossamount,
-                discount1, discount2, discount3, discount4,
-                discount5, discount6, discount7, discount8,
-                total_discount, dpp, tax, nett,
-                category, vtkp, npd,
-                createdate, createby, updatedate, updateby
-            FROM sellout
-            WHERE branch_code=%s
-              AND invoice_date BETWEEN %s AND %s
-            ORDER BY invoice_date
-            LIMIT %s OFFSET %s
-        """, (kodebranch, date_from, date_to, limit, offset))
+        cursor.execute(DATA_SQL, (kodebranch, date_from, date_to, limit, offset))
 
         data = cursor.fetchall()
 
-        cursor.execute("""
-            SELECT COUNT(1) AS total
-            FROM sellout
-            WHERE branch_code=%s
-              AND invoice_date BETWEEN %s AND %s
-        """, (kodebranch, date_from, date_to))
+        cursor.execute(COUNT_SQL, (kodebranch, date_from, date_to))
 
         total = cursor.fetchone()["total"]
 
@@ -128,57 +122,273 @@ def get_sellout():
         release_db_connection(conn)
 
 
+#  STATUS ANTRIAN WORKER PER BRANCH
+@sellout_bp.route('/queue', methods=['GET'])
+@token_required
+def get_queue_stats():
+    try:
+        hours = int(request.args.get('hours', 24))
+    except Exception:
+        hours = 24
+
+    conn = get_db_connection()
+    try:
+        data = queue_stats(conn, hours)
+        conn.commit()
+        return jsonify({"data": data, "hours": hours}), 200
+    finally:
+        release_db_connection(conn)
+
+
+#  UBAH PRIORITAS JOB BATCH (masih PENDING)
+@sellout_bp.route('/queue/<upload_batch_id>/priority', methods=['PUT'])
+@token_required
+def update_queue_priority(upload_batch_id):
+    data = request.get_json(silent=True) or {}
+    if 'priority' not in data:
+        return jsonify({"error": f"priority wajib diisi (0-{MAX_PRIORITY})"}), 400
+    priority = clamp_priority(data['priority'])
+
+    conn = get_db_connection()
+    try:
+        if not set_priority(conn, upload_batch_id, priority):
+            return jsonify({"error": "Batch tidak ditemukan atau sudah tidak PENDING"}), 404
+        return jsonify({
+            "message": "Prioritas antrian diperbarui",
+            "upload_batch_id": upload_batch_id,
+            "priority": priority
+        }), 200
+    except Exception as e:
+        conn.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        release_db_connection(conn)
+
+
+#  METRICS PER UPLOAD BATCH
+@sellout_bp.route('/batches', methods=['GET'])
+@token_required
+def get_batches():
+    try:
+        offset = int(request.args.get('offset', 0))
+    except Exception:
+        offset = 0
+
+    try:
+        limit = int(request.args.get('limit', 50))
+    except Exception:
+        limit = 50
+
+    offset = max(0, offset)
+    limit = max(1, min(limit, MAX_BATCHES_LIMIT))
+
+    branch = request.args.get('branch') or None
+
+    conn = get_db_connection()
+    try:
+        data = list_batch_metrics(conn, branch, limit, offset)
+        conn.commit()
+        return jsonify({
+            "data": data,
+            "offset": offset,
+            "limit": limit
+        }), 200
+    finally:
+        release_db_connection(conn)
+
+
+#  PREVIEW SELLOUT (DRY-RUN)
+@sellout_bp.route('/preview', methods=['POST'])
+@token_required
+def preview_sellout_route():
+    """
+    Parse N baris pertama file dengan parse plan branch, tanpa menyimpan.
+    Field form `config` (JSON, opsional) menimpa config tersimpan, untuk
+    validasi perubahan config sebelum disimpan.
+    """
+    # pandas hanya dimuat di route yang mem-parse file (lihat app.create_app)
+    from process.sellout_preview import preview_sellout, DEFAULT_NROWS, MAX_NROWS
+
+    branch = request.form.get('branch')
+    file = request.files.get('file')
+    if not branch or not file:
+        return jsonify({"error": "Branch dan File wajib diisi"}), 400
+
+    try:
+        nrows = int(request.form.get('nrows', DEFAULT_NROWS))
+    except Exception:
+        nrows = DEFAULT_NROWS
+    nrows = max(1, min(nrows, MAX_NROWS))
+
+    draft = request.form.get('config')
+    if draft:
+        try:
+            draft = json.loads(draft)
+        except ValueError:
+            return jsonify({"error": "config harus JSON"}), 400
+
+    started = time.perf_counter()
+    conn = get_db_connection()
+    try:
+        try:
+            if draft:
+                saved = load_config(conn, branch) or {}
+                plan = compile_plan({**saved, **draft, "branch": branch})
+            else:
+                plan = get_plan(conn, branch)
+        except ValueError as e:
+            return jsonify({"error": f"Config tidak valid: {e}"}), 400
+        if not plan:
+            return jsonify({"error": f"Config branch {branch} tidak ditemukan"}), 400
+
+        try:
+            result = preview_sellout(conn, file, plan, nrows)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        conn.rollback()
+        release_db_connection(conn)
+
+
 #  UPLOAD SELLOUT 
 @sellout_bp.route('/upload', methods=['POST'])
 @token_required
 def upload_sellout():
+    from process.sellout_temp import (
+        load_file,
+        process_sellout,
+        insert_sellout,
+        delete_sellout_final_by_month,
+        delete_mapping_error_by_month
+    )
+
     conn = None
     try:
         branch = request.form.get('branch')
         file = request.files.get('file')
         username = request.form.get('username', 'system')
+        strict = str(request.form.get('strict', '')).lower() in ('1', 'true', 'yes')
+        # Replace penuh walau diff bisa dipakai: baris "tetap" di mode diff
+        # tidak di-finalize ulang, jadi enrichment-nya (nama region/area/
+        # customer/produk dari master saat finalize) tidak ikut diperbarui
+        full = str(request.form.get('full', '')).lower() in ('1', 'true', 'yes')
+        # Prioritas antrian finalize (0-MAX_PRIORITY, lebih besar diproses lebih dulu)
+        priority = clamp_priority(request.form.get('priority', 0))
 
         if not branch or not file:
             return jsonify({"error": "Branch dan File wajib diisi"}), 400
 
+        timer = StageTimer()
         conn = get_db_connection()
-        config = get_branch_config(branch, conn)
-        if not config:
+        try:
+            plan = get_plan(conn, branch)
+        except ValueError as e:
+            return jsonify({"error": f"Config branch {branch} tidak valid: {e}"}), 400
+        if not plan:
             return jsonify({"error": f"Config branch {branch} tidak ditemukan"}), 400
 
+        # 0. File identik dengan upload terakhir bulan tsb -> tidak perlu diproses
+        content = file.read()
+        fhash = file_hash(content, plan.source)
+        file.seek(0)
+        identical_batch = None if full else find_identical_upload(conn, branch, fhash)
+        if identical_batch:
+            return jsonify({
+                "message": "File identik dengan upload sebelumnya, tidak ada perubahan.",
+                "skipped": True,
+                "upload_batch_id": identical_batch
+            })
+
         # 1. Load & Process ke List
-        df = load_file(file, config)
         upload_batch_id = str(uuid.uuid4())
-        rows = process_sellout(df, config, username, upload_batch_id)
+        try:
+            with timer.stage("parse"):
+                df = load_file(file, plan)
+            with timer.stage("transform"):
+                rows = process_sellout(df, plan, username, upload_batch_id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         if not rows:
             return jsonify({"error": "File kosong atau tidak valid"}), 400
 
+        # Cek mapping sebelum delete apapun; mode strict menolak upload
+        # jika masih ada kode distributor yang belum ter-mapping
+        with timer.stage("coverage"):
+            coverage = mapping_coverage(conn, rows)
+        if strict and not coverage["fully_mapped"]:
+            conn.rollback()
+            return jsonify({
+                "error": "Upload ditolak: masih ada kode distributor yang belum ter-mapping",
+                "coverage": coverage
+            }), 422
+
         # Ambil sampel tanggal dari data pertama untuk dasar penghapusan
         sample_date = rows[0]['invoice_date']
+        dist_branches = {r['kodebranch'] for r in rows}
+
+        # 2. Diff per baris terhadap data branch-bulan yang sudah tersimpan.
+        # Replace penuh jika masih ada batch yang belum selesai di-finalize
+        # atau data lama belum punya row_hash
+        with timer.stage("delete"):
+            existing = None
+            if not full and not has_pending_batch(conn, branch):
+                existing = existing_hashes(conn, branch, dist_branches, sample_date)
+
+            if existing is not None:
+                mode = "diff"
+                rows_to_insert, remove_final, remove_error, unchanged = plan_diff(rows, *existing)
+                apply_removals(conn, branch, dist_branches, sample_date, remove_final, remove_error)
+                removed = sum(remove_final.values()) + sum(remove_error.values())
+            else:
+                mode = "full"
+                rows_to_insert, unchanged, removed = rows, 0, None
+                # Error bulan yang sama dari upload branch ini sebelumnya sudah
+                # tidak berlaku (baris sumbernya ikut di-upload ulang)
+                delete_mapping_error_by_month(conn, dist_branches, sample_date, branch)
+
+                # Hapus bulan yang sama di FINAL agar revisi data bersih (mencegah duplikat transaksi)
+                delete_sellout_final_by_month(conn, branch, sample_date)
+
+        # 3. Simpan ke staging table batch ini & Queue
+        # (staging di-drop worker setelah finalize, sisa yatim dibersihkan sweeper)
+        if rows_to_insert:
+            with timer.stage("temp_load"):
+                stage = create_staging_table(conn, upload_batch_id, branch)
+                insert_sellout(conn, rows_to_insert, stage)
+                index_staging_table(conn, stage)
+
+                cur = conn.cursor()
+                enqueue_finalize(cur, upload_batch_id, branch, len(rows_to_insert), priority)
+                cur.close()
 
-        # 2. Pembersihan Data (Hygiene Database)
-        # Hapus bulan lain di TEMP agar tabel tetap ringan
-        delete_sellout_temp_old_months(conn, sample_date)
-        
-        # Hapus bulan yang sama di FINAL agar revisi data bersih (mencegah duplikat transaksi)
-        delete_sellout_final_by_month(conn, branch, sample_date)
-
-        # 3. Simpan ke Temp & Queue
-        insert_sellout(conn, rows)
-        
-        cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO sellout_process_queue (upload_batch_id, status, created_at)
-            VALUES (%s, 'PENDING', NOW())
-        """, (upload_batch_id,))
-        
+        record_upload(conn, branch, sample_date, fhash, upload_batch_id, len(rows), mode)
+        record_upload_metrics(
+            conn, upload_batch_id, branch, file.filename, len(content), mode,
+            timer, len(rows), len(rows_to_insert)
+        )
         conn.commit()
 
         return jsonify({
-            "message": "Upload berhasil. Data sedang diproses oleh worker.",
+            "message": (
+                "Upload berhasil. Data sedang diproses oleh worker."
+                if rows_to_insert else
+                "Upload berhasil. Tidak ada baris baru atau berubah."
+            ),
             "total_row": len(rows),
-            "upload_batch_id": upload_batch_id
+            "upload_batch_id": upload_batch_id,
+            "coverage": coverage,
+            "mode": mode,
+            "diff": {
+                "inserted": len(rows_to_insert),
+                "removed": removed,
+                "unchanged": unchanged
+            }
         })
 
     except Exception as e:
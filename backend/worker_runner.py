@@ -1,5 +1,28 @@
+import argparse
+import os
+from metrics import start_http_server
 from process.worker import sellout_worker
 
 if __name__ == "__main__":
-    print("🚀 Sellout worker started")
-    sellout_worker()
+    parser = argparse.ArgumentParser(description="Worker finalize sellout")
+    parser.add_argument(
+        "--lane",
+        choices=["all", "fast", "bulk"],
+        default=os.getenv("WORKER_LANE", "all"),
+        help="fast = hanya job kecil (jalankan minimal satu agar upload kecil tidak antri di belakang file besar)"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=int(os.getenv("WORKER_METRICS_PORT", "9101")),
+        help="port HTTP /metrics (format Prometheus), 0 = nonaktif. Beberapa worker di satu host butuh port berbeda"
+    )
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+        print(f"📈 Metrics: http://0.0.0.0:{args.metrics_port}/metrics")
+
+    lane = None if args.lane == "all" else args.lane.upper()
+    print(f"🚀 Sellout worker started (lane: {args.lane})")
+    sellout_worker(lane)
@@ -0,0 +1,11 @@
+"""
+Entrypoint production (jalankan dari folder backend):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Profil worker dipilih lewat env GUNICORN_PROFILE (lihat gunicorn.conf.py).
+`python app.py` tetap untuk development (Flask debug server).
+"""
+from app import create_app
+
+app = create_app()
@@ -214,6 +214,8 @@ else:
                     st.session_state.page = "sellout"; st.rerun()
                 if st.button("Mapping Error", key="sellout2", use_container_width=True):
                     st.session_state.page = "mapping_error"; st.rerun()
+                if st.button("Batch Upload", key="sellout3", use_container_width=True):
+                    st.session_state.page = "batch_metrics"; st.rerun()
 
             # USER CARD + LOGOUT
             st.markdown(f"""
@@ -411,3 +413,7 @@ else:
         from pages.sellout import mapping_error_page
         mapping_error_page.app()
 
+    elif st.session_state.page == "batch_metrics":
+        from pages.sellout import batch_metrics_page
+        batch_metrics_page.app()
+
@@ -3,6 +3,7 @@ import pandas as pd
 from io import BytesIO
 from datetime import datetime
 from utils.api.area.area_api import insert_areas
+from utils.excel import read_excel
 
 
 # Fungsi buat template XLSX
@@ -18,7 +19,7 @@ def generate_template():
 # Fungsi upload dan insert ke database 
 def process_upload(file, username):
     try:
-        df = pd.read_excel(file)
+        df = read_excel(file)
     except Exception as e:
         st.error(f"❌ File tidak valid. Error detail: {e}")
         return None
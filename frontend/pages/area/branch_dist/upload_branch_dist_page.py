@@ -3,6 +3,7 @@ import pandas as pd
 from io import BytesIO
 from datetime import datetime
 from utils.api.area.branch_dist_api import insert_branch_dist
+from utils.excel import read_excel
 
 # BUAT TEMPLATE XLSX
 def generate_template():
@@ -16,7 +17,7 @@ def generate_template():
 # UPLOAD DAN INSERT DATANASE
 def process_upload(file, username):
     try:
-        df = pd.read_excel(file)
+        df = read_excel(file)
     except Exception as e:
         st.error(f"❌ File tidak valid. Error detail: {e}")
         return None
@@ -3,6 +3,7 @@ import pandas as pd
 from io import BytesIO
 from datetime import datetime
 from utils.api.area.mapping_branch_api import insert_mapping_branch
+from utils.excel import read_excel
 
 # Template XLSX
 def generate_template():
@@ -16,7 +17,7 @@ def generate_template():
 # UPLOAD
 def process_upload(file, username):
     try:
-        df = df = pd.read_excel(file, dtype={"branch_dist": str, "kodebranch": str})
+        df = df = read_excel(file, dtype={"branch_dist": str, "kodebranch": str})
     except Exception:
         st.error("❌ File tidak valid. Pastikan file Excel benar.")
         return None
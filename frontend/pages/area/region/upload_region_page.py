@@ -3,6 +3,7 @@ import pandas as pd
 from io import BytesIO
 from datetime import datetime
 from utils.api.area.region_api import insert_region
+from utils.excel import read_excel
 
 # Fungsi buat template XLSX
 def generate_template():
@@ -16,7 +17,7 @@ def generate_template():
 # Fungsi upload dan insert ke database 
 def process_upload(file, username):
     try:
-        df = pd.read_excel(file)
+        df = read_excel(file)
     except Exception:
         st.error("❌ File tidak valid. Pastikan file Excel benar.")
         return None
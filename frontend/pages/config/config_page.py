@@ -1,9 +1,12 @@
 import streamlit as st
+import pandas as pd
 from utils.api.config.config_api import (
     get_data_config,
     update_config,
     delete_config
 )
+from utils.api.sellout.sellout_api import preview_sellout_file
+from pages.sellout.upload_sellout import show_coverage
 
 PAGE_CHUNK = 1500
 
@@ -18,6 +21,36 @@ def to_int_or_none(val):
         return None
 
 
+# PREVIEW FILE CONTOH
+def show_preview(res):
+    if res is None:
+        return
+    if res.status_code != 200:
+        try:
+            st.error(f"❌ {res.json().get('error')}")
+        except ValueError:
+            st.error(f"❌ Preview gagal: {res.text}")
+        return
+
+    result = res.json()
+    failures = result.get("coercion_failures", [])
+    st.caption(f"{result['rows_read']} baris dibaca dalam {result['elapsed_ms']} ms")
+
+    if result.get("engine_error"):
+        st.error(f"❌ Engine {result['plan']['engine']} gagal membaca file, upload akan ditolak: {result['engine_error']}")
+
+    if failures:
+        st.warning(f"⚠️ {len(failures)} nilai tidak sesuai tipe kolom")
+        st.dataframe(pd.DataFrame(failures), width="stretch", hide_index=True)
+    else:
+        st.success("✅ Semua kolom terbaca sesuai tipe")
+
+    show_coverage(result.get("coverage"))
+
+    with st.expander("Hasil mapping kolom", expanded=True):
+        st.dataframe(pd.DataFrame(result.get("data", [])), width="stretch", hide_index=True)
+
+
 # CSS BORDER TABLE
 st.markdown("""
 <style>
@@ -152,10 +185,34 @@ def app():
             separator_file = st.text_input("Separator File", selected.get("separator_file") or ",")
             first_row = st.text_input("First Row", value=str(selected.get("first_row") or ""))
             flag_bonus = st.text_input("Flag Bonus (0 / 1)", value=str(selected.get("flag_bonus") or "0"))
-
-            submit = st.form_submit_button("💾 Simpan Perubahan")
-
-        if submit:
+            engines = ["c", "pyarrow"]
+            parse_engine = st.selectbox(
+                "Parse Engine (csv/txt)",
+                engines,
+                index=engines.index(selected.get("parse_engine") or "c"),
+                help="pyarrow: parse multithread, hanya kolom di config yang dibaca"
+            )
+            date_format = st.text_input(
+                "Format Tanggal (mis. %d/%m/%Y)",
+                value=selected.get("date_format") or "",
+                help="Dipakai engine pyarrow; kosongkan agar tanggal diproses database"
+            )
+
+            st.markdown("**🧪 Validasi dengan file contoh** (tidak disimpan)")
+            sample_file = st.file_uploader(
+                "File contoh distributor",
+                type=["xlsx", "csv", "txt"],
+                key=f"preview_file_{selected['branch']}"
+            )
+            preview_rows = st.number_input("Jumlah baris preview", min_value=1, max_value=1000, value=50)
+
+            col_save, col_preview = st.columns(2)
+            with col_save:
+                submit = st.form_submit_button("💾 Simpan Perubahan")
+            with col_preview:
+                preview = st.form_submit_button("🧪 Preview File")
+
+        if submit or preview:
             payload = {
                 "kodebranch": kodebranch,
                 "id_salesman": id_salesman,
@@ -195,9 +252,21 @@ def app():
                 "separator_file": separator_file,
                 "first_row": first_row,
                 "flag_bonus": flag_bonus,
+                "parse_engine": parse_engine,
+                "date_format": date_format or None,
                 "updateby": updateby
             }
 
+        if preview:
+            if not sample_file:
+                st.warning("⚠️ Pilih file contoh terlebih dahulu")
+            else:
+                draft = {k: v for k, v in payload.items() if k != "updateby"}
+                with st.spinner("Membaca file contoh..."):
+                    res = preview_sellout_file(selected["branch"], sample_file, draft, int(preview_rows))
+                show_preview(res)
+
+        if submit:
             res = update_config(token, selected["branch"], **payload)
             if res and res.status_code == 200:
                 st.success("✅ Data berhasil diupdate")
@@ -205,7 +274,7 @@ def app():
                 refresh_config()
                 st.rerun()
             else:
-                st.error("❌ Gagal update data")
+                st.error(f"❌ Gagal update data: {res.text if res is not None else ''}")
 
         if st.button("❌ Tutup Detail"):
             st.session_state.pop("selected_config")
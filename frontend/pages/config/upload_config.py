@@ -3,6 +3,7 @@ import pandas as pd
 from io import BytesIO
 from datetime import datetime
 from utils.api.config.config_api import insert_config
+from utils.excel import read_excel
 
 
 # TEMPLATE XLSX
@@ -18,7 +19,8 @@ def generate_template():
         "invoice_type",
         "sfa_order_no", "sfa_order_date",
         "file_extension", "separator_file",
-        "first_row", "flag_bonus"
+        "first_row", "flag_bonus",
+        "parse_engine", "date_format"
     ]
 
     df = pd.DataFrame(columns=cols)
@@ -33,7 +35,7 @@ def generate_template():
 # PROCESS UPLOAD
 def process_upload(file, username):
     try:
-        df = pd.read_excel(file)
+        df = read_excel(file)
     except Exception:
         st.error("❌ File tidak valid. Pastikan file Excel benar.")
         return None
@@ -136,6 +138,7 @@ def app():
         message = result.get("message", "")
         skipped_duplicate = result.get("skipped_duplicate", [])
         skipped_invalid = result.get("skipped_invalid", [])
+        skipped_invalid_config = result.get("skipped_invalid_config", [])
 
         st.success("✅ Upload selesai")
 
@@ -156,6 +159,12 @@ def app():
                 "Status": "Invalid Data (Skipped)"
             })
 
+        for c in skipped_invalid_config:
+            rows.append({
+                "Key": c["branch"],
+                "Status": f"Config tidak valid (Skipped): {c['error']}"
+            })
+
         if rows:
             df_display = pd.DataFrame(rows)
             st.warning("⚠️ Sebagian data tidak diproses")
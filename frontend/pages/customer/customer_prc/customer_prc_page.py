@@ -11,6 +11,7 @@ from utils.api.customer.customer_prc_api import (
     update_customer_prc,
     delete_customer_prc
 )
+from utils.api.list_api import get_area_list, clear_area_cache
 
 PAGE_CHUNK = 100 
 
@@ -39,13 +40,9 @@ def fetch_all_customer_prc_cached(token, kodebranch, chunk_limit=2000):
     return all_data
 
 
-@cache_data(ttl=3600)
 def get_mapping_cached(token):
-    """Cache mapping region/entity/branch (1 jam)."""
-    res = get_region_entity_branch_mapping(token)
-    if res and res.status_code == 200:
-        return res.json().get("data", [])
-    return []
+    """Mapping region/entity/branch, direvalidasi ke server via ETag."""
+    return get_area_list(token)
 
 
 # RENDER AG-GRID
@@ -150,9 +147,8 @@ def app():
     st.title("🏪 Customer Master")
 
     # Mapping region/entity/branch (cached)
-    if st.session_state.get("mapping_customer_prc") is None:
-        with st.spinner("Memuat mapping region/entity/branch..."):
-            st.session_state["mapping_customer_prc"] = get_mapping_cached(token)
+    # Revalidasi ke server (304 jika mapping belum berubah)
+    st.session_state["mapping_customer_prc"] = get_mapping_cached(token)
 
     mapping_df = pd.DataFrame(st.session_state.get("mapping_customer_prc", []))
 
@@ -211,7 +207,7 @@ def app():
             # clear cache for this function
             fetch_all_customer_prc_cached.clear()
             # repopulate mapping cache as well
-            get_mapping_cached.clear()
+            clear_area_cache()
             kodebranch = st.session_state.get("last_kodebranch")
             if kodebranch:
                 with st.spinner("Memuat ulang data (fresh)..."):
@@ -5,18 +5,16 @@ from utils.api.customer.mapping_customer_api import (
     get_data_mapping_customer,
     delete_mapping_customer
 )
+from utils.api.list_api import get_area_list
 from st_aggrid import AgGrid, GridUpdateMode, DataReturnMode
 from streamlit import cache_data
 
 PAGE_CHUNK = 100
 
 # CACHE DATA MAPPING
-@cache_data(ttl=3600)
 def get_mapping_cached(token):
-    res = get_region_entity_branch_mapping(token)
-    if res and res.status_code == 200:
-        return res.json().get("data", [])
-    return []
+    """Mapping region/entity/branch, direvalidasi ke server via ETag."""
+    return get_area_list(token)
 
 
 # FETCH ALL DATA (PAGINATION)
@@ -124,9 +122,8 @@ def app():
     st.title("👥 Mapping Customer")
 
     # LOAD MAPPING REGION/ENTITY/BRANCH
-    if st.session_state.get("mapping_customer") is None:
-        with st.spinner("Memuat data region/entity/branch..."):
-            st.session_state.mapping_customer = get_mapping_cached(token)
+    # Revalidasi ke server (304 jika mapping belum berubah)
+    st.session_state.mapping_customer = get_mapping_cached(token)
     mapping_df = pd.DataFrame(st.session_state.mapping_customer)
 
     if "filter_expander_open" not in st.session_state:
@@ -9,16 +9,14 @@ from utils.api.product.mapping_product_api import (
     get_mapping_product,
     delete_mapping_product
 )
+from utils.api.list_api import get_area_mapping_list
 
 PAGE_CHUNK = 100
 
 # CACHE DATA MAPPING
-@cache_data(ttl=3600)
 def get_mapping_cached(token):
-    res = get_region_entity_mapping_branch(token)
-    if res and res.status_code == 200:
-        return res.json().get("data", [])
-    return []
+    """Mapping region/entity/branch, direvalidasi ke server via ETag."""
+    return get_area_mapping_list(token)
 
 
 # FETCH ALL DATA (PAGINATION)
@@ -133,9 +131,8 @@ def app():
     st.title("👥 Mapping Product")
 
     # LOAD MAPPING REGION/ENTITY/BRANCH
-    if st.session_state.get("mapping_product") is None:
-        with st.spinner("Memuat data region/entity/branch..."):
-            st.session_state.mapping_product = get_mapping_cached(token)
+    # Revalidasi ke server (304 jika mapping belum berubah)
+    st.session_state.mapping_product = get_mapping_cached(token)
     mapping_df = pd.DataFrame(st.session_state.mapping_product)
 
     if "filter_expander_open" not in st.session_state:
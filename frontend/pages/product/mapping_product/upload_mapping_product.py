@@ -2,7 +2,9 @@ import streamlit as st
 import pandas as pd
 from io import BytesIO
 from datetime import datetime
-from utils.api.product.mapping_product_api import insert_mapping_product
+from utils.api.product.mapping_product_api import insert_mapping_product, suggest_mapping_product
+from utils.api.chunked_upload import chunked_result, show_upload_stats
+from utils.excel import read_excel
 
 # GENERATE TEMPLATE XLSX
 def generate_template():
@@ -24,7 +26,7 @@ def normalize_value(val):
 # PROSES UPLOAD
 def process_upload(file, username):
     try:
-        df = pd.read_excel(file, dtype=str)
+        df = read_excel(file, dtype=str)
     except Exception:
         st.error("❌ File tidak valid. Pastikan file Excel benar.")
         return None
@@ -40,20 +42,76 @@ def process_upload(file, username):
     df["createby"] = username
     df["createdate"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    res = insert_mapping_product(df)
-    if not res:
-        st.error("Gagal terhubung ke server")
-        return None
+    upload = insert_mapping_product(df)
+    return chunked_result(upload)
+
+# SARAN MAPPING OTOMATIS
+def suggestion_section(username):
+    st.subheader("🤖 Saran Mapping Otomatis")
+    st.caption("Mencari Product PRC dengan nama paling mirip untuk Product DIST yang belum ter-mapping.")
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        branch_dist = st.text_input("Branch Dist", key="suggest_branch_dist")
+    with col2:
+        min_score = st.slider("Skor minimum diterima", 0.3, 1.0, 0.8, 0.05)
+
+    if st.button("🔍 Cari Saran"):
+        if not branch_dist:
+            st.warning("⚠ Branch Dist wajib diisi")
+            return
+        with st.spinner("Mencari kandidat..."):
+            res = suggest_mapping_product(branch_dist.strip())
+        if not res or res.status_code != 200:
+            st.error("❌ Gagal mengambil saran mapping")
+            return
+        st.session_state.mapping_suggestions = res.json().get("data", [])
+
+    suggestions = st.session_state.get("mapping_suggestions")
+    if suggestions is None:
+        return
+
+    rows = []
+    for s in suggestions:
+        if not s["candidates"]:
+            continue
+        best = s["candidates"][0]
+        rows.append({
+            "terima": best["score"] >= min_score,
+            "pcode_dist": s["pcode_dist"],
+            "pcodename_dist": s["pcodename_dist"],
+            "pcode_prc": best["pcode"],
+            "pcodename_prc": best["pcodename"],
+            "skor": best["score"],
+            "branch_dist": s["branch_dist"]
+        })
+
+    st.info(f"{len(suggestions)} Product DIST belum ter-mapping, {len(rows)} punya kandidat.")
+    if not rows:
+        return
+
+    df = pd.DataFrame(rows)
+    edited = st.data_editor(
+        df,
+        disabled=[c for c in df.columns if c != "terima"],
+        hide_index=True,
+        width="stretch"
+    )
+    accepted = edited[edited["terima"]]
+
+    if st.button(f"✅ Simpan {len(accepted)} Mapping Terpilih", disabled=accepted.empty):
+        df_insert = accepted[["branch_dist", "pcode_dist", "pcode_prc"]].copy()
+        df_insert["createby"] = username
+        df_insert["createdate"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        with st.spinner("Menyimpan mapping..."):
+            result_json = chunked_result(insert_mapping_product(df_insert))
+        if result_json:
+            st.session_state.mapping_suggestions = None
+            st.session_state.upload_result = result_json
+            st.session_state.upload_done = True
+            st.rerun()
 
-    if res.status_code == 200:
-        try:
-            return res.json()
-        except Exception:
-            return {"message": f"Berhasil upload {len(df)} record ke database."}
-    else:
-        st.error(f"Gagal upload data: {res.text}")
-        return None
-    
 # MAIN PAGE
 def app():
     if "logged_in" not in st.session_state or not st.session_state.logged_in:
@@ -93,6 +151,9 @@ def app():
                 st.session_state.upload_done = True
                 st.rerun()
 
+        st.markdown("---")
+        suggestion_section(username)
+
     # HASIL UPLOAD
     else:
         result_json = st.session_state.upload_result
@@ -102,10 +163,14 @@ def app():
         skipped_invalid_dist = result_json.get("skipped_invalid_dist", [])
 
         st.success("✅ Upload selesai. Berikut hasil proses:")
+        show_upload_stats(result_json)
 
         if message:
             st.info(message)
 
+        if result_json.get("reresolve_jobs"):
+            st.info("🔁 Data Mapping Error untuk kode distributor baru sedang diproses ulang oleh worker.")
+
         # Build tabel skip
         rows = []
         for i in duplicate_entities:
@@ -10,6 +10,7 @@ from utils.api.product.product_dist_api import (
     update_product_dist,
     delete_product_dist
 )
+from utils.api.list_api import get_area_mapping_list, clear_area_cache
 
 PAGE_CHUNK = 100
 
@@ -37,12 +38,9 @@ def fetch_all_product_dist_cached(token, branch_dist=None, chunk_limit=2000):
 
     return all_data
 
-@cache_data(ttl=3600)
 def get_mapping_cached(token):
-    res = get_region_entity_mapping_branch(token)
-    if res and res.status_code == 200:
-        return res.json().get("data", [])
-    return []
+    """Mapping region/entity/branch, direvalidasi ke server via ETag."""
+    return get_area_mapping_list(token)
 
 # RENDER AG-GRID
 def render_grid(df, grid_key):
@@ -124,9 +122,8 @@ def app():
     st.title("🍘 Product Dist")
 
     # Load mapping
-    if st.session_state.get("mapping_product_dist") is None:
-        with st.spinner("Memuat mapping region/entity/branch..."):
-            st.session_state["mapping_product_dist"] = get_mapping_cached(token)
+    # Revalidasi ke server (304 jika mapping belum berubah)
+    st.session_state["mapping_product_dist"] = get_mapping_cached(token)
 
     mapping_df = pd.DataFrame(st.session_state.get("mapping_product_dist", []))
 
@@ -180,7 +177,7 @@ def app():
     with cols[0]:
         if st.button("🔄 Force Reload"):
             fetch_all_product_dist_cached.clear()
-            get_mapping_cached.clear()
+            clear_area_cache()
             branch_dist = st.session_state.get("last_branch_dist")
             if branch_dist:
                 with st.spinner("Memuat ulang data (fresh)..."):
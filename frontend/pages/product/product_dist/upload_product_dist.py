@@ -3,6 +3,8 @@ import pandas as pd
 from io import BytesIO
 from datetime import datetime
 from utils.api.product.product_dist_api import insert_product_dist
+from utils.api.chunked_upload import chunked_result, show_upload_stats
+from utils.excel import read_excel
 
 def generate_template():
     df = pd.DataFrame(columns=["pcode_dist", "pcodename", "branch_dist"])
@@ -15,7 +17,7 @@ def generate_template():
 # UPLOAD
 def process_upload(file, username):
     try:
-        df = pd.read_excel(file, dtype={"pcode_dist": str, "branch_dist": str})
+        df = read_excel(file, dtype={"pcode_dist": str, "branch_dist": str})
     except Exception:
         st.error("❌ File tidak valid. Pastikan file Excel benar.")
         return None
@@ -31,21 +33,8 @@ def process_upload(file, username):
     df["createdate"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     # KIRIM DATA KE API
-    res = insert_product_dist(df)
-    if not res:
-        st.error("Gagal terhubung ke server")
-        return None
-    
-    if res.status_code == 200:
-        try:
-            result_json = res.json()
-        except Exception:
-            st.success(f"✅ Berhasil upload {len(df)} record ke database area.")
-            return {"message": f"Berhasil upload {len(df)} record ke database."}
-        return result_json
-    else:
-        st.error(f"Gagal upload data: {res.text}")
-        return None
+    upload = insert_product_dist(df)
+    return chunked_result(upload)
 
 # HALAMAN UPLOAD BRANCH
 def app():
@@ -99,6 +88,7 @@ def app():
         invalid_kodebranch = result_json.get("invalid_kodebranch", [])
 
         st.success("✅ Upload selesai. Berikut hasil proses:")
+        show_upload_stats(result_json)
         if message:
             st.info(message)
 
@@ -3,6 +3,8 @@ import pandas as pd
 from io import BytesIO
 from datetime import datetime
 from utils.api.product.product_group_api import insert_product_group
+from utils.api.chunked_upload import chunked_result, show_upload_stats
+from utils.excel import read_excel
 
 # Fungsi buat template XLSX
 def generate_template():
@@ -19,7 +21,7 @@ def generate_template():
 # Fungsi upload dan insert ke database 
 def process_upload(file, username):
     try:
-        df = pd.read_excel(file)
+        df = read_excel(file)
     except Exception:
         st.error("❌ File tidak valid. Pastikan file Excel benar.")
         return None
@@ -35,20 +37,8 @@ def process_upload(file, username):
     df["createdate"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     # Kirim ke API
-    res = insert_product_group(df)
-    if not res:
-        st.error("Gagal terhubung ke server.")
-        return None
-
-    if res.status_code == 200:
-        try:
-            return res.json()
-        except Exception:
-            st.success(f"✅ Berhasil upload {len(df)} record ke database.")
-            return {"message": f"Berhasil upload {len(df)} record ke database."}
-    else:
-        st.error(f"Gagal upload data: {res.text}")
-        return None
+    upload = insert_product_group(df)
+    return chunked_result(upload)
 
 # Halaman Upload 
 def app():
@@ -102,6 +92,7 @@ def app():
         message = result_json.get("message", "")
 
         st.success(f"✅ Upload selesai. {inserted_count} record berhasil ditambahkan.")
+        show_upload_stats(result_json)
         if message:
             st.info(message)
 
@@ -3,6 +3,8 @@ import pandas as pd
 from io import BytesIO
 from datetime import datetime
 from utils.api.product.product_prc_api import insert_product_prc
+from utils.api.chunked_upload import chunked_result, show_upload_stats
+from utils.excel import read_excel
 
 # Fungsi buat template XLSX
 def generate_template():
@@ -16,7 +18,7 @@ def generate_template():
 # Fungsi upload dan insert ke database 
 def process_upload(file, username):
     try:
-        df = pd.read_excel(file)
+        df = read_excel(file)
     except Exception:
         st.error("❌ File tidak valid. Pastikan file Excel benar.")
         return None
@@ -32,23 +34,9 @@ def process_upload(file, username):
     df["createdate"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     # Kirim ke API
-    res = insert_product_prc(df)
-    if not res:
-        st.error("Gagal terhubung ke server.")
-        return None
-
-    if res.status_code == 200:
-        try:
-            result_json = res.json()
-        except Exception:
-            st.success(f"✅ Berhasil upload {len(df)} record ke database area.")
-            return {"message": f"Berhasil upload {len(df)} record ke database."}
+    upload = insert_product_prc(df)
+    return chunked_result(upload)
 
-        return result_json
-    else:
-        st.error(f"Gagal upload data: {res.text}")
-        return None
-    
 # Halaman Upload 
 def app():
     # Validasi login
@@ -99,6 +87,7 @@ def app():
         duplicate_ids = result_json.get("duplicate_ids", [])
 
         st.success("✅ Upload selesai. Berikut hasil proses:")
+        show_upload_stats(result_json)
         if message:
             st.info(message)
 
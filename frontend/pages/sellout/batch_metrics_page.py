@@ -0,0 +1,77 @@
+import streamlit as st
+import pandas as pd
+
+from utils.api.sellout.sellout_api import get_batch_metrics, get_queue_stats, update_queue_priority
+
+STAGE_COLUMNS = [
+    "parse_ms", "transform_ms", "coverage_ms", "delete_ms",
+    "temp_load_ms", "queue_wait_ms", "finalize_ms", "error_capture_ms"
+]
+
+
+def app():
+    #  AUTH 
+    if "logged_in" not in st.session_state or not st.session_state.logged_in:
+        st.warning("⚠ Anda harus login terlebih dahulu.")
+        st.session_state.page = "main"
+        return
+
+    token = st.session_state.token
+
+    st.title("⏱️ Batch Upload Sellout")
+    st.info("Durasi tiap tahap (parse → staging → antrian → finalize) dan jumlah baris per batch upload.")
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        branch = st.text_input("Kode Branch (kosong = semua)").strip()
+    with col2:
+        limit = st.number_input("Jumlah batch", min_value=10, max_value=500, value=50, step=10)
+    with col3:
+        hours = st.number_input("Antrian (jam terakhir)", min_value=1, max_value=168, value=24)
+
+    res = get_batch_metrics(branch or None, limit=int(limit), token=token)
+    if not res or res.status_code != 200:
+        st.error("Gagal mengambil metrics batch")
+        return
+
+    data = res.json().get("data", [])
+    if not data:
+        st.info("Belum ada batch yang tercatat")
+    else:
+        df = pd.DataFrame(data)
+        st.subheader("📦 Batch")
+        st.dataframe(df, use_container_width=True, hide_index=True)
+
+        # Rata-rata durasi per tahap, tahap terlama yang perlu dioptimasi
+        st.subheader("📊 Rata-rata durasi per tahap (ms)")
+        stages = df[STAGE_COLUMNS].apply(pd.to_numeric, errors="coerce").mean().fillna(0)
+        stages.index = [c.replace("_ms", "") for c in stages.index]
+        st.bar_chart(stages)
+
+        # Batch yang masih antri bisa didahulukan (mis. revisi mendesak)
+        pending = df[df["queue_status"] == "PENDING"]["upload_batch_id"].tolist()
+        if pending:
+            st.subheader("⏫ Prioritas antrian")
+            col1, col2, col3 = st.columns([3, 1, 1])
+            with col1:
+                batch_id = st.selectbox("Batch PENDING", pending)
+            with col2:
+                priority = st.number_input("Prioritas (0-10)", min_value=0, max_value=10, value=5)
+            with col3:
+                st.write("")
+                if st.button("Simpan prioritas"):
+                    res_priority = update_queue_priority(batch_id, int(priority), token=token)
+                    if res_priority and res_priority.status_code == 200:
+                        st.success("✅ Prioritas diperbarui")
+                        st.rerun()
+                    elif res_priority is not None:
+                        st.error(f"❌ {res_priority.json().get('error', res_priority.text)}")
+
+    res = get_queue_stats(int(hours), token=token)
+    if res and res.status_code == 200:
+        queue = res.json().get("data", [])
+        st.subheader("🚦 Antrian worker per branch")
+        if queue:
+            st.dataframe(pd.DataFrame(queue), use_container_width=True, hide_index=True)
+        else:
+            st.info("Antrian kosong")
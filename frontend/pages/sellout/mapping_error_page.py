@@ -6,8 +6,10 @@ from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode
 
 from utils.api.sellout.mapping_error_api import (
     get_region_entity_mapping_branch,
-    get_mapping_error_data
+    get_mapping_error_data,
+    get_mapping_error_summary
 )
+from utils.api.list_api import get_area_mapping_list, clear_area_cache
 
 PAGE_CHUNK = 2000
 
@@ -44,12 +46,21 @@ def fetch_all_mapping_error_cached(token, kodebranch, date_from, date_to, chunk_
 
     return all_data
 
-@cache_data(ttl=3600)
+@cache_data(ttl=600)
+def fetch_mapping_error_summary_cached(token, kodebranch, date_from, date_to):
+    res = get_mapping_error_summary(
+        kodebranch=kodebranch,
+        date_from=date_from,
+        date_to=date_to,
+        token=token
+    )
+    if not res or res.status_code != 200:
+        return []
+    return res.json().get("data", [])
+
 def get_mapping_cached(token):
-    res = get_region_entity_mapping_branch(token)
-    if res and res.status_code == 200:
-        return res.json().get("data", [])
-    return []
+    """Mapping region/entity/branch, direvalidasi ke server via ETag."""
+    return get_area_mapping_list(token)
 
 #  GRID 
 
@@ -96,14 +107,14 @@ def app():
     st.session_state.setdefault("me_last_to", None)
     st.session_state.setdefault("me_mapping_list", None)
     st.session_state.setdefault("me_grid_version", 1)
+    st.session_state.setdefault("me_view", "summary")
 
     st.title("❌ Mapping Error Data")
     st.info("Halaman ini menampilkan data yang gagal terproses karena kesalahan mapping (Product/Customer/Salesman).")
 
     #  MAPPING DATA 
-    if st.session_state["me_mapping_list"] is None:
-        with st.spinner("Memuat mapping region / entity / branch..."):
-            st.session_state["me_mapping_list"] = get_mapping_cached(token)
+    # Revalidasi ke server (304 jika mapping belum berubah)
+    st.session_state["me_mapping_list"] = get_mapping_cached(token)
 
     mapping_df = pd.DataFrame(st.session_state["me_mapping_list"])
 
@@ -151,6 +162,12 @@ def app():
         with col2:
             date_to = st.date_input("To Date", value=None, format="YYYY-MM-DD")
 
+        view = st.radio(
+            "Tampilan",
+            ["Ringkasan per kode", "Detail per baris"],
+            horizontal=True
+        )
+
         # Tombol Terapkan
         if st.button("▶ Tampilkan Data Error"):
             if selected_branch == "(Pilih Branch)":
@@ -166,20 +183,32 @@ def app():
                 st.session_state["me_last_to"] = str(date_to)
 
                 with st.spinner("Mengambil data mapping error..."):
-                    data = fetch_all_mapping_error_cached(
-                        token, kodebranch, str(date_from), str(date_to)
-                    )
+                    if view == "Ringkasan per kode":
+                        data = fetch_mapping_error_summary_cached(
+                            token, kodebranch, str(date_from), str(date_to)
+                        )
+                        st.session_state["me_view"] = "summary"
+                    else:
+                        data = fetch_all_mapping_error_cached(
+                            token, kodebranch, str(date_from), str(date_to)
+                        )
+                        st.session_state["me_view"] = "detail"
                 
                 st.session_state["me_full_data"] = data
                 st.session_state["me_grid_version"] += 1
-                st.success(f"Ditemukan {len(data)} baris bermasalah.")
+                if st.session_state["me_view"] == "summary":
+                    total_lines = sum(r["lines"] for r in data)
+                    st.success(f"Ditemukan {len(data)} kode bermasalah ({total_lines} baris).")
+                else:
+                    st.success(f"Ditemukan {len(data)} baris bermasalah.")
 
     # ACTION BUTTONS 
     cols = st.columns([1, 6, 1])
     with cols[0]:
         if st.button("🔄 Refresh"):
             fetch_all_mapping_error_cached.clear()
-            get_mapping_cached.clear()
+            fetch_mapping_error_summary_cached.clear()
+            clear_area_cache()
             st.rerun()
 
     with cols[2]:
@@ -8,6 +8,7 @@ from utils.api.sellout.sellout_api import (
     get_region_entity_branch_mapping,
     get_sellout_data
 )
+from utils.api.list_api import get_area_list, clear_area_cache
 
 PAGE_CHUNK = 2000
 
@@ -45,12 +46,9 @@ def fetch_all_sellout_cached(token, kodebranch, date_from, date_to, chunk_limit=
     return all_data
 
 
-@cache_data(ttl=3600)
 def get_mapping_cached(token):
-    res = get_region_entity_branch_mapping(token)
-    if res and res.status_code == 200:
-        return res.json().get("data", [])
-    return []
+    """Mapping region/entity/branch, direvalidasi ke server via ETag."""
+    return get_area_list(token)
 
 
 # GRID 
@@ -109,9 +107,8 @@ def app():
         return
 
     #  MAPPING 
-    if st.session_state["mapping_sellout"] is None:
-        with st.spinner("Memuat mapping region / entity / branch..."):
-            st.session_state["mapping_sellout"] = get_mapping_cached(token)
+    # Revalidasi ke server (304 jika mapping belum berubah)
+    st.session_state["mapping_sellout"] = get_mapping_cached(token)
 
     mapping_df = pd.DataFrame(st.session_state["mapping_sellout"])
 
@@ -212,7 +209,7 @@ def app():
     with cols[0]:
         if st.button("🔄 Force Reload"):
             fetch_all_sellout_cached.clear()
-            get_mapping_cached.clear()
+            clear_area_cache()
 
             kodebranch = st.session_state.get("last_kodebranch")
             date_from = st.session_state.get("last_date_from")
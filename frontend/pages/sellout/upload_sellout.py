@@ -4,6 +4,32 @@ from utils.api.sellout.sellout_api import upload_sellout_data
 from utils.api.sellout.sellout_api import get_region_entity_branch_mapping
 
 
+# ================= COVERAGE MAPPING =================
+def show_coverage(coverage):
+    if not coverage:
+        return
+
+    st.write(
+        f"🧭 Coverage mapping: **{coverage['coverage_pct']}%** "
+        f"({coverage['mapped_lines']} dari {coverage['total_lines']} baris ter-mapping)"
+    )
+
+    rows = []
+    for dimension, info in coverage.get("dimensions", {}).items():
+        rows.append({
+            "Dimensi": dimension,
+            "Kode Unik": info["distinct_codes"],
+            "Belum Mapping": info["unmapped_codes"],
+            "Baris Terdampak": info["unmapped_lines"]
+        })
+    st.dataframe(pd.DataFrame(rows), width="stretch", hide_index=True)
+
+    for dimension, info in coverage.get("dimensions", {}).items():
+        if info["codes"]:
+            with st.expander(f"Kode {dimension} belum ter-mapping ({info['unmapped_codes']})"):
+                st.dataframe(pd.DataFrame(info["codes"]), width="stretch", hide_index=True)
+
+
 # ================= MAIN =================
 def app():
     # ================= AUTH =================
@@ -112,6 +138,25 @@ def app():
         type=["xlsx", "csv", "txt"]
     )
 
+    strict = st.checkbox(
+        "Tolak upload jika masih ada kode yang belum ter-mapping (strict)",
+        help="Data sellout bulan tersebut tidak dihapus jika upload ditolak"
+    )
+
+    full = st.checkbox(
+        "Replace penuh data bulan tersebut",
+        help="Tanpa ini hanya baris baru/berubah yang diproses; baris yang tetap "
+             "tidak ikut diperbarui jika master (region/area/customer/produk) sudah berubah"
+    )
+
+    priority = st.number_input(
+        "Prioritas antrian (0-10)",
+        min_value=0,
+        max_value=10,
+        value=0,
+        help="Lebih besar diproses worker lebih dulu, mis. untuk revisi mendesak"
+    )
+
     # ================= UPLOAD =================
     if st.button("🚀 Upload Sellout"):
         if selected_branch == "(Pilih Branch)":
@@ -129,6 +174,9 @@ def app():
                 branch=branch_code,
                 file=uploaded_file,
                 username=username,
+                strict=strict,
+                priority=int(priority),
+                full=full,
                 token=token
             )
 
@@ -145,6 +193,10 @@ def app():
             st.session_state.upload_done = True
             st.session_state.upload_result = result
             st.rerun()
+        elif res.status_code == 422:
+            result = res.json()
+            st.error(f"❌ {result.get('error')}")
+            show_coverage(result.get("coverage"))
         else:
             st.error(f"❌ Upload gagal: {res.text}")
 
@@ -160,6 +212,15 @@ def app():
         if "total_row" in result:
             st.write(f"📦 Total data diproses: **{result['total_row']} baris**")
 
+        diff = result.get("diff")
+        if result.get("mode") == "diff" and diff:
+            st.write(
+                f"🔀 Perubahan: **{diff['inserted']}** baris baru/berubah, "
+                f"**{diff['removed']}** baris dihapus, **{diff['unchanged']}** baris tetap"
+            )
+
+        show_coverage(result.get("coverage"))
+
         st.markdown("---")
         st.warning(
             "ℹ️ Data sellout pada **invoice date yang sama** "
@@ -0,0 +1,239 @@
+import re
+import time
+import requests
+import streamlit as st
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.api import API_URL
+
+CHUNK_SIZE = 2000
+MAX_WORKERS = 4
+MAX_RETRIES = 3
+CHUNK_TIMEOUT = 120
+
+
+def split_chunks(df, chunk_size=CHUNK_SIZE, key=None):
+    """
+    Potong DataFrame per chunk_size baris. Jika key diisi, data diurutkan
+    dulu dan batas chunk digeser supaya baris dengan key sama tidak terpecah
+    ke dua request paralel (duplikat tetap terdeteksi di server).
+    """
+    if key and key in df.columns:
+        df = df.sort_values(key, kind="stable").reset_index(drop=True)
+
+    chunks = []
+    start = 0
+    total = len(df)
+    while start < total:
+        end = min(start + chunk_size, total)
+        if key and key in df.columns:
+            while end < total and df[key].iat[end] == df[key].iat[end - 1]:
+                end += 1
+        chunks.append(df.iloc[start:end])
+        start = end
+    return chunks
+
+
+def _inserted_count(result):
+    if isinstance(result.get("inserted"), int):
+        return result["inserted"]
+    match = re.match(r"\s*(\d+)", str(result.get("message", "")))
+    return int(match.group(1)) if match else 0
+
+
+def merge_results(results):
+    """Gabungkan response JSON per chunk: list di-extend, angka dijumlah"""
+    merged = {}
+    inserted = 0
+    for result in results:
+        inserted += _inserted_count(result)
+        for key, value in result.items():
+            if key in ("message", "inserted"):
+                continue
+            if isinstance(value, list):
+                merged.setdefault(key, []).extend(value)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                merged[key] = merged.get(key, 0) + value
+            else:
+                merged[key] = value
+    merged["message"] = f"{inserted} record berhasil ditambahkan"
+    merged["inserted"] = inserted
+    return merged
+
+
+def _error_body(res):
+    try:
+        body = res.json()
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def _post_chunk(url, headers, payload, max_retries, timeout):
+    """
+    /insert tidak idempoten, jadi retry hanya mengirim baris yang belum
+    tersimpan. Response error dari route /insert membawa committed (record
+    tersimpan) dan processed (baris payload yang sudah di-commit): baris
+    sebelum processed tidak dikirim ulang. Tanpa keterangan itu (timeout,
+    502/504 proxy, route lain) hasil percobaan sebelumnya tidak diketahui;
+    chunk tetap dikirim ulang dan ditandai uncertain, karena baris yang
+    sempat tersimpan akan dilaporkan duplikat oleh percobaan berikutnya.
+
+    Return (response terakhir atau None, error, committed sebelum response
+    terakhir, uncertain).
+    """
+    last_error = None
+    committed = 0
+    uncertain = False
+    for attempt in range(max_retries):
+        if attempt:
+            time.sleep(2 ** (attempt - 1))
+        try:
+            res = requests.post(url, json=payload, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            last_error = str(e)
+            uncertain = True
+            continue
+
+        # 4xx = data salah, tidak perlu retry
+        if res.status_code < 500:
+            return res, None, committed, uncertain
+        last_error = f"HTTP {res.status_code}: {res.text[:200]}"
+
+        body = _error_body(res)
+        if isinstance(body.get("processed"), int):
+            committed += body.get("committed") or 0
+            payload = payload[body["processed"]:]
+            if not payload:
+                return None, None, committed, uncertain
+        else:
+            uncertain = True
+    return None, last_error, committed, uncertain
+
+
+def post_dataframe_chunked(path, df, token=None, chunk_size=CHUNK_SIZE, max_workers=MAX_WORKERS,
+                           max_retries=MAX_RETRIES, timeout=CHUNK_TIMEOUT, key=None):
+    """
+    Kirim DataFrame ke endpoint /insert per chunk secara paralel.
+
+    Chunk yang gagal (timeout / 5xx) di-retry dengan backoff, hanya baris
+    yang belum tersimpan (lihat _post_chunk). Progress bar di-update dari
+    thread utama Streamlit. Return dict:
+    {"data": hasil gabungan, "failed_chunks": [...], "uncertain_chunks": [...],
+     "rows": n, "elapsed": detik, "rows_per_sec": throughput}
+    """
+    if token is None:
+        token = st.session_state.get("token", None)
+    headers = {
+        "Authorization": token,
+        "Content-Type": "application/json"
+    }
+    url = f"{API_URL}{path}"
+
+    df = df.fillna("")
+    chunks = split_chunks(df, chunk_size=chunk_size, key=key)
+    total_rows = len(df)
+
+    progress = st.progress(0.0, text=f"Mengirim 0 / {total_rows} baris...")
+    start = time.perf_counter()
+
+    results = []
+    failed_chunks = []
+    uncertain_chunks = []
+    done_rows = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(_post_chunk, url, headers, chunk.to_dict(orient="records"), max_retries, timeout): (idx, len(chunk))
+            for idx, chunk in enumerate(chunks)
+        }
+        for future in as_completed(futures):
+            idx, size = futures[future]
+            res, error, committed, uncertain = future.result()
+
+            if res is not None and res.status_code == 200:
+                try:
+                    result = res.json()
+                except Exception:
+                    result = {"message": f"{size} record berhasil ditambahkan"}
+                # Record dari percobaan sebelumnya yang sempat tersimpan
+                result["inserted"] = _inserted_count(result) + committed
+                results.append(result)
+            elif res is None and error is None:
+                # Semua baris tersimpan sebelum percobaan terakhir gagal
+                results.append({"inserted": committed})
+            else:
+                if res is not None:
+                    # 4xx dari route /insert juga membawa record yang sudah tersimpan
+                    committed += _error_body(res).get("committed") or 0
+                if committed:
+                    results.append({"inserted": committed})
+                failed_chunks.append({
+                    "chunk": idx + 1,
+                    "rows": size,
+                    "committed": committed,
+                    "error": error or f"HTTP {res.status_code}: {res.text[:200]}"
+                })
+            if uncertain:
+                uncertain_chunks.append({"chunk": idx + 1, "rows": size})
+
+            done_rows += size
+            elapsed = time.perf_counter() - start
+            rate = done_rows / elapsed if elapsed > 0 else 0
+            progress.progress(
+                done_rows / total_rows if total_rows else 1.0,
+                text=f"Mengirim {done_rows} / {total_rows} baris ({rate:,.0f} baris/detik)"
+            )
+
+    elapsed = time.perf_counter() - start
+    progress.empty()
+
+    return {
+        "data": merge_results(results),
+        "failed_chunks": sorted(failed_chunks, key=lambda c: c["chunk"]),
+        "uncertain_chunks": sorted(uncertain_chunks, key=lambda c: c["chunk"]),
+        "rows": total_rows,
+        "elapsed": elapsed,
+        "rows_per_sec": total_rows / elapsed if elapsed > 0 else 0
+    }
+
+
+def chunked_result(upload):
+    """Ubah hasil post_dataframe_chunked menjadi result_json halaman upload"""
+    failed_chunks = upload["failed_chunks"]
+    failed_rows = sum(c["rows"] for c in failed_chunks)
+    if upload["rows"] and failed_rows >= upload["rows"]:
+        st.error(f"Gagal upload data: {failed_chunks[0]['error']}")
+        return None
+
+    result_json = dict(upload["data"])
+    result_json["failed_chunks"] = failed_chunks
+    result_json["uncertain_chunks"] = upload["uncertain_chunks"]
+    result_json["upload_stats"] = {
+        "rows": upload["rows"],
+        "elapsed": upload["elapsed"],
+        "rows_per_sec": upload["rows_per_sec"]
+    }
+    return result_json
+
+
+def show_upload_stats(result_json):
+    """Tampilkan throughput dan chunk yang gagal setelah upload selesai"""
+    stats = result_json.get("upload_stats")
+    if stats:
+        st.caption(
+            f"⏱️ {stats['rows']} baris dikirim dalam {stats['elapsed']:.1f} detik "
+            f"({stats['rows_per_sec']:,.0f} baris/detik)"
+        )
+
+    failed_chunks = result_json.get("failed_chunks", [])
+    if failed_chunks:
+        st.error(f"❌ {len(failed_chunks)} chunk gagal dikirim setelah retry. Upload ulang baris berikut:")
+        st.dataframe(failed_chunks)
+
+    uncertain_chunks = result_json.get("uncertain_chunks", [])
+    if uncertain_chunks:
+        st.warning(
+            f"⚠️ {len(uncertain_chunks)} chunk dikirim ulang setelah timeout / error tanpa keterangan. "
+            "Baris chunk berikut yang dilaporkan duplikat mungkin tersimpan oleh percobaan sebelumnya:"
+        )
+        st.dataframe(uncertain_chunks)
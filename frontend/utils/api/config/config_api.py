@@ -43,7 +43,8 @@ def insert_config(df, token=None):
 # UPDATE DATA CONFIG
 def update_config(token, branch, kodebranch, id_salesman, id_customer, id_product, qty1, qty2, qty3, price, grossamount, discount1, discount2, discount3,
                   discount4, discount5, discount6, discount7, discount8, total_discount, dpp, tax, nett, order_no, order_date, invoice_no, invoice_date,
-                  invoice_type, sfa_order_no, sfa_order_date, file_extension, separator_file, first_row, flag_bonus, updateby):
+                  invoice_type, sfa_order_no, sfa_order_date, file_extension, separator_file, first_row, flag_bonus, updateby,
+                  parse_engine="c", date_format=None):
     if token is None:
         token = st.session_state.get("token", None)
     headers = {"Authorization": token,
@@ -81,6 +82,8 @@ def update_config(token, branch, kodebranch, id_salesman, id_customer, id_produc
         "separator_file" : separator_file,
         "first_row" : first_row,
         "flag_bonus": flag_bonus,
+        "parse_engine" : parse_engine,
+        "date_format" : date_format,
         "updateby" : updateby
     }
     try:
@@ -1,6 +1,7 @@
 import requests
 import streamlit as st
 from utils.api import API_URL
+from utils.api.chunked_upload import post_dataframe_chunked
 
 
 # GET DATA REGION, ENTITY, BRANCH MAPPING
@@ -47,20 +48,8 @@ def get_customer_dist(token=None, offset=0, limit=50, branch_dist=None):
     
 # INSERT DATA CUSTOMER DIST
 def insert_customer_dist(df, token=None):
-    if token is None:
-        token = st.session_state.get("token", None)
-    headers = {
-        "Authorization" : token,
-        "Content-Type" : "application/json"
-    }
-    try:
-        df = df.fillna("") 
-        payload = df.to_dict(orient="records")
-        response = requests.post(f"{API_URL}/customer-dist/insert", json=payload, headers=headers)
-        return response
-    except Exception as e:
-        st.error(f"Gagal menghubungi server: {e}")
-        return None
+    """Kirim per chunk secara paralel, lihat utils.api.chunked_upload"""
+    return post_dataframe_chunked("/customer-dist/insert", df, token=token, key="custno_dist")
     
 # UPDATE CUSTOMER DIST
 def update_customer_dist(token, custno_dist, custname, updateby):
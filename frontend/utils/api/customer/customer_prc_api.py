@@ -1,6 +1,7 @@
 import requests
 import streamlit as st
 from utils.api import API_URL
+from utils.api.chunked_upload import post_dataframe_chunked
 
 
 # GET DATA REGION, ENTITY, BRANCH   
@@ -48,20 +49,8 @@ def get_customer_prc(token=None, offset=0, limit=50, kodebranch=None):
     
 # INSERT DATA CUSTOMER PRC
 def insert_customer_prc(df, token=None):
-    if token is None:
-        token = st.session_state.get("token", None)
-    headers = {
-        "Authorization" : token,
-        "Content-Type" : "application/json"
-    }
-    try:
-        df = df.fillna("") 
-        payload = df.to_dict(orient="records")
-        response = requests.post(f"{API_URL}/customer-prc/insert", json=payload, headers=headers)
-        return response
-    except Exception as e:
-        st.error(f"Gagal menghubungi server: {e}")
-        return None
+    """Kirim per chunk secara paralel, lihat utils.api.chunked_upload"""
+    return post_dataframe_chunked("/customer-prc/insert", df, token=token, key="custno")
     
 # UPDATE CUSTOMER PRC
 def update_customer_prc(token, custno, custname, custadd, city, typecustomer, gharga, updateby):
@@ -0,0 +1,65 @@
+import threading
+import time
+import requests
+import streamlit as st
+from utils.api import API_URL
+
+# Dalam jendela ini data dipakai langsung tanpa request; setelahnya
+# direvalidasi ke server dengan If-None-Match (304 jika belum berubah)
+REVALIDATE_AFTER = 30
+
+_lock = threading.Lock()
+_cache = {}
+
+
+def _get_list_revalidated(path, token=None):
+    if token is None:
+        token = st.session_state.get("token")
+
+    with _lock:
+        entry = _cache.get(path)
+    if entry and time.monotonic() - entry["checked_at"] < REVALIDATE_AFTER:
+        return entry["data"]
+
+    headers = {"Authorization": token}
+    if entry:
+        headers["If-None-Match"] = entry["etag"]
+
+    try:
+        res = requests.get(f"{API_URL}{path}", headers=headers, timeout=30)
+    except Exception as e:
+        st.error(f"Gagal mengambil mapping region-entity-branch: {e}")
+        return entry["data"] if entry else []
+
+    if res.status_code == 304 and entry:
+        with _lock:
+            entry["checked_at"] = time.monotonic()
+        return entry["data"]
+
+    if res.status_code != 200:
+        return entry["data"] if entry else []
+
+    data = res.json().get("data", [])
+    with _lock:
+        _cache[path] = {
+            "etag": res.headers.get("ETag"),
+            "data": data,
+            "checked_at": time.monotonic()
+        }
+    return data
+
+
+# GET REGION + ENTITY + BRANCH
+def get_area_list(token=None):
+    return _get_list_revalidated("/list/area", token)
+
+
+# GET REGION + ENTITY + MAPPING BRANCH
+def get_area_mapping_list(token=None):
+    return _get_list_revalidated("/list/area-mapping", token)
+
+
+def clear_area_cache():
+    """Paksa request penuh berikutnya (tombol Force Reload)"""
+    with _lock:
+        _cache.clear()
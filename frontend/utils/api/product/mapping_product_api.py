@@ -1,6 +1,7 @@
 import requests
 import streamlit as st
 from utils.api import API_URL
+from utils.api.chunked_upload import post_dataframe_chunked
 
 
 # GET DATA REGION, ENTITY, BRANCH MAPPING
@@ -47,21 +48,22 @@ def get_mapping_product(token=None, offset=0, limit=50, branch_dist=None):
 
 # INSERT DATA MAPPING PRODUCT
 def insert_mapping_product(df, token=None):
+    """Kirim per chunk secara paralel, lihat utils.api.chunked_upload"""
+    return post_dataframe_chunked("/mapping-product/insert", df, token=token, key="pcode_dist")
+
+# SARAN MAPPING OTOMATIS (FUZZY)
+def suggest_mapping_product(branch_dist, min_score=0.3, top_n=3, token=None):
     if token is None:
         token = st.session_state.get("token", None)
-    headers = {
-        "Authorization" : token,
-        "Content-Type" : "application/json"
-    }
+    headers = {"Authorization": token, "Content-Type": "application/json"}
+    payload = {"branch_dist": branch_dist, "min_score": min_score, "top_n": top_n}
     try:
-        df = df.fillna("") 
-        payload = df.to_dict(orient="records")
-        response = requests.post(f"{API_URL}/mapping-product/insert", json=payload, headers=headers)
-        return response
+        return requests.post(f"{API_URL}/mapping-product/suggest", json=payload, headers=headers, timeout=120)
     except Exception as e:
-        st.error(f"Gagal menghubungi server: {e}")
+        st.error(f"Gagal mengambil saran mapping: {e}")
         return None
 
+
 # DELETE MAPPING PRODUCT
 def delete_mapping_product(token, custno):
     if token is None:
@@ -1,6 +1,7 @@
 import requests
 import streamlit as st
 from utils.api import API_URL
+from utils.api.chunked_upload import post_dataframe_chunked
 
 # GET DATA REGION, ENTITY, BRANCH MAPPING
 def get_region_entity_mapping_branch(token=None):
@@ -47,20 +48,8 @@ def get_product_dist(token=None, offset=0, limit=50, branch_dist=None):
 
 # INSERT DATA PRODUCT DIST
 def insert_product_dist(df, token=None):
-    if token is None:
-        token = st.session_state.get("token", None)
-    headers = {
-        "Authorization" : token,
-        "Content-Type" : "application/json"
-    }
-    try:
-        df = df.fillna("") 
-        payload = df.to_dict(orient="records")
-        response = requests.post(f"{API_URL}/product-dist/insert", json=payload, headers=headers)
-        return response
-    except Exception as e:
-        st.error(f"Gagal menghubungi server: {e}")
-        return None
+    """Kirim per chunk secara paralel, lihat utils.api.chunked_upload"""
+    return post_dataframe_chunked("/product-dist/insert", df, token=token, key="pcode_dist")
 
 # UPDATE PRODUCT DIST
 def update_product_dist(token, pcode_dist, pcodename, updateby):
@@ -1,6 +1,7 @@
 import requests
 import streamlit as st
 from utils.api import API_URL
+from utils.api.chunked_upload import post_dataframe_chunked
 
 # GET DATA PRODUCT GROUP
 def get_product_group(token=None, offset=0, limit=50):
@@ -26,19 +27,8 @@ def get_product_group(token=None, offset=0, limit=50):
 
 # INSERT PRODUCT GROUP
 def insert_product_group(df, token=None):
-    if token is None:
-        token = st.session_state.get("token", None)
-    headers = {
-        "Authorization": token,
-        "Content-Type": "application/json"
-    }
-    try:
-        payload = df.to_dict(orient="records")
-        response = requests.post(f"{API_URL}/product-group/insert", json=payload, headers=headers)
-        return response
-    except Exception as e:
-        st.error(f"Gagal menghubungi server: {e}")
-        return None
+    """Kirim per chunk secara paralel, lihat utils.api.chunked_upload"""
+    return post_dataframe_chunked("/product-group/insert", df, token=token, key="pcode")
     
 
 # UPDATE PRODUCT GROUP
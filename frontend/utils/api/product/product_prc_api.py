@@ -1,6 +1,7 @@
 import requests
 import streamlit as st
 from utils.api import API_URL
+from utils.api.chunked_upload import post_dataframe_chunked
 
 # GET DATA PRODUCT PRC
 def get_product_prc(token=None, offset=0, limit=50):
@@ -25,19 +26,8 @@ def get_product_prc(token=None, offset=0, limit=50):
 
 # INSERT PRODUCT PRC
 def insert_product_prc(df, token=None):
-    if token is None:
-        token = st.session_state.get("token", None)
-    headers = {
-        "Authorization": token,
-        "Content-Type": "application/json"
-    }
-    try:
-        payload = df.to_dict(orient="records")
-        response = requests.post(f"{API_URL}/product-prc/insert", json=payload, headers=headers)
-        return response
-    except Exception as e:
-        st.error(f"Gagal menghubungi server: {e}")
-        return None
+    """Kirim per chunk secara paralel, lihat utils.api.chunked_upload"""
+    return post_dataframe_chunked("/product-prc/insert", df, token=token, key="pcode")
 
 # UPDATE PRODUCT PRC
 def update_product_prc(token, pcode, pcodename, unit1, unit2, unit3, convunit2, convunit3, prlin, prlinname, updateby):
@@ -1,6 +1,7 @@
 import requests
 import streamlit as st
 from utils.api import API_URL
+from utils.api.chunked_upload import post_dataframe_chunked
 
 
 # GET DATA REGION, ENTITY, BRANCH   
@@ -48,20 +49,8 @@ def get_all_mapping_salesman(token=None, offset=0, limit=50, kodebranch=None):
 
 # INSERT DATA MAPPING SALESMAN
 def insert_mapping_salesman(df, token=None):
-    if token is None:
-        token = st.session_state.get("token", None)
-    headers = {
-        "Authorization" : token,
-        "Content-Type" : "application/json"
-    }
-    try:
-        df = df.fillna("") 
-        payload = df.to_dict(orient="records")
-        response = requests.post(f"{API_URL}/mapping-salesman/insert", json=payload, headers=headers)
-        return response
-    except Exception as e:
-        st.error(f"Gagal menghubungi server: {e}")
-        return None
+    """Kirim per chunk secara paralel, lihat utils.api.chunked_upload"""
+    return post_dataframe_chunked("/mapping-salesman/insert", df, token=token, key="id_salesman")
     
 # UPDATE SMAPPING SALESMAN
 def update_mapping_salesman(token, id_salesman, id_salesman_dist, nama_salesman_dist, updateby):
@@ -1,6 +1,7 @@
 import requests
 import streamlit as st
 from utils.api import API_URL
+from utils.api.chunked_upload import post_dataframe_chunked
 
 
 # GET DATA REGION, ENTITY, BRANCH   
@@ -50,20 +51,8 @@ def get_all_salesman_master(token=None, offset=0, limit=50, kodebranch=None, sal
     
 # INSERT DATA SALESMAN MASTER 
 def insert_salesman_master(df, token=None):
-    if token is None:
-        token = st.session_state.get("token", None)
-    headers = {
-        "Authorization" : token,
-        "Content-Type" : "application/json"
-    }
-    try:
-        df = df.fillna("") 
-        payload = df.to_dict(orient="records")
-        response = requests.post(f"{API_URL}/salesman-master/insert", json=payload, headers=headers)
-        return response
-    except Exception as e:
-        st.error(f"Gagal menghubungi server: {e}")
-        return None
+    """Kirim per chunk secara paralel, lihat utils.api.chunked_upload"""
+    return post_dataframe_chunked("/salesman-master/insert", df, token=token, key="id_salesman")
     
 # UPDATE SALESMAN
 def update_salesman_master(token, id_salesman, nama, updateby):
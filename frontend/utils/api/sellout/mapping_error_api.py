@@ -41,4 +41,29 @@ def get_mapping_error_data(
         headers=headers,
         params=params,
         timeout=30
-    )
\ No newline at end of file
+    )
+
+
+# GET RINGKASAN MAPPING ERROR (PER STATUS + KODE DISTRIBUTOR)
+def get_mapping_error_summary(
+    kodebranch,
+    date_from,
+    date_to,
+    token=None
+):
+    headers = {
+        "Authorization": token
+    }
+
+    params = {
+        "kodebranch": kodebranch,
+        "date_from": date_from,
+        "date_to": date_to
+    }
+
+    return requests.get(
+        f"{API_URL}/mapping-error/summary",
+        headers=headers,
+        params=params,
+        timeout=30
+    )
@@ -1,3 +1,4 @@
+import json
 import requests
 import streamlit as st
 from utils.api import API_URL
@@ -50,6 +51,9 @@ def upload_sellout_data(
     branch,
     file,
     username="system",
+    strict=False,
+    priority=0,
+    full=False,
     token=None
 ):
     if token is None:
@@ -65,7 +69,10 @@ def upload_sellout_data(
 
     data = {
         "branch": branch,
-        "username": username
+        "username": username,
+        "strict": "1" if strict else "0",
+        "priority": priority,
+        "full": "1" if full else "0"
     }
 
     try:
@@ -78,4 +85,111 @@ def upload_sellout_data(
         )
     except Exception as e:
         st.error(f"Gagal upload sellout: {e}")
-        return None
\ No newline at end of file
+        return None
+
+# PREVIEW / DRY-RUN FILE SELLOUT (TIDAK DISIMPAN)
+def preview_sellout_file(
+    branch,
+    file,
+    config=None,
+    nrows=50,
+    token=None
+):
+    if token is None:
+        token = st.session_state.get("token")
+
+    headers = {
+        "Authorization": token
+    }
+
+    content = file.getvalue()
+    # csv/txt: cukup kirim baris awal (first_row + nrows), file besar tidak ikut terkirim
+    if not file.name.lower().endswith(".xlsx"):
+        try:
+            first_row = int((config or {}).get("first_row") or 1)
+        except ValueError:
+            first_row = 1
+        content = b"\n".join(content.split(b"\n", first_row + nrows)[:first_row + nrows])
+
+    files = {
+        "file": (file.name, content, file.type)
+    }
+
+    data = {
+        "branch": branch,
+        "nrows": nrows
+    }
+    if config:
+        data["config"] = json.dumps(config)
+
+    try:
+        return requests.post(
+            f"{API_URL}/sellout/preview",
+            headers=headers,
+            files=files,
+            data=data,
+            timeout=60
+        )
+    except Exception as e:
+        st.error(f"Gagal preview file: {e}")
+        return None
+
+
+# METRICS PER BATCH UPLOAD
+def get_batch_metrics(branch=None, limit=50, offset=0, token=None):
+    if token is None:
+        token = st.session_state.get("token")
+
+    headers = {"Authorization": token}
+    params = {"limit": limit, "offset": offset}
+    if branch:
+        params["branch"] = branch
+
+    try:
+        return requests.get(
+            f"{API_URL}/sellout/batches",
+            headers=headers,
+            params=params,
+            timeout=30
+        )
+    except Exception as e:
+        st.error(f"Gagal mengambil metrics batch: {e}")
+        return None
+
+
+# UBAH PRIORITAS ANTRIAN BATCH (HANYA YANG MASIH PENDING)
+def update_queue_priority(upload_batch_id, priority, token=None):
+    if token is None:
+        token = st.session_state.get("token")
+
+    headers = {"Authorization": token}
+
+    try:
+        return requests.put(
+            f"{API_URL}/sellout/queue/{upload_batch_id}/priority",
+            headers=headers,
+            json={"priority": priority},
+            timeout=30
+        )
+    except Exception as e:
+        st.error(f"Gagal mengubah prioritas: {e}")
+        return None
+
+
+# STATISTIK ANTRIAN WORKER
+def get_queue_stats(hours=24, token=None):
+    if token is None:
+        token = st.session_state.get("token")
+
+    headers = {"Authorization": token}
+
+    try:
+        return requests.get(
+            f"{API_URL}/sellout/queue",
+            headers=headers,
+            params={"hours": hours},
+            timeout=30
+        )
+    except Exception as e:
+        st.error(f"Gagal mengambil statistik antrian: {e}")
+        return None
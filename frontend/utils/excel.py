@@ -0,0 +1,21 @@
+import importlib.util
+
+import pandas as pd
+
+# calamine (Rust, pip install python-calamine) dipakai jika terpasang dan
+# pandas >= 2.2 (engine="calamine"), selain itu openpyxl bawaan pandas
+# (read_only, tanpa memuat DOM workbook). Reader baris milik backend
+# (process/excel_reader.py) tidak dipakai di sini: frontend dan backend
+# dideploy terpisah.
+PANDAS_CALAMINE = tuple(int(p) for p in pd.__version__.split(".")[:2]) >= (2, 2)
+ENGINE = "calamine" if PANDAS_CALAMINE and importlib.util.find_spec("python_calamine") else None
+
+
+def read_excel(file, dtype=None):
+    """
+    Pengganti pd.read_excel(file, dtype=...) untuk halaman upload: sheet
+    pertama, baris pertama header, dengan engine calamine jika tersedia.
+    Header, baris kosong, dan header kembar (kolom, kolom.1) mengikuti
+    pandas. dtype=str atau dict {kolom: str} menjaga kode (nol depan) tetap teks.
+    """
+    return pd.read_excel(file, dtype=dtype, engine=ENGINE)